@@ -1,4 +1,11 @@
+from core.common.startup_profile import StartupProfile
+
+# Created before the imports below so they are part of the profile
+profile = StartupProfile("host_agent")
+
 import asyncio
+import os
+import sys
 import uvicorn
 
 from a2a.types import AgentSkill, AgentCard, AgentCapabilities
@@ -6,16 +13,29 @@ import asyncclick as click
 from a2a.server.request_handlers import DefaultRequestHandler
 
 from agents.host_agent.agent_executor import HostAgentExecutor
-from a2a.server.tasks import InMemoryTaskStore
+from core.a2a.task_store import create_task_store, worker_task_store_spec
+from core.common.metrics import mount_metrics, register_metrics
+from core.common.trace_sink import create_trace_sink
+from core.common.tracing import configure_tracing
 from a2a.server.apps import A2AStarletteApplication
 
 @click.command()
 @click.option('--host', default='localhost', help='Host for the agent server')
 @click.option('--port', default=10001, help='Port for the agent server')
-async def main(host: str, port: int):
+@click.option('--trace', default=None, help='Trace sink for agent events and request spans: off, ring[:size], jsonl:<path> or console[:sample_rate] (defaults to $TRACE_SINK)')
+@click.option('--task-store', default=None, help='Task store: memory or sqlite[:path] (defaults to $TASK_STORE)')
+@click.option('--workers', default=None, type=int, help='Worker processes behind a session-affine router (defaults to $HOST_WORKERS or 1)')
+@click.option('--card-url', default=None, help='URL advertised in the agent card (defaults to http://<host>:<port>/)')
+async def main(host: str, port: int, trace: str, task_store: str, workers: int, card_url: str):
     """
     Main function to create and run the website builder agent.
     """
+    workers = workers or int(os.environ.get("HOST_WORKERS", "1"))
+    if workers > 1:
+        await run_workers(host, port, workers, trace, task_store)
+        return
+
+    profile.mark("imports")
     skill = AgentSkill(
         id="host_agent_skill",
         name="host_agent_skill",
@@ -31,7 +51,7 @@ async def main(host: str, port: int):
     agent_card = AgentCard(
         name ="host_agent",
         description="A simple orchestrator for orchestrating tasks",
-        url=f"http://{host}:{port}/",
+        url=card_url or f"http://{host}:{port}/",
         version="1.0.0",
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
@@ -39,15 +59,22 @@ async def main(host: str, port: int):
         capabilities=AgentCapabilities(streaming=True),
     )
 
+    # Agent events and request spans share one sink, so one writer per process
+    trace_sink = create_trace_sink(trace)
+    register_metrics("host_agent.tracing", configure_tracing("host_agent", trace_sink).stats)
+
     # Create agent executor
-    agent_executor = HostAgentExecutor()
+    agent_executor = HostAgentExecutor(trace_sink=trace_sink)
     await agent_executor.create()
+    profile.mark("agent")
+
+    tasks = create_task_store("host_agent", task_store)
+    register_metrics("host_agent.tasks", tasks.stats)
+    profile.mark("task_store")
 
-       
-    
     request_handler = DefaultRequestHandler(
         agent_executor=agent_executor,
-        task_store=InMemoryTaskStore()
+        task_store=tasks
     )
 
     server = A2AStarletteApplication(
@@ -57,12 +84,56 @@ async def main(host: str, port: int):
 
     # Fixed: Use uvicorn.Config and Server instead of uvicorn.run() to avoid
     # "asyncio.run() cannot be called from a running event loop" error
-    config = uvicorn.Config(server.build(), host=host, port=port)
+    app = server.build()
+    mount_metrics(app)
+    register_metrics("host_agent.startup", profile.stats)
+    profile.attach(app)
+    profile.mark("app")
+
+    config = uvicorn.Config(app, host=host, port=port)
     server_instance = uvicorn.Server(config)
     
     await server_instance.serve()
 
 
+async def run_workers(host: str, port: int, workers: int, trace: str, task_store: str):
+    """
+    Run `workers` host agent processes on local ports behind a ShardRouter
+    on host:port. Each worker has its own event loop, sessions and MCP
+    toolsets; conversations stick to one worker by contextId, and crashed
+    workers are restarted.
+    """
+    from core.a2a.shard_router import ShardRouter, free_port
+    from core.common.supervisor import Component, Supervisor, agent_card_probe
+
+    card_url = f"http://{host}:{port}/"
+    worker_urls = [f"http://127.0.0.1:{free_port()}" for _ in range(workers)]
+    components = []
+    for index, url in enumerate(worker_urls):
+        command = [
+            sys.executable, "-m", "agents.host_agent",
+            "--host", "127.0.0.1", "--port", url.rsplit(":", 1)[1],
+            "--workers", "1", "--card-url", card_url,
+        ]
+        if trace:
+            command.append(f"--trace={trace}")
+        command.append(f"--task-store={worker_task_store_spec('host_agent', index, task_store)}")
+        components.append(Component(name=f"host_agent.{index}", command=command, probe=agent_card_probe(url)))
+
+    supervisor = Supervisor(components)
+    supervising = asyncio.create_task(supervisor.run())
+    try:
+        if not await supervisor.wait_ready(timeout=supervisor.ready_timeout):
+            print(f"Not all host workers are ready after {supervisor.ready_timeout:.0f}s: {supervisor.status()}")
+
+        router = ShardRouter(worker_urls)
+        config = uvicorn.Config(router.build(), host=host, port=port)
+        await uvicorn.Server(config).serve()
+    finally:
+        supervisor.stop()
+        await supervising
+
+
 if __name__ == "__main__":
     asyncio.run(main())
     
\ No newline at end of file
@@ -1,21 +1,39 @@
-from collections.abc import AsyncIterable
 import json
+import time
+from collections.abc import AsyncIterable
 from typing import Any
 from uuid import uuid4
 from core.a2a.agent_connect import AgentConnector
 from core.a2a.agent_discovery import AgentDiscovery
+from core.common.agent_stream import event_updates, report_progress, stream_with_progress
+from core.common.artifact_store import ArtifactAssembler, ArtifactRef, ArtifactStore, create_artifact_store
+from core.common.fast_router import RouteError, RouteMatch, create_fast_path_router
 from core.common.file_loader import load_instructions_file
+from core.common.history_compaction import create_history_compactor
+from core.common.metrics import register_metrics
+from core.common.model_backend import create_model
+from core.common.response_cache import fingerprint
+from core.common.session_store import create_session_service
+from core.common.trace_sink import TraceSink, create_trace_sink
+from core.common.tracing import AgentSpanCallbacks
+# ADK and genai are imported at module load on purpose: the server builds the
+# agent before it serves its card, and core.common.session_store imports ADK
+# anyway, so deferring them would only move the time from the "imports" to the
+# "agent" startup phase. Only the client avoids them (see benchmarks/cold_start.py).
 from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext, new_invocation_context_id
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk import Runner
 
 from google.adk.artifacts import InMemoryArtifactService
-from google.adk.sessions import InMemorySessionService
+from google.adk.events import Event
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
 from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
 
 from google.genai import types
-from rich import print as rprint
-from rich.syntax import Syntax
 
 from core.mcp.mcp_connect import MCPConnector
 
@@ -32,7 +50,7 @@ class HostAgent:
     - Routes the user query by picking the correct agent/tool
     """
 
-    def __init__(self):
+    def __init__(self, trace_sink: TraceSink = None, artifact_store: ArtifactStore = None):
         self.system_instruction = load_instructions_file("agents/host_agent/instructions.txt")
         self.description = load_instructions_file("agents/host_agent/description.txt")
         
@@ -42,14 +60,25 @@ class HostAgent:
         self._agent = None
         self._user_id = "host_agent_user"
         self._runner = None
+        self.history_compactor = create_history_compactor()
+        self.router = create_fast_path_router("agents/host_agent/routes.json")
+        self.trace_sink = trace_sink or create_trace_sink()
+        self.spans = AgentSpanCallbacks()
+        # Files of delegated agents, relayed to our caller without entering the LLM context
+        self.artifact_store = artifact_store or create_artifact_store()
 
     async def create(self):
         self._agent = await self._build_agent()
+        self.session_service = create_session_service(self._agent.name)
+        register_metrics(f"{self._agent.name}.sessions", self.session_service.stats)
+        register_metrics(f"{self._agent.name}.history", self.history_compactor.stats)
+        register_metrics(f"{self._agent.name}.routing", self.router.stats)
+        register_metrics(f"{self._agent.name}.artifacts", self.artifact_store.stats)
         self._runner = Runner(
             app_name=self._agent.name,
             agent=self._agent,
             artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
+            session_service=self.session_service,
             memory_service=InMemoryMemoryService(),
         )
 
@@ -80,7 +109,36 @@ class HostAgent:
         
         connector = AgentConnector(agent_card=matched_card)
 
-        return await connector.send_task(message=message, session_id=str(uuid4()))
+        if not (matched_card.capabilities and matched_card.capabilities.streaming):
+            return await connector.send_task(message=message, session_id=str(uuid4()))
+
+        # Stream the child task so its progress reaches our caller while it runs
+        report_progress(f"Delegating to {matched_card.name}...", agent=matched_card.name)
+        final_response = "No response from agent"
+        received = 0
+        reported = 0
+        files = ArtifactAssembler()
+        async for update in connector.stream_task(message=message, session_id=str(uuid4())):
+            ref = ArtifactRef.from_metadata(update.get('metadata')) if update['kind'] == 'artifact' else None
+            if ref is not None:
+                # Files are stored and passed on by reference; their content stays out of our context
+                assembled = files.add(update)
+                if assembled is not None:
+                    ref, content = assembled
+                    if content is not None:
+                        ref = self.artifact_store.put(content, ref.name, ref.mime_type)
+                    report_progress(f"{matched_card.name} created {ref.name} ({ref.size} bytes)", agent=matched_card.name, artifact=ref.to_metadata())
+            elif update['kind'] == 'artifact':
+                received += len(update['text'])
+                if received - reported >= 1024:
+                    reported = received
+                    report_progress(f"{matched_card.name} has generated {received} characters...", agent=matched_card.name)
+            elif update['final']:
+                final_response = update['text'] or final_response
+            elif update['text']:
+                report_progress(f"{matched_card.name}: {update['text']}", agent=matched_card.name)
+
+        return final_response
 
                 
     
@@ -90,16 +148,63 @@ class HostAgent:
 
         return LlmAgent(
             name="host_agent",
-            model="gemini-2.5-flash",
+            model=create_model("gemini-2.5-flash"),
             instruction=self.system_instruction,
             description=self.description,
             tools=[
                 FunctionTool(self._delgate_task),
                 FunctionTool(self._list_agents),
                 *mcp_tools
-            ]
+            ],
+            # Elide old tool output and summarise old turns so prompts stay within budget
+            before_model_callback=[self.history_compactor.before_model_callback, self.spans.before_model],
+            after_model_callback=[self.spans.after_model, self.history_compactor.after_model_callback],
+            on_model_error_callback=self.spans.on_model_error,
+            before_tool_callback=self.spans.before_tool,
+            after_tool_callback=self.spans.after_tool,
+            on_tool_error_callback=self.spans.on_tool_error,
         )
     
+    def cache_fingerprint(self) -> str:
+        """
+        Fingerprint of everything besides the query that shapes responses,
+        used to key the executor's response cache.
+        """
+        return fingerprint(
+            self._agent.model,
+            self.system_instruction,
+            sorted(getattr(tool, "name", type(tool).__name__) for tool in self._agent.tools),
+        )
+
+    async def has_history(self, session_id: str) -> bool:
+        """
+        Whether the session already has turns, i.e. a response may depend on more than the query.
+        """
+        session = await self.session_service.get_session(
+            app_name=self._agent.name,
+            session_id=session_id,
+            user_id=self._user_id,
+        )
+        return bool(session and session.events)
+
+    async def remember_turn(self, query: str, session_id: str, response: str) -> None:
+        """
+        Record a turn that was answered without running the agent (e.g. from a cache).
+        """
+        session = await self.session_service.get_session(
+            app_name=self._agent.name,
+            session_id=session_id,
+            user_id=self._user_id,
+        )
+        if not session:
+            session = await self.session_service.create_session(
+                app_name=self._agent.name,
+                session_id=session_id,
+                user_id=self._user_id,
+            )
+        user_content = types.Content(role="user", parts=[types.Part.from_text(text=query)])
+        await self._append_turn(session, user_content, response)
+
     async def invoke(self, query: str, session_id: str) -> AsyncIterable[dict]:
         """
         Invoke the agent
@@ -107,8 +212,11 @@ class HostAgent:
 
         {
             'is_task_complete': bool,  # Indicates if the task is complete
-            'updates': str,  # Updates on the task progress
-            'content': str  # Final result of the task if complete
+            'kind': str,  # 'text_delta', 'tool_call', 'tool_result' or 'progress' for updates
+            'updates': str,  # Updates on the task progress (a text chunk for 'text_delta')
+            'content': str,  # Final result of the task if complete
+            'artifacts': list[ArtifactRef],  # Files created by delegated agents, with the final result
+            'cacheable': bool  # False if the final result must not be served from a cache
         }
         
         """
@@ -132,15 +240,33 @@ class HostAgent:
             parts = [types.Part.from_text(text=query)]
         )
 
-        async for event in self._runner.run_async(
+        # Direct commands are executed without an LLM turn
+        handled = False
+        async for update in self._invoke_fast_path(query, session, user_content):
+            handled = True
+            yield update
+        if handled:
+            return
+
+        events = self._runner.run_async(
             user_id=self._user_id,
             session_id=session_id,
-            new_message=user_content
-        ):
-            print_json_response(event, "================ NEW EVENT ================")
-            
-            print(f"is_final_response: {event.is_final_response()}")    
-            
+            new_message=user_content,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        )
+
+        artifacts = []
+        # Turns that ran tools or delegated have side effects and are not replayed from the cache
+        used_tools = False
+        async for kind, event in stream_with_progress(events):
+            if kind == "progress":
+                used_tools = True
+                _collect_artifact(event, artifacts)
+                yield _progress_update(event)
+                continue
+
+            self.trace_sink.emit("host_agent event", event)
+
             if event.is_final_response():
                 
                 final_response = ""
@@ -149,27 +275,140 @@ class HostAgent:
                 
                 yield {
                     'is_task_complete': True,
-                    'content': final_response
+                    'content': final_response,
+                    'artifacts': artifacts,
+                    'cacheable': not used_tools,
                 }
             else:
-                yield {
-                    'is_task_complete': False,
-                    'updates': "Agent is processing your request..."
-                }
+                used_tools = used_tools or bool(event.get_function_calls() or event.get_function_responses())
+                for update in event_updates(event):
+                    yield update
+
+    async def _invoke_fast_path(self, query: str, session, user_content: types.Content) -> AsyncIterable[dict]:
+        """
+        Run `query` through the fast-path router. Yields nothing when no
+        route applies, in which case the caller falls through to the LLM.
+        """
+        started = time.perf_counter()
+        try:
+            match = self.router.match(query)
+        except RouteError as e:
+            self.router.record("errors")
+            yield {'is_task_complete': True, 'content': str(e), 'cacheable': False}
+            return
+
+        if match is None or not await self._can_route(match):
+            self.router.record("llm")
+            return
+
+        async def run():
+            yield await self._run_route(match, session)
+
+        result = None
+        artifacts = []
+        async for kind, item in stream_with_progress(run()):
+            if kind == "progress":
+                _collect_artifact(item, artifacts)
+                yield _progress_update(item)
+            else:
+                result = item
+
+        self.router.record("fast_path", route=match.route, seconds=time.perf_counter() - started)
+
+        # Keep the exchange in the session so later LLM turns see it
+        await self._append_turn(session, user_content, result)
+
+        yield {
+            'is_task_complete': True,
+            'content': result,
+            'artifacts': artifacts,
+            'cacheable': False,  # tools and delegations have side effects
+        }
+
+    async def _append_turn(self, session, user_content: types.Content, response: str) -> None:
+        invocation_id = new_invocation_context_id()
+        await self.session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=user_content,
+        ))
+        await self.session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author=self._agent.name,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=response)]),
+        ))
+
+    async def _can_route(self, match: RouteMatch) -> bool:
+        # Structured commands always run (and report their own errors);
+        # pattern routes only when their target exists
+        if match.explicit:
+            return True
+        if match.action == "delegate":
+            cards = await self.AgentDiscovery.list_agent_cards()
+            name = match.arguments["agent_name"].lower()
+            return any(card.name.lower() == name for card in cards)
+        if match.action == "tool":
+            return await self._find_tool(match.arguments["tool"]) is not None
+        return True
+
+    async def _run_route(self, match: RouteMatch, session) -> str:
+        if match.action == "list_agents":
+            return json.dumps(await self._list_agents(), indent=2)
+
+        if match.action == "delegate":
+            return await self._delgate_task(**match.arguments)
+
+        tool = await self._find_tool(match.arguments["tool"])
+        if tool is None:
+            return f"Tool not found: {match.arguments['tool']}"
+
+        invocation_context = InvocationContext(
+            session_service=self.session_service,
+            invocation_id=new_invocation_context_id(),
+            agent=self._agent,
+            session=session,
+        )
+        try:
+            result = await tool.run_async(
+                args=match.arguments["arguments"],
+                tool_context=ToolContext(invocation_context),
+            )
+        except Exception as e:
+            return f"Tool {tool.name} failed: {e}"
+        return _format_tool_result(result)
+
+    async def _find_tool(self, name: str) -> BaseTool | None:
+        for tool in self._agent.tools:
+            if isinstance(tool, BaseToolset):
+                for child in await tool.get_tools():
+                    if child.name == name:
+                        return child
+            elif isinstance(tool, BaseTool) and tool.name == name:
+                return tool
+        return None
+
+
+def _progress_update(progress: dict) -> dict:
+    return {
+        'is_task_complete': False,
+        'kind': 'progress',
+        'agent': progress.get('agent'),
+        'updates': progress['message'],
+    }
+
+
+def _collect_artifact(progress: dict, artifacts: list[ArtifactRef]) -> None:
+    ref = ArtifactRef.from_metadata(progress.get('artifact'))
+    if ref is not None and ref not in artifacts:
+        artifacts.append(ref)
+
 
-def print_json_response(response: Any, title: str) -> None:
-    # Displays a formatted and color-highlighted view of the response
-    print(f"\n=== {title} ===")  # Section title for clarity
-    try:
-        if hasattr(response, "root"):  # Check if response is wrapped by SDK
-            data = response.root.model_dump(mode="json", exclude_none=True)
-        else:
-            data = response.model_dump(mode="json", exclude_none=True)
-
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)  # Convert dict to pretty JSON string
-        syntax = Syntax(json_str, "json", theme="monokai", line_numbers=False)  # Apply syntax highlighting
-        rprint(syntax)  # Print it with color
-    except Exception as e:
-        # Print fallback text if something fails
-        rprint(f"[red bold]Error printing JSON:[/red bold] {e}")
-        rprint(repr(response))
\ No newline at end of file
+def _format_tool_result(result: Any) -> str:
+    # MCP tools return a CallToolResult dump; show its text content as is
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        texts = [item.get("text") for item in result["content"] if isinstance(item, dict) and item.get("text")]
+        if texts:
+            return "\n".join(texts)
+    if isinstance(result, str):
+        return result
+    return json.dumps(result, indent=2, default=str)
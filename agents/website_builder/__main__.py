@@ -1,3 +1,8 @@
+from core.common.startup_profile import StartupProfile
+
+# Created before the imports below so they are part of the profile
+profile = StartupProfile("website_builder_simple")
+
 import uvicorn
 
 from a2a.types import AgentSkill, AgentCard, AgentCapabilities
@@ -5,16 +10,19 @@ import click
 from a2a.server.request_handlers import DefaultRequestHandler
 
 from agents.website_builder.agent_executor import WebsiteBuilderSimpleAgentExecutor  # Changed this line
-from a2a.server.tasks import InMemoryTaskStore
+from core.a2a.task_store import create_task_store
 from a2a.server.apps import A2AStarletteApplication
+from core.common.metrics import mount_metrics, register_metrics
+from core.common.tracing import configure_tracing
 
 @click.command()
 @click.option('--host', default='localhost', help='Host for the agent server')
 @click.option('--port', default=10000, help='Port for the agent server')
+@click.option('--task-store', default=None, help='Task store: memory or sqlite[:path] (defaults to $TASK_STORE)')
 
 
-def main(host: str, port: int):
-    
+def main(host: str, port: int, task_store: str):
+    profile.mark("imports")
     skill=AgentSkill(
      id="website_builder",
      name="Website Builder",
@@ -36,9 +44,17 @@ def main(host: str, port: int):
         skills=[skill],
         capabilities=AgentCapabilities(streaming=True),
        )
+    register_metrics("website_builder_simple.tracing", configure_tracing("website_builder_simple").stats)
+    agent_executor = WebsiteBuilderSimpleAgentExecutor()
+    profile.mark("agent")
+
+    tasks = create_task_store("website_builder_simple", task_store)
+    register_metrics("website_builder_simple.tasks", tasks.stats)
+    profile.mark("task_store")
+
     request_handler = DefaultRequestHandler(
-          agent_executor=WebsiteBuilderSimpleAgentExecutor(),  # Changed this line
-        task_store=InMemoryTaskStore()
+          agent_executor=agent_executor,
+        task_store=tasks
         )
 
     server = A2AStarletteApplication(
@@ -46,7 +62,13 @@ def main(host: str, port: int):
         http_handler=request_handler
         )
 
-    uvicorn.run(server.build(), host=host, port=port)
+    app = server.build()
+    mount_metrics(app)
+    register_metrics("website_builder_simple.startup", profile.stats)
+    profile.attach(app)
+    profile.mark("app")
+
+    uvicorn.run(app, host=host, port=port)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
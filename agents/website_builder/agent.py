@@ -1,19 +1,29 @@
 
 
+from agents.website_builder.site_builder import create_parallel_site_builder, site_markdown
 from core.common.file_loader import load_instructions_file
+from core.common.agent_stream import event_updates
+from core.common.artifact_store import FILE_TYPES, create_artifact_store, externalize_code_blocks
+from core.common.history_compaction import create_history_compactor
+from core.common.metrics import register_metrics
+from core.common.model_backend import create_model
+from core.common.response_cache import fingerprint
+from core.common.session_store import create_session_service
+from core.common.tracing import AgentSpanCallbacks
 from collections.abc import AsyncIterable
+# Imported at module load on purpose, as in agents/host_agent/agent.py: the agent
+# is built before the server serves its card, so a lazy import would not start it sooner.
 from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk import Runner
 
 from google.adk.artifacts import InMemoryArtifactService
-from google.adk.sessions import InMemorySessionService
+from google.adk.events import Event
+from google.adk.agents.invocation_context import new_invocation_context_id
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 
 from google.genai import types
 
-from rich import print as rprint
-from rich.syntax import Syntax
-
 import json
 from typing import Any
 from dotenv import load_dotenv
@@ -27,13 +37,23 @@ class WebsiteBuilderSimple:
       def __init__(self):
           self.system_instruction = load_instructions_file('agents/website_builder/instructions.txt', default="You are a helpful website builder agent.")
           self.description = load_instructions_file('agents/website_builder/description.txt', default="A simple website builder agent.")
+          self.history_compactor=create_history_compactor()
+          self.spans=AgentSpanCallbacks()
           self.agent=self._build_agent()
-          self.user_id="website_builder_user",
+          self._user_id="website_builder_user"
+          self.session_service=create_session_service(self.agent.name)
+          self.artifact_store=create_artifact_store()
+          self.site_builder=create_parallel_site_builder(self.agent.model)
+          register_metrics(f"{self.agent.name}.sessions", self.session_service.stats)
+          register_metrics(f"{self.agent.name}.artifacts", self.artifact_store.stats)
+          register_metrics(f"{self.agent.name}.history", self.history_compactor.stats)
+          if self.site_builder is not None:
+              register_metrics(f"{self.agent.name}.site_builder", self.site_builder.stats)
           self._runner=Runner(
             app_name=self.agent.name,
             agent=self.agent,
             artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
+            session_service=self.session_service,
             memory_service=InMemoryMemoryService(),
           )
       
@@ -41,12 +61,62 @@ class WebsiteBuilderSimple:
            return LlmAgent(
              
               name="website_builder_simple",
-              model="gemini-2.5-flash",
+              model=create_model("gemini-2.5-flash"),
               instruction=self.system_instruction,
               description=self.description,
+              before_model_callback=[self.history_compactor.before_model_callback, self.spans.before_model],
+              after_model_callback=[self.spans.after_model, self.history_compactor.after_model_callback],
+              on_model_error_callback=self.spans.on_model_error,
            )
           
       
+      def cache_fingerprint(self) -> str:
+            """
+            Fingerprint of the model and instructions, used to key the executor's response cache.
+            """
+            parts = [self.agent.model, self.system_instruction]
+            if self.site_builder is not None:
+                parts += [self.site_builder.planner_instruction, self.site_builder.page_instruction]
+            return fingerprint(*parts)
+
+      async def has_history(self, session_id: str) -> bool:
+            """
+            Whether the session already has turns, i.e. a response may depend on more than the query.
+            """
+            session = await self.session_service.get_session(
+                app_name=self.agent.name,
+                session_id=session_id,
+                user_id=self._user_id,
+            )
+            return bool(session and session.events)
+
+      async def remember_turn(self, query: str, session_id: str, response: str) -> None:
+            """
+            Record a turn that was answered without running the agent (e.g. from a cache).
+            """
+            session = await self.session_service.get_session(
+                app_name=self.agent.name,
+                session_id=session_id,
+                user_id=self._user_id,
+            )
+            if not session:
+                session = await self.session_service.create_session(
+                    app_name=self.agent.name,
+                    session_id=session_id,
+                    user_id=self._user_id,
+                )
+            invocation_id = new_invocation_context_id()
+            await self.session_service.append_event(session, Event(
+                invocation_id=invocation_id,
+                author="user",
+                content=types.Content(role="user", parts=[types.Part.from_text(text=query)]),
+            ))
+            await self.session_service.append_event(session, Event(
+                invocation_id=invocation_id,
+                author=self.agent.name,
+                content=types.Content(role="model", parts=[types.Part.from_text(text=response)]),
+            ))
+
       async def invoke(self , query:str ,session_id: str) -> AsyncIterable[dict[str,Any]]:
             """
            Invokes the website builder agent with the given query and context ID.
@@ -57,6 +127,10 @@ class WebsiteBuilderSimple:
            
            Yields:
                AsyncIterable[dict[str,Any]]: An asynchronous iterable of results from the agent.
+               The final result lists the generated pages under 'artifacts'; its
+               content refers to them instead of including their markup. Sites
+               planned as several pages are generated in parallel, and each page
+               is reported with kind 'artifact' as soon as it is done.
           """
             session = await self._runner.session_service.get_session(
                app_name=self.agent.name,
@@ -71,7 +145,16 @@ class WebsiteBuilderSimple:
                       user_id=self._user_id,
                     
                 )
-                
+
+            # New multi-page sites are generated page by page in parallel
+            if self.site_builder is not None and not session.events and self.site_builder.may_need_several_pages(query):
+                yield {'is_task_complete': False, 'kind': 'progress', 'updates': 'Planning the site...'}
+                plan = await self.site_builder.plan(query)
+                if plan is not None:
+                    async for update in self._build_site(query, session_id, plan):
+                        yield update
+                    return
+
             user_content = types.Content(
             role="user",
             parts = [types.Part.from_text(text=query)]
@@ -79,25 +162,50 @@ class WebsiteBuilderSimple:
             async for event in self._runner.run_async(
                user_id=self._user_id,
                session_id=session_id,
-            new_message=user_content
+               new_message=user_content,
+               run_config=RunConfig(streaming_mode=StreamingMode.SSE),
                   ):
                 
-                
-            # print_json_response(event, "================ NEW EVENT ================")
-            
-            # print(f"is_final_response: {event.is_final_response()}")    
-            
               if event.is_final_response():
                 final_response = ""
                 if event.content and event.content.parts and event.content.parts[-1].text:
                     final_response = event.content.parts[-1].text
                 
+                # Pages go to the artifact store and are sent as artifacts
+                content, artifacts = externalize_code_blocks(final_response, self.artifact_store)
                 yield {
                     'is_task_complete': True,
-                    'content': final_response
+                    'content': content,
+                    'artifacts': artifacts
                 }
               else:
+                # Partial text chunks and tool calls, as they are generated
+                for update in event_updates(event):
+                    yield update
+
+      async def _build_site(self, query: str, session_id: str, plan) -> AsyncIterable[dict[str,Any]]:
+            total = len(plan.pages) + 1
+            yield {'is_task_complete': False, 'kind': 'progress', 'updates': f"Building {plan.title}: {total} files in parallel..."}
+
+            files = {}
+            refs = {}
+            async for name, content in self.site_builder.build(query, plan):
+                files[name] = content
+                extension = name.rsplit(".", 1)[-1]
+                refs[name] = self.artifact_store.put(content, name, FILE_TYPES[extension][1])
                 yield {
                     'is_task_complete': False,
-                    'updates': "Agent is processing your request..."
-                }
\ No newline at end of file
+                    'kind': 'artifact',
+                    'artifact': refs[name],
+                    'updates': f"Generated {name} ({len(files)}/{total})",
+                }
+
+            # Pages first, in plan order, then the stylesheet
+            order = [page.name for page in plan.pages] + ["styles.css"]
+            artifacts = [refs[name] for name in order]
+            await self.remember_turn(query, session_id, site_markdown({name: files[name] for name in order}))
+            yield {
+                'is_task_complete': True,
+                'content': f"Built {plan.title} ({len(plan.pages)} pages):\n" + "\n".join(ref.describe() for ref in artifacts),
+                'artifacts': artifacts
+            }
@@ -1,72 +1,20 @@
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.server.tasks import TaskUpdater
-
 from agents.website_builder.agent import WebsiteBuilderSimple
-from a2a.utils import (
-    new_task,
-    new_agent_text_message
-)
-
-from a2a.utils.errors import ServerError
+from core.a2a.base_executor import BaseAgentExecutor
+from core.common.admission import AdmissionController
+from core.common.response_cache import ResponseCache
 
-from a2a.types import (
-    Task,
-    TaskState,
-    UnsupportedOperationError
-)
 
-import asyncio
-
-class WebsiteBuilderSimpleAgentExecutor(AgentExecutor):
+class WebsiteBuilderSimpleAgentExecutor(BaseAgentExecutor):
     """
     Implements the AgentExecutor interface to integrate the 
     website builder simple agent with the A2A framework.
     """
 
-    def __init__(self):
-        self.agent = WebsiteBuilderSimple()
-    
-    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
-        """
-        Executes the agent with the provided context and event queue.
-        """
-        query = context.get_user_input()
-        task = context.current_task
-        if not task:
-            task = new_task(context.message)
-            await event_queue.enqueue_event(task)
-
-        updater = TaskUpdater(event_queue, task.id, task.contextId)
-        
-        try:
-            async for item in self.agent.invoke(query, task.contextId):
-                is_task_complete = item.get("is_task_complete", False)
-
-                if not is_task_complete:
-                    message = item.get('updates','The Agent is still working on your request.')
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(message, task.contextId, task.id)
-                    )
-                else:
-                    final_result = item.get('content','no result received')
-                    await updater.update_status(
-                        TaskState.completed,
-                        new_agent_text_message(final_result, task.contextId, task.id)
-                    )
-
-                    await asyncio.sleep(0.1)  # Allow time for the message to be processed
-
-                    break
-        except Exception as e:
-            error_message = f"An error occurred: {str(e)}"
-            await updater.update_status(
-                TaskState.failed,
-                new_agent_text_message(error_message, task.contextId, task.id)
-            )
-            raise
+    def __init__(self, response_cache: ResponseCache = None, admission: AdmissionController = None):
+        agent = WebsiteBuilderSimple()
+        super().__init__(agent, response_cache=response_cache, admission=admission, artifact_store=agent.artifact_store)
+        self.register_metrics()
 
-    async def cancel(self, request: RequestContext, event_queue: EventQueue) -> Task | None:
-        raise ServerError(error=UnsupportedOperationError())
-    
\ No newline at end of file
+    @property
+    def agent_name(self) -> str:
+        return self.agent.agent.name
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import re
+import time
+from collections.abc import AsyncIterable
+from typing import Any, Optional
+from uuid import uuid4
+
+from google.adk import Runner
+from google.adk.agents import LlmAgent
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel, Field, ValidationError
+
+from core.common.file_loader import load_instructions_file
+from core.common.tracing import AgentSpanCallbacks
+
+_FENCED = re.compile(r"```[\w+-]*[^\n]*\n(?P<body>.*?)```", re.DOTALL)
+
+# Wording that suggests a request may need several pages; anything else is
+# built in one turn without asking the planner
+_MULTI_PAGE_HINT = re.compile(
+    r"\b(web ?)?sites?\b|\bpages\b|\bmulti-?page\b",
+    re.IGNORECASE,
+)
+_PAGE_NAMES = re.compile(
+    r"\b(home|about|contact|pricing|blog|faq|portfolio|services|team|gallery|shop|careers)\b",
+    re.IGNORECASE,
+)
+
+
+class PagePlan(BaseModel):
+    name: str = Field(description="File name of the page, e.g. index.html")
+    title: str = Field(description="Page title, also used as its navigation label")
+    description: str = Field(description="What the page contains")
+
+
+class SitePlan(BaseModel):
+    title: str = Field(description="Name of the site")
+    style_guide: str = Field(description="Colours, fonts, layout and the CSS class names shared by all pages")
+    pages: list[PagePlan] = Field(description="The pages of the site, home page first")
+
+
+class ParallelSiteBuilder:
+    """
+    Builds multi-page sites with one LLM call per page instead of one long turn.
+
+    A planner call splits the request into pages and a shared style guide.
+    The stylesheet and every page are then generated concurrently, at most
+    `max_concurrent` at a time, and each page is given the same navigation
+    and a link to the shared `styles.css`. Files are yielded as soon as they
+    are ready.
+
+    Only requests worded like a site or several pages (see
+    `may_need_several_pages`) are sent to the planner, so single pages,
+    the usual case, still take a single LLM call.
+
+    Args:
+        model (str): Model used for planning and generation.
+        max_concurrent (int): LLM calls running at once.
+        max_pages (int): Upper bound on the number of planned pages.
+    """
+
+    def __init__(self, model: str = "gemini-2.5-flash", max_concurrent: int = 4, max_pages: int = 8):
+        self.max_concurrent = max_concurrent
+        self.max_pages = max_pages
+        self.planner_instruction = load_instructions_file(
+            "agents/website_builder/planner_instructions.txt",
+            default="Split the website request into pages. Use a single page unless several are clearly needed.",
+        )
+        self.page_instruction = load_instructions_file(
+            "agents/website_builder/page_instructions.txt",
+            default="You write one file of a website. Reply with only the file content.",
+        )
+
+        self.spans = AgentSpanCallbacks()
+        self.planner = LlmAgent(
+            name="website_planner",
+            model=model,
+            instruction=self.planner_instruction,
+            output_schema=SitePlan,
+            before_model_callback=self.spans.before_model,
+            after_model_callback=self.spans.after_model,
+            on_model_error_callback=self.spans.on_model_error,
+        )
+        self.writer = LlmAgent(
+            name="website_page_writer",
+            model=model,
+            instruction=self.page_instruction,
+            before_model_callback=self.spans.before_model,
+            after_model_callback=self.spans.after_model,
+            on_model_error_callback=self.spans.on_model_error,
+        )
+        self._session_service = InMemorySessionService()
+        self._runners = {
+            agent.name: Runner(app_name=agent.name, agent=agent, session_service=self._session_service)
+            for agent in (self.planner, self.writer)
+        }
+        self._counters = {"plans": 0, "single_page": 0, "sites": 0, "files": 0}
+        self._timings = {"plan_seconds": 0.0, "build_seconds": 0.0}
+
+    @staticmethod
+    def may_need_several_pages(query: str) -> bool:
+        """
+        Cheap check, without a model call, of whether planning `query` is
+        worthwhile: it mentions a site or pages, or names two or more
+        common pages (e.g. "about" and "contact").
+        """
+        if _MULTI_PAGE_HINT.search(query):
+            return True
+        return len({name.lower() for name in _PAGE_NAMES.findall(query)}) >= 2
+
+    async def plan(self, query: str) -> Optional[SitePlan]:
+        """
+        Ask the planner how to split a request.
+
+        Returns:
+            SitePlan | None: The plan, or None when the request is a single
+            page (or could not be planned) and is better built in one turn.
+        """
+        started = time.perf_counter()
+        text = await self._generate(self.planner, query)
+        self._counters["plans"] += 1
+        self._timings["plan_seconds"] += time.perf_counter() - started
+
+        try:
+            plan = SitePlan.model_validate_json(_strip_fence(text))
+        except ValidationError:
+            plan = None
+        if plan is None or len(plan.pages) < 2:
+            self._counters["single_page"] += 1
+            return None
+
+        plan.pages = _unique_pages(plan.pages[: self.max_pages])
+        return plan
+
+    async def build(self, query: str, plan: SitePlan) -> AsyncIterable[tuple[str, str]]:
+        """
+        Generate the stylesheet and pages of `plan` concurrently.
+
+        Yields:
+            tuple[str, str]: (file name, content) of each file as soon as it is done.
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        navigation = _navigation(plan)
+
+        async def generate(name: str, prompt: str) -> tuple[str, str]:
+            async with semaphore:
+                content = _strip_fence(await self._generate(self.writer, prompt))
+            if name.endswith(".html"):
+                content = _assemble_page(content, navigation)
+            return name, content
+
+        jobs = [asyncio.create_task(generate("styles.css", _stylesheet_prompt(query, plan, navigation)))]
+        jobs += [
+            asyncio.create_task(generate(page.name, _page_prompt(query, plan, page, navigation)))
+            for page in plan.pages
+        ]
+        try:
+            for job in asyncio.as_completed(jobs):
+                name, content = await job
+                self._counters["files"] += 1
+                yield name, content
+        finally:
+            for job in jobs:
+                job.cancel()
+
+        self._counters["sites"] += 1
+        self._timings["build_seconds"] += time.perf_counter() - started
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Plan and build counters with average durations.
+        """
+        plans = self._counters["plans"]
+        sites = self._counters["sites"]
+        return {
+            "max_concurrent": self.max_concurrent,
+            **self._counters,
+            "avg_plan_seconds": round(self._timings["plan_seconds"] / plans, 3) if plans else None,
+            "avg_build_seconds": round(self._timings["build_seconds"] / sites, 3) if sites else None,
+        }
+
+    async def _generate(self, agent: LlmAgent, prompt: str) -> str:
+        # Each call is independent and runs in a throwaway session
+        session = await self._session_service.create_session(
+            app_name=agent.name, user_id="site_builder", session_id=uuid4().hex
+        )
+        text = ""
+        try:
+            async for event in self._runners[agent.name].run_async(
+                user_id=session.user_id,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=prompt)]),
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+        finally:
+            await self._session_service.delete_session(
+                app_name=agent.name, user_id=session.user_id, session_id=session.id
+            )
+        return text
+
+
+def _strip_fence(text: str) -> str:
+    match = _FENCED.search(text)
+    return (match.group("body") if match else text).strip()
+
+
+def _unique_pages(pages: list[PagePlan]) -> list[PagePlan]:
+    seen = set()
+    for index, page in enumerate(pages):
+        name = os.path.basename(page.name.strip()) or f"page-{index + 1}.html"
+        if not name.endswith(".html"):
+            name += ".html"
+        if name in seen or name == "styles.css":
+            name = f"page-{index + 1}.html"
+        seen.add(name)
+        page.name = name
+    return pages
+
+
+def _navigation(plan: SitePlan) -> str:
+    links = "".join(f'<a href="{page.name}">{page.title}</a>' for page in plan.pages)
+    return f'<nav class="site-nav">{links}</nav>'
+
+
+def _stylesheet_prompt(query: str, plan: SitePlan, navigation: str) -> str:
+    return (
+        f"Request: {query}\n"
+        f"Site: {plan.title}\n"
+        f"Style guide: {plan.style_guide}\n"
+        f"Pages: {', '.join(page.title for page in plan.pages)}\n"
+        f"Every page starts its body with this navigation: {navigation}\n\n"
+        "Write styles.css, the stylesheet shared by all pages. Reply with only the CSS."
+    )
+
+
+def _page_prompt(query: str, plan: SitePlan, page: PagePlan, navigation: str) -> str:
+    return (
+        f"Request: {query}\n"
+        f"Site: {plan.title}\n"
+        f"Style guide: {plan.style_guide}\n\n"
+        f"Write {page.name} ({page.title}): {page.description}\n"
+        'Link the shared stylesheet with <link rel="stylesheet" href="styles.css"> and do not inline CSS. '
+        f"Start the body with exactly this navigation: {navigation}\n"
+        "Reply with only the complete HTML document."
+    )
+
+
+def _assemble_page(html: str, navigation: str) -> str:
+    """
+    Make sure a generated page links the shared stylesheet and carries the
+    shared navigation, whatever the model did with the instructions.
+    """
+    if 'href="styles.css"' not in html:
+        link = '<link rel="stylesheet" href="styles.css">'
+        if "</head>" in html:
+            html = html.replace("</head>", f"  {link}\n</head>", 1)
+        else:
+            html = f"{link}\n{html}"
+
+    if 'class="site-nav"' not in html:
+        body = re.search(r"<body[^>]*>", html)
+        if body:
+            html = f"{html[:body.end()]}\n{navigation}{html[body.end():]}"
+        else:
+            html = f"{navigation}\n{html}"
+    return html
+
+
+def site_markdown(files: dict[str, str]) -> str:
+    """
+    Format generated files the way the single-turn builder answers, one
+    named code block per file.
+    """
+    blocks = []
+    for name, content in files.items():
+        language = "css" if name.endswith(".css") else "html"
+        blocks.append(f"**{name}**\n```{language} {name}\n{content}\n```")
+    return "\n\n".join(blocks)
+
+
+def create_parallel_site_builder(model: str) -> Optional[ParallelSiteBuilder]:
+    """
+    Build the parallel site builder from environment variables:
+
+    - WEBSITE_PARALLEL_PAGES: "0" to build every site in a single turn (default "1")
+    - WEBSITE_MAX_CONCURRENT_PAGES: pages generated at once (default 4)
+    - WEBSITE_MAX_PAGES: most pages a plan may have (default 8)
+
+    Returns:
+        ParallelSiteBuilder | None: The builder, or None if disabled.
+    """
+    if os.environ.get("WEBSITE_PARALLEL_PAGES", "1") == "0":
+        return None
+    return ParallelSiteBuilder(
+        model=model,
+        max_concurrent=int(os.environ.get("WEBSITE_MAX_CONCURRENT_PAGES", "4")),
+        max_pages=int(os.environ.get("WEBSITE_MAX_PAGES", "8")),
+    )
@@ -1,4 +1,12 @@
 import asyncio
+import hashlib
+import json
+import os
+import signal
+import sys
+import time
+from collections.abc import Iterator
+from typing import Any, TextIO
 from uuid import uuid4
 from a2a.client import A2ACardResolver
 from a2a.types import (
@@ -8,41 +16,254 @@ import asyncclick as click
 import httpx
 
 from core.a2a.agent_connect import AgentConnector
+from core.common.artifact_store import ArtifactAssembler, ArtifactRef
+from core.common.tracing import configure_tracing, tracer
 
 
 @click.command()
 @click.option("--agent", default="http://127.0.0.1:10001", help="Base URL of the A2A agent server")
 @click.option("--session", default=0, help="Session ID (use 0 to generate a new one)")
-async def cli(agent: str, session: str):
+@click.option("--batch", default=None, help="Send the prompts of a JSONL file ('-' for stdin) instead of prompting")
+@click.option("--concurrency", default=4, help="Batch requests in flight at once")
+@click.option("--output", default="-", help="Batch results as JSONL ('-' for stdout)")
+@click.option("--save-dir", default="sites", help="Directory where generated files are saved, per session")
+async def cli(agent: str, session: str, batch: str, concurrency: int, output: str, save_dir: str):
     """
     CLI to send user messages to an A2A agent using an A2A client
     and display the responses
     """
 
     session_id = uuid4().hex if str(session) == "0" else session
+    # Every request starts a trace; TRACE_SINK=jsonl records it (see `main.py traces`)
+    configure_tracing("cli")
 
+    # One card lookup and one connection pool for the whole run
+    limits = httpx.Limits(max_connections=max(concurrency, 1), max_keepalive_connections=max(concurrency, 1))
+    async with httpx.AsyncClient(timeout=300.0, limits=limits) as httpx_client:
+        with tracer().span("cli.discover_card", agent=agent):
+            card: AgentCard = await A2ACardResolver(
+                base_url=agent.rstrip('/'),
+                httpx_client=httpx_client
+            ).get_agent_card()
+        connector = AgentConnector(card, httpx_client=httpx_client)
+
+        if batch:
+            summary = await run_batch(connector, batch, concurrency, output, None if str(session) == "0" else session, save_dir)
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+            return
+
+        await _interactive(connector, card, session_id, save_dir)
+
+
+async def _interactive(connector: AgentConnector, card: AgentCard, session_id: str, save_dir: str) -> None:
     while True:
         prompt = click.prompt("\nWhat do you want to send to the agent. Type ':q' or 'quit' to exit")
 
         if prompt.strip().lower() in ["quit", ":q"]:
             break
 
-        card: AgentCard = None
+        if not (card.capabilities and card.capabilities.streaming):
+            with tracer().span("cli.request", context_id=session_id) as span:
+                response = await connector.send_task(message=prompt, session_id=session_id)
+            print("\nAgent says:", response)
+            _print_trace(span.trace_id)
+            continue
+
+        # Ctrl+C abandons the request, which cancels the task on the agent
+        request = asyncio.create_task(_stream_response(connector, prompt, session_id, save_dir))
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, request.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass  # Signal handlers are not supported on Windows event loops
+
+        try:
+            response, trace_id = await request
+            print("\nAgent says:", response)
+            _print_trace(trace_id)
+        except asyncio.CancelledError:
+            print("\nRequest cancelled.")
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+
+def read_prompts(source: TextIO) -> Iterator[dict[str, Any]]:
+    """
+    Read batch requests from JSONL: `{"prompt": "...", "session": "...", "id": "..."}`
+    per line, where `session` and `id` are optional. Blank lines are skipped
+    and a line that is not a JSON object is sent as a prompt as is.
+    """
+    for number, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            request = {"prompt": line}
+        request.setdefault("id", str(number))
+        yield request
+
+
+async def run_batch(
+    connector: AgentConnector,
+    source: str,
+    concurrency: int,
+    output: str,
+    session_id: str = None,
+    save_dir: str = None,
+) -> dict[str, Any]:
+    """
+    Send every prompt of `source`, `concurrency` at a time, and write one JSONL
+    result per request to `output` as soon as it finishes:
+
+        {"id", "session", "status", "latency_ms", "first_update_ms", "response", "files", "error", "trace_id"}
+
+    Requests without a `session` each get a new one, unless `session_id` is given.
+    Generated files are saved under `save_dir/<session>/` and listed in
+    `files` with their `path` (None when the agent sent only a reference).
+
+    Returns:
+        dict[str, Any]: Counts per status, throughput and latency percentiles.
+    """
+    from benchmarks.stats import summarize_latencies
+
+    input_file = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    output_file = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    requests = read_prompts(input_file)
+    statuses: dict[str, int] = {}
+    latencies: list[float] = []
+    started = time.perf_counter()
 
-        async with httpx.AsyncClient(timeout=300.0) as httpx_client:
-            resolver = A2ACardResolver(
-                    base_url=agent.rstrip('/'),
-                    httpx_client=httpx_client
-            )
+    reading = asyncio.Lock()
 
-            card = await resolver.get_agent_card()
-        
-        
+    async def next_request():
+        # Reading stdin may block, so it happens off the event loop, one line at a time
+        async with reading:
+            return await asyncio.to_thread(next, requests, None)
+
+    async def worker():
+        while (request := await next_request()) is not None:
+            result = await _send_request(connector, request, request.get("session") or session_id or uuid4().hex, save_dir)
+            statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+            if result["status"] == "completed":
+                latencies.append(result["latency_ms"] / 1000)
+            output_file.write(json.dumps(result) + "\n")
+            output_file.flush()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(statuses.values())
+    return {
+        "requests": total,
+        "statuses": statuses,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 3) if elapsed else None,
+        "latency_ms": summarize_latencies(latencies),
+    }
+
+
+async def _send_request(connector: AgentConnector, request: dict[str, Any], session_id: str, save_dir: str = None) -> dict[str, Any]:
+    with tracer().span("cli.request", request_id=request["id"], context_id=session_id) as span:
+        result = await _send_traced_request(connector, request, session_id, save_dir)
+        span.set(status=result["status"])
+    result["trace_id"] = span.trace_id
+    return result
+
+
+async def _send_traced_request(connector: AgentConnector, request: dict[str, Any], session_id: str, save_dir: str) -> dict[str, Any]:
+    result = {"id": request["id"], "session": session_id, "status": "error", "latency_ms": None,
+              "first_update_ms": None, "response": None, "files": [], "error": None}
+    files = ArtifactAssembler()
+    started = time.perf_counter()
+    try:
+        if not (connector.agent_card.capabilities and connector.agent_card.capabilities.streaming):
+            result["response"] = await connector.send_task(message=request["prompt"], session_id=session_id)
+            result["status"] = "completed"
+        else:
+            async for update in connector.stream_task(message=request["prompt"], session_id=session_id):
+                if result["first_update_ms"] is None:
+                    result["first_update_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                if update['kind'] == 'status' and update['final']:
+                    result["status"] = update['state']
+                    result["response"] = update['text']
+                elif update['kind'] == 'artifact' and (assembled := files.add(update)) is not None:
+                    result["files"].append(_save_file(*assembled, save_dir, session_id))
+            if result["response"] is None:
+                result["error"] = "The stream ended without a final status"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+async def _stream_response(connector: AgentConnector, prompt: str, session_id: str, save_dir: str) -> tuple[str, str]:
+    response = "No response from agent"
+    files = ArtifactAssembler()
+    saved = []
+    with tracer().span("cli.request", context_id=session_id) as span:
+        async for update in connector.stream_task(message=prompt, session_id=session_id):
+            if update['kind'] == 'status' and update['final']:
+                response = update['text'] or response
+            elif update['kind'] == 'artifact' and (assembled := files.add(update)) is not None:
+                saved.append(_save_file(*assembled, save_dir, session_id))
+    if saved:
+        response += "\n\nFiles:\n" + "\n".join(f"  {file['name']}: {file['path'] or file['uri']}" for file in saved)
+    return response, span.trace_id
+
+
+def _save_file(ref: ArtifactRef, content: str | None, save_dir: str, session_id: str) -> dict[str, Any]:
+    """
+    Write a generated file to `save_dir/<session>/<name>`. Session ids (which
+    batch files may set) and names that would leave that directory, e.g.
+    "../x" or absolute paths, are reduced to a safe single path component.
+
+    Returns:
+        dict[str, Any]: name, uri and path of the file (path is None if it
+        was not saved).
+    """
+    file = {"name": ref.name, "uri": ref.uri, "path": None}
+    if content is None or not save_dir:
+        return file
+    root = os.path.abspath(save_dir)
+    directory = os.path.join(root, _path_component(session_id))
+    path = os.path.abspath(os.path.join(directory, ref.name))
+    if not path.startswith(directory + os.sep):
+        path = os.path.join(directory, _path_component(ref.name, fallback=ref.digest))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    file["path"] = path
+    return file
+
+
+def _path_component(value: str, fallback: str = None) -> str:
+    """
+    A single file or directory name for `value`: its base name, or, when
+    that is empty or "..", `fallback` (defaults to a hash of `value`).
+    """
+    name = os.path.basename(value.replace("\\", "/"))
+    if name in ("", ".", ".."):
+        name = fallback or hashlib.sha256(value.encode()).hexdigest()[:16]
+    return name
 
-        connector = AgentConnector(card)
 
-        response = await connector.send_task(message=prompt, session_id=session_id)
-        print("\nAgent says:", response)
+def _print_trace(trace_id: str) -> None:
+    if tracer().recording:
+        print(f"Trace: {trace_id} (python main.py traces --trace {trace_id})")
 
 if __name__ == "__main__":
     asyncio.run(cli())
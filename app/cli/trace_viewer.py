@@ -0,0 +1,162 @@
+import json
+import time
+from collections import defaultdict
+from typing import Any
+
+import click
+
+from benchmarks.stats import percentile
+
+
+def load_spans(path: str) -> list[dict[str, Any]]:
+    """
+    Read the spans from a JSONL trace sink file (see `core.common.trace_sink`),
+    which also holds agent events. Lines that are not complete records
+    (e.g. cut off by a crash) are skipped.
+    """
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or record.get("title") != "span":
+                continue
+            span = record.get("event")
+            if isinstance(span, dict) and span.get("traceId") and span.get("endTimeUnixNano"):
+                spans.append(span)
+    return spans
+
+
+def group_traces(spans: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """
+    Returns:
+        dict[str, list[dict]]: Spans per trace id, each sorted by start time,
+        with the traces in the order they started.
+    """
+    traces: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        traces[span["traceId"]].append(span)
+    for trace in traces.values():
+        trace.sort(key=lambda span: span["startTimeUnixNano"])
+    return dict(sorted(traces.items(), key=lambda item: item[1][0]["startTimeUnixNano"]))
+
+
+def render_trace(trace: list[dict[str, Any]]) -> list[str]:
+    """
+    Lay out one trace as an indented tree: start offset from the beginning
+    of the trace, duration, and self time (duration minus child spans) per
+    span. Spans whose parent was not recorded are shown as roots.
+    """
+    ids = {span["spanId"] for span in trace}
+    children: dict[Any, list[dict[str, Any]]] = defaultdict(list)
+    for span in trace:
+        children[span["parentSpanId"] if span["parentSpanId"] in ids else None].append(span)
+
+    started = trace[0]["startTimeUnixNano"]
+    lines = [f"{'offset':>10} {'duration':>10} {'self':>10}  span"]
+
+    def walk(span: dict[str, Any], depth: int) -> None:
+        nested = children.get(span["spanId"], [])
+        self_ms = max(0.0, span["durationMs"] - sum(child["durationMs"] for child in nested))
+        offset_ms = (span["startTimeUnixNano"] - started) / 1e6
+        status = "" if span["status"] == "ok" else f" !{span['status']}"
+        attributes = " ".join(
+            f"{key}={value}" for key, value in span.get("attributes", {}).items()
+            if value is not None and key not in ("context_id", "task_id")
+        )
+        lines.append(
+            f"{offset_ms:>8.1f}ms {span['durationMs']:>8.1f}ms {self_ms:>8.1f}ms  "
+            f"{'  ' * depth}{span['name']} [{span['service']}]{status} {attributes}".rstrip()
+        )
+        for child in nested:
+            walk(child, depth + 1)
+
+    for root in children[None]:
+        walk(root, 0)
+    return lines
+
+
+def summarize_spans(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Returns:
+        list[dict]: Count, errors, total and p50/p95/max duration in milliseconds
+        per service and span name, by total time.
+    """
+    durations: dict[tuple[str, str], list[float]] = defaultdict(list)
+    errors: dict[tuple[str, str], int] = defaultdict(int)
+    for span in spans:
+        key = (span["service"], span["name"])
+        durations[key].append(span["durationMs"])
+        if span["status"] != "ok":
+            errors[key] += 1
+
+    rows = []
+    for (service, name), values in durations.items():
+        values.sort()
+        rows.append({
+            "service": service,
+            "name": name,
+            "count": len(values),
+            "errors": errors[(service, name)],
+            "total_ms": round(sum(values), 1),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "max_ms": round(values[-1], 1),
+        })
+    return sorted(rows, key=lambda row: -row["total_ms"])
+
+
+@click.command()
+@click.option("--file", "path", default="traces/events.jsonl", help="Trace file written with TRACE_SINK=jsonl[:path]")
+@click.option("--trace", "trace_id", default=None, help="Show the trace with this id (or id prefix)")
+@click.option("--last", default=1, help="Show the last N traces")
+@click.option("--list", "list_only", is_flag=True, help="List the traces instead of showing them")
+@click.option("--summary", is_flag=True, help="Time per span name over the selected traces")
+def cli(path: str, trace_id: str, last: int, list_only: bool, summary: bool):
+    """
+    Show the traces recorded by the CLI, the agents and the MCP servers
+    as span trees, with the time spent in every hop.
+    """
+    try:
+        traces = group_traces(load_spans(path))
+    except FileNotFoundError:
+        raise click.ClickException(f"No spans at {path}; run the stack with TRACE_SINK=jsonl")
+
+    if trace_id:
+        selected = {key: trace for key, trace in traces.items() if key.startswith(trace_id)}
+        if not selected:
+            raise click.ClickException(f"No trace {trace_id} in {path}")
+    else:
+        selected = dict(list(traces.items())[-last:]) if last > 0 else traces
+
+    if list_only:
+        for key, trace in selected.items():
+            started = trace[0]["startTimeUnixNano"]
+            duration_ms = (max(span["endTimeUnixNano"] for span in trace) - started) / 1e6
+            services = sorted({span["service"] for span in trace})
+            click.echo(
+                f"{key}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started / 1e9))}  "
+                f"{duration_ms:>9.1f}ms  {len(trace):>3} spans  {trace[0]['name']}  ({', '.join(services)})"
+            )
+        return
+
+    if summary:
+        rows = summarize_spans([span for trace in selected.values() for span in trace])
+        click.echo(f"{'count':>6} {'errors':>6} {'total':>11} {'p50':>10} {'p95':>10} {'max':>10}  span")
+        for row in rows:
+            click.echo(
+                f"{row['count']:>6} {row['errors']:>6} {row['total_ms']:>9.1f}ms {row['p50_ms']:>8.1f}ms "
+                f"{row['p95_ms']:>8.1f}ms {row['max_ms']:>8.1f}ms  {row['name']} [{row['service']}]"
+            )
+        return
+
+    for key, trace in selected.items():
+        click.echo(f"\nTrace {key}")
+        for line in render_trace(trace):
+            click.echo(line)
+
+
+if __name__ == "__main__":
+    cli()
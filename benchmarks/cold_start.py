@@ -0,0 +1,220 @@
+"""
+Cold-start profile and budget check of the entry points.
+
+Starts each entry point in a fresh interpreter, `--runs` times, and reports
+the median time until it is usable:
+
+- client: `app.cli.client` imported, which must not pull in ADK, genai or uvicorn
+- website_builder / host_agent: serving their agent card, with the host
+  also connecting to the terminal stdio MCP server when the MCP SDK can be
+  imported from the project root (the project's `mcp/` package can shadow
+  it); otherwise the host is profiled without MCP servers
+
+Agents run with STARTUP_PROFILE=1 and the stub model, so their startup
+phases (imports, agent, task_store, app, serve) are reported as well. One
+extra run under `python -X importtime` lists the slowest top-level packages
+to import.
+
+The command exits with status 1 when a median exceeds its budget
+(`--budget host_agent=8`, seconds), so it can guard cold start in CI:
+
+    python -m benchmarks.cold_start --runs 3 --output bench_cold_start.json
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import asyncclick as click
+
+from benchmarks.e2e import STUB_SCRIPT, TERMINAL_SERVER, mcp_sdk_available, wait_for_agent
+from benchmarks.mcp_http_load import free_port
+from core.common.startup_profile import REPORT_PREFIX
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+AGENT_MODULES = {
+    "website_builder": "agents.website_builder",
+    "host_agent": "agents.host_agent",
+}
+
+DEFAULT_BUDGETS = {"client": 1.0, "website_builder": 5.0, "host_agent": 8.0}
+
+# The client must stay usable without the agent-side stack
+CLIENT_FORBIDDEN_IMPORTS = ("google.adk", "google.genai", "uvicorn")
+
+CLIENT_PROBE = "import sys, app.cli.client; print(' '.join(sorted(sys.modules)))"
+
+
+def import_breakdown(stderr: str, top: int = 10) -> list[dict]:
+    """
+    Sum `-X importtime` self times per top-level package.
+
+    Returns:
+        list[dict]: The `top` slowest packages with their import time in milliseconds.
+    """
+    totals: Counter = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return [{"package": name, "ms": round(us / 1000, 1)} for name, us in totals.most_common(top)]
+
+
+def run_client(env: dict[str, str], importtime: bool = False) -> dict:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CLIENT_PROBE]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the client failed:\n{result.stderr[-2000:]}")
+
+    modules = result.stdout.split()
+    forbidden = sorted({
+        prefix for prefix in CLIENT_FORBIDDEN_IMPORTS
+        for module in modules if module == prefix or module.startswith(prefix + ".")
+    })
+    return {"seconds": seconds, "forbidden_imports": forbidden, "stderr": result.stderr}
+
+
+async def run_agent(name: str, env: dict[str, str], workdir: str, importtime: bool = False) -> dict:
+    url = f"http://localhost:{free_port()}"
+    command = [
+        sys.executable, *(["-X", "importtime"] if importtime else []),
+        "-m", AGENT_MODULES[name], "--port", url.rsplit(":", 1)[1],
+    ]
+    stdout_path = os.path.join(workdir, f"{name}.log")
+    stderr_path = os.path.join(workdir, f"{name}.err")
+    with open(stdout_path, "wb") as stdout, open(stderr_path, "wb") as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=stdout, stderr=stderr)
+        try:
+            await wait_for_agent(url, process)
+            seconds = time.perf_counter() - started
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    with open(stdout_path, "r", encoding="utf-8", errors="replace") as f:
+        reports = [line[len(REPORT_PREFIX):] for line in f if line.startswith(REPORT_PREFIX)]
+    with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+        stderr_text = f.read()
+    return {
+        "seconds": seconds,
+        "phases": json.loads(reports[0])["phases"] if reports else {},
+        "stderr": stderr_text,
+    }
+
+
+def agent_env(workdir: str, mcp_servers: bool = True) -> dict[str, str]:
+    registry = os.path.join(workdir, "agent_registry.json")
+    with open(registry, "w", encoding="utf-8") as f:
+        json.dump([], f)
+    mcp_config = os.path.join(workdir, "mcp_config.json")
+    servers = {"terminal_server": {"command": sys.executable, "args": [TERMINAL_SERVER]}} if mcp_servers else {}
+    with open(mcp_config, "w", encoding="utf-8") as f:
+        json.dump({"mcpServers": servers}, f)
+
+    return {
+        **os.environ,
+        "STARTUP_PROFILE": "1",
+        "MODEL_BACKEND": f"stub:{STUB_SCRIPT}",
+        "AGENT_REGISTRY_FILE": registry,
+        "MCP_CONFIG_FILE": mcp_config,
+        "TRACE_SINK": "off",
+    }
+
+
+def median_phases(runs: list[dict]) -> dict[str, float]:
+    names = [name for name in runs[0]["phases"]] if runs else []
+    return {
+        name: round(statistics.median(run["phases"].get(name, 0.0) for run in runs), 4)
+        for name in names
+    }
+
+
+def parse_budgets(values: tuple[str, ...]) -> dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values:
+        name, _, seconds = value.partition("=")
+        if name not in budgets or not seconds:
+            raise click.BadParameter(f"Expected <target>=<seconds> with a target in {', '.join(budgets)}: {value}")
+        budgets[name] = float(seconds)
+    return budgets
+
+
+@click.command()
+@click.option("--runs", default=3, help="Timed cold starts per target")
+@click.option("--target", "targets", multiple=True, type=click.Choice(list(DEFAULT_BUDGETS)), help="Targets to measure (default: all)")
+@click.option("--budget", "budget_values", multiple=True, help="Cold-start budget as <target>=<seconds> (repeatable)")
+@click.option("--output", default=None, help="Write the JSON report to this file (stdout if omitted)")
+async def main(runs: int, targets: tuple[str, ...], budget_values: tuple[str, ...], output: str):
+    """
+    Measure cold start of the client and agents and check it against budgets.
+    """
+    budgets = parse_budgets(budget_values)
+    report = {"runs": runs, "targets": {}}
+    failures = []
+
+    with tempfile.TemporaryDirectory(prefix="mcpa2a-cold-start-") as workdir:
+        with_mcp = mcp_sdk_available(dict(os.environ))
+        if not with_mcp:
+            print("The MCP SDK cannot be imported from the project root; profiling the host without MCP servers", file=sys.stderr)
+        report["host_mcp_servers"] = with_mcp
+        env = agent_env(workdir, mcp_servers=with_mcp)
+        for target in targets or DEFAULT_BUDGETS:
+            if target == "client":
+                profiled = run_client(env, importtime=True)
+                results = [run_client(env) for _ in range(runs)]
+            else:
+                profiled = await run_agent(target, env, workdir, importtime=True)
+                results = [await run_agent(target, env, workdir) for _ in range(runs)]
+
+            seconds = statistics.median(result["seconds"] for result in results)
+            entry = {
+                "median_seconds": round(seconds, 3),
+                "min_seconds": round(min(result["seconds"] for result in results), 3),
+                "max_seconds": round(max(result["seconds"] for result in results), 3),
+                "budget_seconds": budgets[target],
+                "slowest_imports": import_breakdown(profiled["stderr"]),
+            }
+            if target == "client":
+                entry["forbidden_imports"] = profiled["forbidden_imports"]
+                if profiled["forbidden_imports"]:
+                    failures.append(f"client imports {', '.join(profiled['forbidden_imports'])}")
+            else:
+                entry["phases"] = median_phases(results)
+            if seconds > budgets[target]:
+                failures.append(f"{target} took {seconds:.2f}s, over its {budgets[target]:.2f}s budget")
+
+            report["targets"][target] = entry
+            print(f"{target}: {seconds:.2f}s (budget {budgets[target]:.2f}s)", file=sys.stderr)
+
+    report["failures"] = failures
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Report written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if failures:
+        print("Cold-start budget exceeded:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
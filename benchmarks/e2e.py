@@ -0,0 +1,438 @@
+"""
+Offline end-to-end benchmark of the agent stack.
+
+Starts the website builder, the host agent and the arithmetic HTTP MCP
+server locally, with the host also running the terminal stdio MCP server,
+and every agent answering from the scripted stub model
+(`MODEL_BACKEND=stub:benchmarks/stub_script.json`), so no network access or
+API key is needed. Each scenario is timed end to end and grouped by the hop
+it exercises:
+
+- discovery: agent card fetches and the host's `/agents` command
+- executor: requests sent straight to the website builder
+- tool_call: MCP tool calls, directly and through the host
+- delegation: host to website builder, via the fast path and via the model
+
+The report is JSON with throughput, latency percentiles and, per scenario,
+the time spent in the stub model, so `overhead_ms_per_request` is our own
+cost. Model time is summed over calls, so it overstates the model's share
+when calls run in parallel (builder_multi_page).
+
+    python -m benchmarks.e2e --requests 50 --concurrency 4 --llm-latency-ms 0 \
+        --output bench_e2e.json
+"""
+
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from itertools import count
+from uuid import uuid4
+
+import asyncclick as click
+import httpx
+from a2a.client import A2ACardResolver
+
+from benchmarks.mcp_http_load import MCPHttpSession, free_port, wait_until_ready
+from benchmarks.stats import summarize_latencies
+from core.a2a.agent_connect import AgentConnector
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STUB_SCRIPT = os.path.join(PROJECT_ROOT, "benchmarks", "stub_script.json")
+ARITHMETIC_SERVER = os.path.join(PROJECT_ROOT, "mcp", "servers", "arithmetic_server.py")
+TERMINAL_SERVER = os.path.join(PROJECT_ROOT, "mcp", "servers", "terminal", "server.py")
+
+BUILDER_NAME = "website_builder_simple"
+
+# Fails where the repo's mcp/ package shadows the MCP client SDK
+MCP_SDK_PROBE = "from mcp import ClientSession"
+
+# Scenarios that need the host's MCP tools
+HOST_MCP_SCENARIOS = ("host_fast_path_stdio", "host_fast_path_http", "host_model_http")
+
+
+class StdioMCPClient:
+    """
+    Minimal stdio MCP client speaking raw JSON-RPC, one request at a time
+    (the stdio server handles calls sequentially anyway).
+    """
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self._process: asyncio.subprocess.Process | None = None
+        self._ids = count(1)
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=PROJECT_ROOT,
+        )
+        await self.request("initialize", {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "mcp-e2e-bench", "version": "1.0.0"},
+        })
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        result = await self.request("tools/call", {"name": name, "arguments": arguments})
+        if result.get("isError"):
+            raise RuntimeError(f"tools/call returned a tool error: {result.get('content')}")
+        return result
+
+    async def request(self, method: str, params: dict) -> dict:
+        async with self._lock:
+            request_id = next(self._ids)
+            await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            while True:
+                line = await self._process.stdout.readline()
+                if not line:
+                    raise RuntimeError("MCP server closed its output")
+                message = json.loads(line)
+                if message.get("id") == request_id:
+                    break
+        if "error" in message:
+            raise RuntimeError(f"{method} failed: {message['error']}")
+        return message.get("result", {})
+
+    async def close(self) -> None:
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self._process.kill()
+
+    async def _send(self, message: dict) -> None:
+        self._process.stdin.write((json.dumps(message) + "\n").encode())
+        await self._process.stdin.drain()
+
+
+class Stack:
+    """
+    The locally started servers, their URLs and log files.
+    """
+
+    def __init__(self, workdir: str, llm_latency_ms: float, script: str):
+        self.workdir = workdir
+        self.llm_latency_ms = llm_latency_ms
+        self.script = script
+        self.builder_url = f"http://localhost:{free_port()}"
+        self.host_url = f"http://localhost:{free_port()}"
+        self.arithmetic_url = f"http://localhost:{free_port()}/mcp"
+        self._processes: list[subprocess.Popen] = []
+
+    def env(self) -> dict[str, str]:
+        registry = os.path.join(self.workdir, "agent_registry.json")
+        with open(registry, "w", encoding="utf-8") as f:
+            json.dump([self.builder_url], f)
+
+        mcp_config = os.path.join(self.workdir, "mcp_config.json")
+        with open(mcp_config, "w", encoding="utf-8") as f:
+            json.dump({"mcpServers": {
+                "terminal_server": {"command": sys.executable, "args": [TERMINAL_SERVER]},
+                "arithmetic_server": {"command": "streamable_http", "args": [self.arithmetic_url]},
+            }}, f)
+
+        return {
+            **os.environ,
+            "MODEL_BACKEND": f"stub:{self.script}",
+            "STUB_LLM_LATENCY_MS": str(self.llm_latency_ms),
+            "AGENT_REGISTRY_FILE": registry,
+            "MCP_CONFIG_FILE": mcp_config,
+            "ARTIFACT_STORE_DIR": os.path.join(self.workdir, "artifacts"),
+            # Measure the stack, not its protections or caches
+            "RESPONSE_CACHE": "0",
+            "ADMISSION_MAX_CONCURRENT": "0",
+            "ADMISSION_MAX_PER_SESSION": "0",
+            "TRACE_SINK": "off",
+        }
+
+    async def start(self) -> None:
+        env = self.env()
+        arithmetic = self._spawn("arithmetic", [sys.executable, ARITHMETIC_SERVER, "--port", self._port(self.arithmetic_url)], env)
+        builder = self._spawn("website_builder", [sys.executable, "-m", "agents.website_builder", "--port", self._port(self.builder_url)], env)
+        await asyncio.gather(
+            wait_until_ready(self.arithmetic_url, arithmetic, timeout=60),
+            wait_for_agent(self.builder_url, builder),
+        )
+        # The host loads its MCP tools on startup, so it goes last
+        host = self._spawn("host_agent", [sys.executable, "-m", "agents.host_agent", "--port", self._port(self.host_url)], env)
+        await wait_for_agent(self.host_url, host)
+
+    def stop(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _spawn(self, name: str, command: list[str], env: dict[str, str]) -> subprocess.Popen:
+        log = open(os.path.join(self.workdir, f"{name}.log"), "wb")
+        process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self._processes.append(process)
+        return process
+
+    @staticmethod
+    def _port(url: str) -> str:
+        return url.rsplit(":", 1)[1].split("/")[0]
+
+
+async def wait_for_agent(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Agent at {url} exited with code {process.returncode} during startup")
+            try:
+                await A2ACardResolver(base_url=url, httpx_client=client).get_agent_card()
+                return
+            except Exception:
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"Agent at {url} was not ready after {timeout}s")
+
+
+def mcp_sdk_available(env: dict[str, str]) -> bool:
+    """
+    Whether the agents, started from the project root with `env`, can import
+    the MCP client SDK and so load their MCP tools.
+    """
+    result = subprocess.run([sys.executable, "-c", MCP_SDK_PROBE], cwd=PROJECT_ROOT, env=env, capture_output=True, timeout=120)
+    return result.returncode == 0
+
+
+async def model_usage(agent_urls: list[str]) -> tuple[int, float]:
+    """
+    Returns:
+        tuple[int, float]: Stub model calls and seconds, summed over the agents.
+    """
+    calls, seconds = 0, 0.0
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        for url in agent_urls:
+            stub = (await client.get(f"{url}/metrics")).json().get("model.stub", {})
+            calls += stub.get("calls", 0)
+            seconds += stub.get("seconds", 0.0)
+    return calls, seconds
+
+
+async def ask(url: str, message: str, expect: str) -> str:
+    """
+    Send one message to an agent over message/stream and return its final text.
+    A completed task whose answer does not match the `expect` regex (e.g. a
+    "Tool not found" reply) counts as an error.
+    """
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        card = await A2ACardResolver(base_url=url, httpx_client=client).get_agent_card()
+    async for update in AgentConnector(card).stream_task(message=message, session_id=uuid4().hex):
+        if update['kind'] == 'status' and update['final']:
+            if update['state'] != 'completed':
+                raise RuntimeError(f"Task {update['state']}: {update['text']}")
+            if not re.search(expect, update['text']):
+                raise RuntimeError(f"Unexpected answer: {update['text'][:200]}")
+            return update['text']
+    raise RuntimeError("The stream ended without a final status")
+
+
+async def run_scenario(
+    hop: str,
+    name: str,
+    call: Callable[[], Awaitable[object]],
+    total_requests: int,
+    concurrency: int,
+    agent_urls: list[str],
+) -> dict:
+    """
+    Run `call` `total_requests` times with `concurrency` workers.
+
+    Returns:
+        dict: Throughput, errors, latency percentiles and model time for the scenario.
+    """
+    latencies: list[float] = []
+    errors: list[str] = []
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await call()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    calls_before, seconds_before = await model_usage(agent_urls)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    calls_after, seconds_after = await model_usage(agent_urls)
+
+    result = {
+        "hop": hop,
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize_latencies(latencies),
+        "model_calls": calls_after - calls_before,
+    }
+    if latencies:
+        model_ms = (seconds_after - seconds_before) * 1000 / len(latencies)
+        result["model_ms_per_request"] = round(model_ms, 3)
+        result["overhead_ms_per_request"] = round(result["latency_ms"]["mean"] - model_ms, 3)
+    print(_describe(result), file=sys.stderr)
+    return result
+
+
+def _describe(result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"[{result['hop']}] {result['scenario']}: rps={result['throughput_rps']} "
+        f"p50={latency.get('p50')}ms p95={latency.get('p95')}ms "
+        f"overhead={result.get('overhead_ms_per_request')}ms errors={result['errors']}"
+    )
+
+
+def _p50(results: list[dict], name: str) -> float | None:
+    for result in results:
+        if result["scenario"] == name:
+            return result["latency_ms"].get("p50")
+    return None
+
+
+def _difference(a: float | None, b: float | None) -> float | None:
+    return round(a - b, 3) if a is not None and b is not None else None
+
+
+async def run_benchmark(stack: Stack, total_requests: int, concurrency: int) -> dict:
+    agents = [stack.host_url, stack.builder_url]
+    host_mcp_tools = mcp_sdk_available(stack.env())
+    terminal = StdioMCPClient([sys.executable, TERMINAL_SERVER])
+    await terminal.start()
+
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        arithmetic = MCPHttpSession(client, stack.arithmetic_url)
+        await arithmetic.initialize()
+
+        async def fetch_card(url: str):
+            async with httpx.AsyncClient(timeout=10.0) as card_client:
+                return await A2ACardResolver(base_url=url, httpx_client=card_client).get_agent_card()
+
+        scenarios = [
+            ("discovery", "builder_agent_card", lambda: fetch_card(stack.builder_url)),
+            ("discovery", "host_agent_card", lambda: fetch_card(stack.host_url)),
+            ("discovery", "host_list_agents", lambda: ask(stack.host_url, "/agents", BUILDER_NAME)),
+            ("executor", "builder_single_page", lambda: ask(stack.builder_url, "page: pricing", r"index\.html")),
+            ("executor", "builder_multi_page", lambda: ask(stack.builder_url, "site: product launch", r"contact\.html")),
+            ("tool_call", "mcp_stdio_direct", lambda: terminal.call_tool("run_command", {"command": "echo ok"})),
+            ("tool_call", "mcp_http_direct", lambda: arithmetic.call_tool("add_numbers", {"input": {"a": 1, "b": 2}})),
+            ("tool_call", "host_fast_path_stdio", lambda: ask(stack.host_url, '/tool run_command {"command": "echo ok"}', r"\bok\b")),
+            ("tool_call", "host_fast_path_http", lambda: ask(stack.host_url, '/tool add_numbers {"input": {"a": 1, "b": 2}}', r"\b3\b")),
+            ("tool_call", "host_model_http", lambda: ask(stack.host_url, "add 1 and 2", r"\b3\b")),
+            ("delegation", "host_fast_path", lambda: ask(stack.host_url, f"/delegate {BUILDER_NAME} page: pricing", r"index\.html")),
+            ("delegation", "host_model", lambda: ask(stack.host_url, "delegate: page: pricing", r"index\.html")),
+        ]
+
+        # Without the MCP client SDK the host starts with no MCP tools, and these
+        # would only time its "tool not found" reply
+        skipped = {}
+        if not host_mcp_tools:
+            reason = "the host has no MCP tools (MCP client SDK not importable from the project root)"
+            skipped = {name: reason for name in HOST_MCP_SCENARIOS}
+            print(f"Skipping {', '.join(HOST_MCP_SCENARIOS)}: {reason}", file=sys.stderr)
+
+        results = []
+        for hop, name, call in scenarios:
+            if name in skipped:
+                continue
+            # Stdio calls are handled one at a time by the server
+            level = 1 if name == "mcp_stdio_direct" else concurrency
+            results.append(await run_scenario(hop, name, call, total_requests, level, agents))
+
+    await terminal.close()
+
+    hops: dict[str, list[dict]] = {}
+    for result in results:
+        hops.setdefault(result["hop"], []).append(result)
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        agent_metrics = {
+            "host_agent": (await client.get(f"{stack.host_url}/metrics")).json(),
+            BUILDER_NAME: (await client.get(f"{stack.builder_url}/metrics")).json(),
+        }
+
+    return {
+        "hops": hops,
+        "skipped": skipped,
+        # p50 cost each hop adds on top of the one it wraps
+        "derived_p50_ms": {
+            "delegation_over_builder": _difference(_p50(results, "host_fast_path"), _p50(results, "builder_single_page")),
+            "host_over_mcp_http": _difference(_p50(results, "host_fast_path_http"), _p50(results, "mcp_http_direct")),
+            "host_over_mcp_stdio": _difference(_p50(results, "host_fast_path_stdio"), _p50(results, "mcp_stdio_direct")),
+        },
+        "agent_metrics": agent_metrics,
+    }
+
+
+@click.command()
+@click.option("--requests", "total_requests", default=50, help="Requests per scenario")
+@click.option("--concurrency", default=4, help="Concurrent requests per scenario")
+@click.option("--llm-latency-ms", default=0.0, help="Latency of every stub model call")
+@click.option("--script", default=STUB_SCRIPT, help="Stub model script (JSON)")
+@click.option("--output", default=None, help="Write the JSON report to this file (stdout if omitted)")
+async def main(total_requests: int, concurrency: int, llm_latency_ms: float, script: str, output: str):
+    """
+    Benchmark the host agent, website builder and MCP servers offline.
+    """
+    with tempfile.TemporaryDirectory(prefix="mcpa2a-bench-") as workdir:
+        stack = Stack(workdir, llm_latency_ms, os.path.abspath(script))
+        try:
+            await stack.start()
+            report = await run_benchmark(stack, total_requests, concurrency)
+        except Exception:
+            for name in ("arithmetic", "website_builder", "host_agent"):
+                path = os.path.join(workdir, f"{name}.log")
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        print(f"--- {name} log (last lines) ---\n{''.join(f.readlines()[-20:])}", file=sys.stderr)
+            raise
+        finally:
+            stack.stop()
+
+    report = {
+        "config": {
+            "requests": total_requests,
+            "concurrency": concurrency,
+            "llm_latency_ms": llm_latency_ms,
+            "script": os.path.relpath(os.path.abspath(script), PROJECT_ROOT),
+        },
+        **report,
+    }
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Report written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+"""
+Load test for streamable-HTTP MCP servers.
+
+Drives `tools/call` against a local server at one or more concurrency levels
+and reports throughput and latency percentiles as JSON. By default it starts
+`mcp/servers/arithmetic_server.py` itself, once per mode, so stateless and
+stateful HTTP can be compared on the same machine:
+
+    python -m benchmarks.mcp_http_load --concurrency 1,8,32 --requests 2000 \
+        --modes stateless,stateful --output bench_output.json
+
+Pass --url to benchmark an already running server instead.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+import asyncclick as click
+import httpx
+
+from benchmarks.stats import summarize_latencies
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARITHMETIC_SERVER = os.path.join(PROJECT_ROOT, "mcp", "servers", "arithmetic_server.py")
+
+MCP_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+}
+
+
+class MCPHttpSession:
+    """
+    Minimal streamable-HTTP MCP client used by the load generator.
+    Speaks raw JSON-RPC so the measurement covers the server, not a client SDK.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, url: str):
+        self.client = client
+        self.url = url
+        self.session_id: str | None = None
+
+    async def initialize(self) -> None:
+        await self.request("initialize", {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "mcp-http-load", "version": "1.0.0"},
+        })
+        await self.notify("notifications/initialized")
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        return await self.request("tools/call", {"name": name, "arguments": arguments})
+
+    async def notify(self, method: str) -> None:
+        response = await self.client.post(
+            self.url,
+            json={"jsonrpc": "2.0", "method": method},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+
+    async def request(self, method: str, params: dict) -> dict:
+        request_id = uuid4().hex
+        response = await self.client.post(
+            self.url,
+            json={"jsonrpc": "2.0", "id": request_id, "method": method, "params": params},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+
+        if "mcp-session-id" in response.headers:
+            self.session_id = response.headers["mcp-session-id"]
+
+        message = self._parse(response, request_id)
+        if "error" in message:
+            raise RuntimeError(f"{method} failed: {message['error']}")
+        result = message.get("result", {})
+        if result.get("isError"):
+            raise RuntimeError(f"{method} returned a tool error: {result.get('content')}")
+        return result
+
+    def _headers(self) -> dict:
+        if self.session_id:
+            return {**MCP_HEADERS, "mcp-session-id": self.session_id}
+        return MCP_HEADERS
+
+    @staticmethod
+    def _parse(response: httpx.Response, request_id: str) -> dict:
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            for line in response.text.splitlines():
+                if line.startswith("data:"):
+                    message = json.loads(line[5:].strip())
+                    if message.get("id") == request_id:
+                        return message
+            raise RuntimeError("No JSON-RPC response in event stream")
+        return response.json()
+
+
+async def run_level(url: str, concurrency: int, total_requests: int, tool: str, arguments: dict) -> dict:
+    """
+    Send `total_requests` tool calls using `concurrency` concurrent MCP sessions.
+
+    Returns:
+        dict: Throughput, error count and latency percentiles for the level.
+    """
+    latencies: list[float] = []
+    errors: list[str] = []
+    remaining = total_requests
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        sessions = [MCPHttpSession(client, url) for _ in range(concurrency)]
+        await asyncio.gather(*(session.initialize() for session in sessions))
+
+        async def worker(session: MCPHttpSession):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    await session.call_tool(tool, arguments)
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    errors.append(str(e))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for session in sessions))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize_latencies(latencies),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(url: str, process: subprocess.Popen = None, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode} during startup")
+            try:
+                await MCPHttpSession(client, url).initialize()
+                return
+            except (httpx.HTTPError, RuntimeError):
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"Server at {url} was not ready after {timeout}s")
+
+
+async def run_mode(mode: str, levels: list[int], total_requests: int, tool: str, arguments: dict) -> dict:
+    """
+    Start the arithmetic server in `mode` ("stateless" or "stateful") and run every level against it.
+    """
+    port = free_port()
+    command = [sys.executable, ARITHMETIC_SERVER, "--port", str(port)]
+    if mode == "stateful":
+        command.append("--stateful")
+
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://localhost:{port}/mcp"
+    try:
+        await wait_until_ready(url, process)
+        results = []
+        for concurrency in levels:
+            result = await run_level(url, concurrency, total_requests, tool, arguments)
+            print(_describe(mode, result), file=sys.stderr)
+            results.append(result)
+        return {"mode": mode, "url": url, "levels": results}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _describe(mode: str, result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"[{mode}] concurrency={result['concurrency']} rps={result['throughput_rps']} "
+        f"p50={latency.get('p50')}ms p95={latency.get('p95')}ms p99={latency.get('p99')}ms "
+        f"errors={result['errors']}"
+    )
+
+
+@click.command()
+@click.option("--url", default=None, help="Benchmark an already running server instead of starting one")
+@click.option("--modes", default="stateless,stateful", help="Comma separated server modes to start and compare")
+@click.option("--concurrency", default="1,8,32", help="Comma separated concurrency levels")
+@click.option("--requests", "total_requests", default=1000, help="Tool calls per concurrency level")
+@click.option("--tool", default="add_numbers", help="Tool to call")
+@click.option("--arguments", default='{"input": {"a": 1, "b": 2}}', help="Tool arguments as JSON")
+@click.option("--output", default=None, help="Write the JSON report to this file (stdout if omitted)")
+async def main(url: str, modes: str, concurrency: str, total_requests: int, tool: str, arguments: str, output: str):
+    """
+    Load test tools/call on a streamable-HTTP MCP server.
+    """
+    levels = [int(level) for level in concurrency.split(",") if level.strip()]
+    tool_arguments = json.loads(arguments)
+
+    report = {"tool": tool, "arguments": tool_arguments, "runs": []}
+    if url:
+        await wait_until_ready(url, timeout=10)
+        runs = []
+        for level in levels:
+            result = await run_level(url, level, total_requests, tool, tool_arguments)
+            print(_describe("external", result), file=sys.stderr)
+            runs.append(result)
+        report["runs"].append({"mode": "external", "url": url, "levels": runs})
+    else:
+        for mode in [m.strip() for m in modes.split(",") if m.strip()]:
+            report["runs"].append(await run_mode(mode, levels, total_requests, tool, tool_arguments))
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Report written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+import math
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values (list[float]): Values sorted ascending.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float | None: The percentile, or None for an empty list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_s: list[float]) -> dict:
+    """
+    Summarise latencies given in seconds as milliseconds.
+
+    Returns:
+        dict: count, mean, min, max, p50, p95 and p99 in milliseconds.
+    """
+    values = sorted(latency * 1000 for latency in latencies_s)
+    if not values:
+        return {"count": 0}
+
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "min": round(values[0], 3),
+        "max": round(values[-1], 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+    }
@@ -1,19 +1,55 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 from uuid import uuid4
 from a2a.types import (
     AgentCard, 
+    CancelTaskRequest,
+    Message,
     Task,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
     SendMessageRequest,
-    MessageSendParams
+    SendStreamingMessageRequest,
+    MessageSendParams,
+    TaskIdParams
 )
 import httpx
 from a2a.client import A2AClient
 
+from core.common.cancellation import run_to_completion
+from core.common.tracing import TRACEPARENT, tracer
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ('completed', 'failed', 'canceled', 'rejected')
+
+# Seconds to wait for an agent to acknowledge a cancellation
+CANCEL_TIMEOUT = 10.0
+
 class AgentConnector:
    
 
-    def __init__(self, agent_card: AgentCard):
+    def __init__(self, agent_card: AgentCard, httpx_client: httpx.AsyncClient = None):
+        """
+        Args:
+            agent_card (AgentCard): Card of the agent to talk to.
+            httpx_client (httpx.AsyncClient, optional): Client shared by all
+                calls, so connections are pooled. Without it every call opens
+                its own client. The caller closes a shared client.
+        """
         self.agent_card = agent_card
+        self.httpx_client = httpx_client
+
+    @asynccontextmanager
+    async def _http(self, timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+        if self.httpx_client is not None:
+            yield self.httpx_client
+        else:
+            async with httpx.AsyncClient(timeout=timeout) as httpx_client:
+                yield httpx_client
 
     async def send_task(self, message: str, session_id: str) -> str:
         """
@@ -27,35 +63,21 @@ class AgentConnector:
             Task: The Task object containing the response from the agent
         """
 
-        async with httpx.AsyncClient(timeout = 300.0) as httpx_client:
+        async with self._http(timeout=300.0) as httpx_client:
             a2a_client = A2AClient(
                 httpx_client=httpx_client,
                 agent_card=self.agent_card,
             )
 
-            send_message_payload: dict[str, Any] = {
-                'message': {
-                    'role': 'user',
-                    'messageId': str(uuid4()),
-                    'parts': [
-                        {
-                            'text': message,
-                            'kind': 'text'
-                        }
-                    ]
-                }
-            }
-
-            request = SendMessageRequest(
-                id = str(uuid4()),
-                params=MessageSendParams(
-                    **send_message_payload
+            with tracer().span("a2a.send", agent=self.agent_card.name, context_id=session_id) as span:
+                request = SendMessageRequest(
+                    id = str(uuid4()),
+                    params=self._message_params(message, session_id, span.traceparent)
                 )
-            )
 
-            response = await a2a_client.send_message(
-                request=request
-            )
+                response = await a2a_client.send_message(
+                    request=request
+                )
 
             response_data = response.model_dump(mode='json', exclude_none=True)
 
@@ -64,4 +86,169 @@ class AgentConnector:
             except (KeyError, IndexError):
                 agent_response = "No response from agent"
 
-            return agent_response
\ No newline at end of file
+            return agent_response
+
+    async def stream_task(self, message: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
+        """
+        Send a task with message/stream and yield updates as the agent produces them
+
+        Args:
+            message (str): The message to send to the agent
+            session_id (str): The session ID for tracking the task
+
+        Yields:
+            dict[str, Any]: One of
+                {'kind': 'status', 'state': str, 'text': str, 'final': bool}
+                {'kind': 'artifact', 'name': str, 'text': str, 'metadata': dict, 'append': bool, 'last_chunk': bool}
+        """
+
+        async with self._http(timeout=300.0) as httpx_client:
+            a2a_client = A2AClient(
+                httpx_client=httpx_client,
+                agent_card=self.agent_card,
+            )
+
+            # A generator cannot hold a `with` span across its yields
+            span = tracer().start_span("a2a.stream", agent=self.agent_card.name, context_id=session_id)
+            request = SendStreamingMessageRequest(
+                id = str(uuid4()),
+                params=self._message_params(message, session_id, span.traceparent)
+            )
+
+            responses = aiter(a2a_client.send_message_streaming(request=request))
+            first_response = None
+            task_id = None
+            finished = False
+            state = None
+            try:
+                while True:
+                    if task_id is None:
+                        # The child cannot be cancelled before it reports its task id,
+                        # so that response is read where a cancellation does not cut it off
+                        first_response = asyncio.ensure_future(anext(responses, None))
+                        response = await asyncio.shield(first_response)
+                        first_response = None
+                    else:
+                        response = await anext(responses, None)
+                    if response is None:
+                        break
+
+                    result = getattr(response.root, 'result', None)
+                    task_id = getattr(result, 'task_id', None) or getattr(result, 'id', None) or task_id
+                    finished = finished or result is None or isinstance(result, Message) or (
+                        getattr(result, 'final', False)
+                    ) or (isinstance(result, Task) and result.status.state.value in TERMINAL_STATES)
+
+                    if isinstance(result, TaskStatusUpdateEvent):
+                        state = result.status.state.value
+                        yield {
+                            'kind': 'status',
+                            'state': result.status.state.value,
+                            'text': _message_text(result.status.message),
+                            'final': result.final,
+                        }
+                    elif isinstance(result, TaskArtifactUpdateEvent):
+                        yield {
+                            'kind': 'artifact',
+                            'name': result.artifact.name,
+                            'metadata': result.artifact.metadata or {},
+                            'text': "".join(
+                                part.root.text for part in result.artifact.parts
+                                if getattr(part.root, 'text', None)
+                            ),
+                            'append': bool(result.append),
+                            'last_chunk': bool(result.last_chunk),
+                        }
+                    elif isinstance(result, Message):
+                        yield {'kind': 'status', 'state': 'completed', 'text': _message_text(result), 'final': True}
+                    elif isinstance(result, Task) and result.status.state.value in TERMINAL_STATES:
+                        yield {
+                            'kind': 'status',
+                            'state': result.status.state.value,
+                            'text': _message_text(result.status.message),
+                            'final': True,
+                        }
+                    elif result is None:
+                        error = getattr(response.root, 'error', None)
+                        yield {'kind': 'status', 'state': 'failed', 'text': f"Agent error: {error}", 'final': True}
+            except (asyncio.CancelledError, GeneratorExit):
+                # The caller abandoned the task: stop the child agent as well
+                if not finished:
+                    span.status = "cancelled"
+                    await run_to_completion(self._cancel_child(a2a_client, task_id, first_response), 2 * CANCEL_TIMEOUT)
+                raise
+            except Exception as e:
+                span.set(error=f"{type(e).__name__}: {e}")
+                span.status = "error"
+                raise
+            finally:
+                span.set(task_id=task_id, state=state)
+                tracer().end_span(span)
+
+    async def cancel_task(self, task_id: str) -> None:
+        """
+        Ask the agent to cancel a running task
+
+        Args:
+            task_id (str): The ID of the task to cancel
+        """
+        async with self._http(timeout=30.0) as httpx_client:
+            a2a_client = A2AClient(
+                httpx_client=httpx_client,
+                agent_card=self.agent_card,
+            )
+            await self._cancel(a2a_client, task_id)
+
+    async def _cancel_child(self, a2a_client: A2AClient, task_id: str | None, first_response: asyncio.Future | None) -> None:
+        if task_id is None and first_response is not None:
+            try:
+                response = await asyncio.wait_for(first_response, CANCEL_TIMEOUT)
+            except Exception as e:
+                logger.warning("Could not learn the task id of the abandoned request: %s", e)
+                return
+            result = getattr(response.root, 'result', None) if response is not None else None
+            if isinstance(result, Message) or (isinstance(result, Task) and result.status.state.value in TERMINAL_STATES):
+                return
+            task_id = getattr(result, 'task_id', None) or getattr(result, 'id', None)
+        if task_id:
+            await self._cancel(a2a_client, task_id)
+
+    @staticmethod
+    async def _cancel(a2a_client: A2AClient, task_id: str) -> None:
+        try:
+            await asyncio.wait_for(
+                a2a_client.cancel_task(CancelTaskRequest(id=str(uuid4()), params=TaskIdParams(id=task_id))),
+                timeout=CANCEL_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning("Could not cancel task %s: %s", task_id, e)
+
+    @staticmethod
+    def _message_params(message: str, session_id: str, traceparent: str = None) -> MessageSendParams:
+        send_message_payload: dict[str, Any] = {
+            'message': {
+                'role': 'user',
+                'messageId': str(uuid4()),
+                'contextId': session_id,
+                'parts': [
+                    {
+                        'text': message,
+                        'kind': 'text'
+                    }
+                ]
+            }
+        }
+        if traceparent:
+            # The receiving executor continues this trace
+            send_message_payload['message']['metadata'] = {TRACEPARENT: traceparent}
+
+        return MessageSendParams(**send_message_payload)
+
+
+def _message_text(message: Message | None) -> str:
+    if message is None:
+        return ""
+    return "".join(
+        part.root.text for part in message.parts
+        if getattr(part.root, 'text', None)
+    )
@@ -17,13 +17,13 @@ class AgentDiscovery:
 
         Args:
             registry_file (str): Path to the agent registry file.
-                Defaults to 'utilities/a2a/agent_registry.json'.
+                Defaults to $AGENT_REGISTRY_FILE, then 'core/a2a/agent_registry.json'.
         """
 
         if registry_file:
             self.registry_file = registry_file
         else:
-            self.registry_file = os.path.join(
+            self.registry_file = os.environ.get("AGENT_REGISTRY_FILE") or os.path.join(
                 os.path.dirname(__file__),
                 'agent_registry.json'
             )
@@ -31,7 +31,9 @@ class AgentDiscovery:
 
     def _load_registry(self) -> list[str]:
         """
-        Load and parse the registry JSON file into a list of URLs
+        Load and parse the registry JSON file into a list of URLs.
+        Entries are URLs or objects with a "url" key (plus launch
+        details such as "module", used by `main.py up`).
         
         Returns:
             list[str]: List of base URLs for A2A Agents.
@@ -41,11 +43,11 @@ class AgentDiscovery:
                 data = json.load(f)
             if not isinstance(data, list):
                 raise ValueError("Registry file must contain a list of URLs.")
-            return data
+            return [entry if isinstance(entry, str) else entry["url"] for entry in data]
         except FileNotFoundError:
             print(f"Registry file '{self.registry_file}' not found.")
             return []
-        except (json.JSONDecodeError, ValueError) as e:
+        except (json.JSONDecodeError, ValueError, KeyError, TypeError) as e:
             print(f"Error parsing registry file: {e}")
             return []
     
@@ -0,0 +1,332 @@
+import asyncio
+import contextlib
+import os
+import time
+from abc import abstractmethod
+from typing import Any
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import FilePart, FileWithUri, Part, Task, TaskState, TextPart
+from a2a.utils import new_agent_text_message, new_task
+
+from core.common.admission import AdmissionController, AdmissionRejected, create_admission_controller
+from core.common.artifact_store import ArtifactRef, ArtifactStore
+from core.common.cancellation import cancel_and_wait
+from core.common.metrics import register_metrics
+from core.common.response_cache import ResponseCache, create_response_cache, is_cache_bypassed
+from core.common.tracing import TRACEPARENT, Span, tracer
+
+# Seconds cancel() waits for a run to stop
+CANCEL_GRACE_SECONDS = 10
+
+
+class StatusCoalescer:
+    """
+    Sends `working` status updates for a task without flooding the queue.
+
+    Repeats of the last message are dropped, and at most one update is sent
+    per `min_interval` seconds. When updates arrive faster than that, only
+    the latest one is kept and sent once the interval has passed. `flush`
+    sends anything pending immediately and is called before the final state.
+    """
+
+    def __init__(self, updater: TaskUpdater, context_id: str, task_id: str, min_interval: float = 0.25):
+        self.updater = updater
+        self.context_id = context_id
+        self.task_id = task_id
+        self.min_interval = min_interval
+        self.sent = 0
+        self.coalesced = 0
+
+        self._last_text = None
+        self._last_sent_at = float("-inf")
+        self._pending = None
+        self._timer: asyncio.Task | None = None
+
+    async def update(self, text: str) -> None:
+        if text == (self._pending if self._pending is not None else self._last_text):
+            self.coalesced += 1
+            return
+
+        if time.monotonic() - self._last_sent_at >= self.min_interval:
+            await self._send(text)
+            return
+
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = text
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._send_later())
+
+    async def flush(self) -> None:
+        self._stop_timer()
+        if self._pending is not None:
+            await self._send(self._pending)
+
+    def close(self) -> None:
+        """
+        Drop anything pending without sending it (e.g. the task was cancelled).
+        """
+        self._stop_timer()
+        self._pending = None
+
+    async def _send_later(self) -> None:
+        await asyncio.sleep(max(0.0, self._last_sent_at + self.min_interval - time.monotonic()))
+        self._timer = None
+        if self._pending is not None:
+            await self._send(self._pending)
+
+    async def _send(self, text: str) -> None:
+        self._pending = None
+        self._last_text = text
+        self._last_sent_at = time.monotonic()
+        self.sent += 1
+        await self.updater.update_status(
+            TaskState.working,
+            new_agent_text_message(text, self.context_id, self.task_id)
+        )
+
+    def _stop_timer(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+
+class BaseAgentExecutor(AgentExecutor):
+    """
+    A2A executor shared by the agents in this project.
+
+    Wraps an agent that provides `invoke(query, session_id)` (yielding the
+    update dictionaries documented on the agents), `has_history`,
+    `cache_fingerprint` and `remember_turn`, and adds on top of it:
+
+    - response caching of first turns (see `core.common.response_cache`)
+    - admission control (see `core.common.admission`)
+    - streaming of `text_delta` updates as chunks of one response artifact
+    - one artifact per file, sent when an update of kind `artifact` arrives
+      or for each file in the final update's `artifacts`: the content is
+      streamed in chunks from `artifact_store` when it holds the file,
+      otherwise only the reference is sent
+    - coalesced, rate-limited `working` status updates
+    - cancellation of the running task through `cancel()`
+    - an `<agent>.execute` span per task, continuing the trace of the
+      message's `traceparent` metadata (see `core.common.tracing`)
+
+    Subclasses provide `agent_name` and call `register_metrics()` once the
+    agent is ready.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        response_cache: ResponseCache = None,
+        admission: AdmissionController = None,
+        status_interval: float = None,
+        artifact_store: ArtifactStore = None,
+    ):
+        self.agent = agent
+        self.artifact_store = artifact_store
+        self.response_cache = response_cache or create_response_cache()
+        self.admission = admission or create_admission_controller()
+        if status_interval is None:
+            status_interval = float(os.environ.get("EXECUTOR_STATUS_INTERVAL_MS", "250")) / 1000
+        self.status_interval = status_interval
+
+        self._running: dict[str, asyncio.Task] = {}
+        self._counters = {"tasks": 0, "cache_hits": 0, "status_updates_sent": 0, "status_updates_coalesced": 0}
+
+    @property
+    @abstractmethod
+    def agent_name(self) -> str:
+        ...
+
+    def register_metrics(self) -> None:
+        register_metrics(f"{self.agent_name}.executor", self.stats)
+        register_metrics(f"{self.agent_name}.admission", self.admission.stats)
+        if self.response_cache is not None:
+            register_metrics(f"{self.agent_name}.response_cache", self.response_cache.stats)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Task, cache hit and status update counters.
+        """
+        return {"running": len(self._running), **self._counters}
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """
+        Executes the agent with the provided context and event queue.
+        """
+        metadata = (context.message.metadata if context.message else None) or {}
+        with tracer().span(
+            f"{self.agent_name}.execute",
+            traceparent=metadata.get(TRACEPARENT),
+            task_id=context.task_id,
+            context_id=context.context_id,
+        ) as span:
+            await self._execute(context, event_queue, span)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue, span: Span) -> None:
+        query = context.get_user_input()
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        self._counters["tasks"] += 1
+
+        # Only first turns are cached: later answers also depend on the conversation
+        cache_key = None
+        if self.response_cache is not None and not await self.agent.has_history(task.context_id):
+            cache_key = ResponseCache.key(self.agent_name, self.agent.cache_fingerprint(), query)
+            if is_cache_bypassed(context.message.metadata if context.message else None):
+                self.response_cache.record_bypass()
+            else:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    content, refs = cached
+                    self._counters["cache_hits"] += 1
+                    span.set(cache_hit=True)
+                    await self.agent.remember_turn(query, task.context_id, content)
+                    await updater.add_artifact(
+                        [Part(root=TextPart(text=content))],
+                        artifact_id=f"{task.id}-response",
+                        name="response",
+                        last_chunk=True,
+                    )
+                    await self._send_files(task, updater, refs)
+                    await updater.complete(new_agent_text_message(content, task.context_id, task.id))
+                    return
+
+        status = StatusCoalescer(updater, task.context_id, task.id, self.status_interval)
+
+        # Lets cancel() stop this run
+        self._running[task.id] = asyncio.current_task()
+        try:
+            async with self.admission.admit(
+                task.context_id,
+                on_queued=lambda position: updater.update_status(
+                    TaskState.submitted,
+                    new_agent_text_message(f"Queued: {position} task(s) waiting, including this one.", task.context_id, task.id)
+                ),
+            ):
+                await self._run(query, task, updater, status, cache_key)
+        except asyncio.CancelledError:
+            # Stopping the run also closes any delegated child task or MCP tool call
+            status.close()
+            with contextlib.suppress(RuntimeError):  # already in a terminal state
+                await updater.cancel(new_agent_text_message("The task was cancelled.", task.context_id, task.id))
+            raise
+        except AdmissionRejected as e:
+            span.set(rejected=True)
+            await updater.reject(new_agent_text_message(str(e), task.context_id, task.id))
+        except Exception as e:
+            status.close()
+            error_message = f"An error occurred: {str(e)}"
+            await updater.failed(new_agent_text_message(error_message, task.context_id, task.id))
+            raise
+        finally:
+            self._running.pop(task.id, None)
+            self._counters["status_updates_sent"] += status.sent
+            self._counters["status_updates_coalesced"] += status.coalesced
+
+    async def _run(self, query: str, task: Task, updater: TaskUpdater, status: StatusCoalescer, cache_key) -> None:
+        stream_artifact_id = None
+        files_sent = []
+
+        async for item in self.agent.invoke(query, task.context_id):
+            if not item.get("is_task_complete", False):
+                message = item.get('updates', 'The Agent is still working on your request.')
+                if item.get('kind') == 'artifact':
+                    # A file finished before the rest of the task
+                    await self._send_files(task, updater, [item['artifact']])
+                    files_sent.append(item['artifact'])
+                    await status.update(message)
+                elif item.get('kind') == 'text_delta':
+                    # Stream generated text as chunks of one response artifact
+                    await updater.add_artifact(
+                        [Part(root=TextPart(text=message))],
+                        artifact_id=stream_artifact_id or f"{task.id}-response",
+                        name="response",
+                        append=stream_artifact_id is not None,
+                        last_chunk=False,
+                    )
+                    stream_artifact_id = f"{task.id}-response"
+                else:
+                    await status.update(message)
+                continue
+
+            # Pending progress goes out before the final state, which the
+            # queue delivers before it closes
+            await status.flush()
+            if stream_artifact_id:
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=""))],
+                    artifact_id=stream_artifact_id,
+                    name="response",
+                    append=True,
+                    last_chunk=True,
+                )
+            final_result = item.get('content', 'no result received')
+            refs = item.get('artifacts') or []
+            await self._send_files(task, updater, [ref for ref in refs if ref not in files_sent])
+            if cache_key and final_result and item.get('cacheable', True):
+                self.response_cache.put(cache_key, (final_result, refs))
+            await updater.complete(new_agent_text_message(final_result, task.context_id, task.id))
+            return
+
+        # The agent stopped without a final response
+        await status.flush()
+        await updater.complete(new_agent_text_message('no result received', task.context_id, task.id))
+
+    async def _send_files(self, task: Task, updater: TaskUpdater, refs: list[ArtifactRef]) -> None:
+        for ref in refs:
+            artifact_id = f"{task.id}-{ref.digest[:16]}"
+            if self.artifact_store is None or not self.artifact_store.exists(ref.digest):
+                file = FileWithUri(uri=ref.uri, name=ref.name, mime_type=ref.mime_type)
+                await updater.add_artifact(
+                    [Part(root=FilePart(file=file))],
+                    artifact_id=artifact_id,
+                    name=ref.name,
+                    metadata=ref.to_metadata(),
+                    last_chunk=True,
+                )
+                continue
+
+            # Stream the content so no hop has to hold or re-send a whole page
+            chunks = self.artifact_store.iter_text(ref.digest)
+            chunk = next(chunks, "")
+            append = False
+            while True:
+                following = next(chunks, None)
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=chunk))],
+                    artifact_id=artifact_id,
+                    name=ref.name,
+                    metadata=ref.to_metadata(),
+                    append=append,
+                    last_chunk=following is None,
+                )
+                if following is None:
+                    break
+                chunk, append = following, True
+
+    async def cancel(self, request: RequestContext, event_queue: EventQueue) -> Task | None:
+        """
+        Cancels a running task: stops the agent run, which cancels any
+        delegated child task and in-flight MCP tool call, and releases its
+        admission slot. The run reports the canceled state itself; if it is
+        not running here, the state is reported directly.
+        """
+        running = self._running.get(request.task_id)
+        if running is not None and not running.done():
+            if await cancel_and_wait(running, CANCEL_GRACE_SECONDS):
+                return None
+
+        updater = TaskUpdater(event_queue, request.task_id, request.context_id)
+        with contextlib.suppress(RuntimeError):
+            await updater.cancel(new_agent_text_message("The task was cancelled.", request.context_id, request.task_id))
+        return None
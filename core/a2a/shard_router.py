@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import json
+import re
+import socket
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+from uuid import uuid4
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+TASK_NOT_FOUND = -32001
+
+# Task ids in streamed events; the first one seen identifies the task
+_TASK_ID = re.compile(rb'"taskId"\s*:\s*"([^"]+)"')
+
+# Headers that describe the hop rather than the content
+_HOP_HEADERS = {"content-length", "transfer-encoding", "connection", "keep-alive", "host"}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ShardRouter:
+    """
+    Front router for several worker processes serving the same A2A agent.
+
+    Messages are routed by a stable hash of their `contextId`, so every turn
+    of a conversation reaches the worker holding its session. A message
+    without a `contextId` is given one before it is forwarded, so its
+    follow-ups hash the same way. Task methods (`tasks/get`, `tasks/cancel`,
+    `tasks/resubscribe`, ...) go to the worker that created the task: task
+    ids are learned from worker responses, and unknown ids are looked up
+    with `tasks/get` on every worker. Responses, including event streams,
+    are passed through as bytes. Other requests (the agent card) go to any
+    worker, and `/metrics` combines the router's stats with each worker's.
+
+    Args:
+        worker_urls (list[str]): Base URLs of the workers.
+        max_tasks (int): Task ids remembered for routing.
+    """
+
+    def __init__(self, worker_urls: list[str], max_tasks: int = 10000):
+        self.worker_urls = [url.rstrip("/") for url in worker_urls]
+        self.max_tasks = max_tasks
+        self._tasks: OrderedDict[str, int] = OrderedDict()
+        self._next = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._counters = {"by_context": 0, "by_task": 0, "task_lookups": 0, "task_not_found": 0, "worker_errors": 0}
+        self._requests = [0] * len(self.worker_urls)
+
+    def worker_for_context(self, context_id: str) -> int:
+        digest = hashlib.sha1(context_id.encode()).digest()
+        return int.from_bytes(digest[:8], "big") % len(self.worker_urls)
+
+    def build(self) -> Starlette:
+        """
+        Returns:
+            Starlette: The router app, which owns the HTTP client to the workers.
+        """
+        app = Starlette(routes=[
+            Route("/metrics", self._metrics, methods=["GET"]),
+            Route("/{path:path}", self._forward, methods=["GET", "POST"]),
+        ])
+        lifespan = app.router.lifespan_context
+        router = self
+
+        @asynccontextmanager
+        async def client_lifespan(app):
+            limits = httpx.Limits(max_connections=None, max_keepalive_connections=64)
+            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None), limits=limits) as client:
+                router._client = client
+                async with lifespan(app) as state:
+                    yield state
+
+        app.router.lifespan_context = client_lifespan
+        return app
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Routing counters, requests per worker and remembered tasks.
+        """
+        return {
+            "workers": len(self.worker_urls),
+            **self._counters,
+            "requests_per_worker": list(self._requests),
+            "tasks_tracked": len(self._tasks),
+        }
+
+    async def _forward(self, request: Request) -> Response:
+        body = await request.body()
+        if request.method != "POST":
+            index = self._next % len(self.worker_urls)
+            self._next += 1
+            return await self._send(index, request, body)
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return await self._send(0, request, body)
+
+        method = payload.get("method", "")
+        params = payload.get("params") or {}
+        if method.startswith("message/"):
+            index, body = self._route_message(payload)
+            return await self._send(index, request, body, learn=True)
+
+        task_id = params.get("id") or params.get("taskId")
+        if not task_id:
+            return await self._send(0, request, body)
+        index = await self._locate_task(task_id, request)
+        if index is None:
+            self._counters["task_not_found"] += 1
+            return JSONResponse({
+                "jsonrpc": "2.0",
+                "id": payload.get("id"),
+                "error": {"code": TASK_NOT_FOUND, "message": "Task not found"},
+            })
+        self._counters["by_task"] += 1
+        return await self._send(index, request, body)
+
+    def _route_message(self, payload: dict) -> tuple[int, bytes]:
+        message = (payload.get("params") or {}).get("message") or {}
+        task_id = message.get("taskId")
+        if task_id in self._tasks:
+            self._counters["by_task"] += 1
+            return self._tasks[task_id], json.dumps(payload).encode()
+
+        if not message.get("contextId"):
+            message["contextId"] = uuid4().hex
+        self._counters["by_context"] += 1
+        return self.worker_for_context(message["contextId"]), json.dumps(payload).encode()
+
+    async def _locate_task(self, task_id: str, request: Request) -> Optional[int]:
+        if task_id in self._tasks:
+            self._tasks.move_to_end(task_id)
+            return self._tasks[task_id]
+
+        self._counters["task_lookups"] += 1
+        lookup = {"jsonrpc": "2.0", "id": uuid4().hex, "method": "tasks/get", "params": {"id": task_id}}
+
+        async def owns(index: int) -> bool:
+            try:
+                response = await self._client.post(self.worker_urls[index] + "/", json=lookup, headers=_forward_headers(request))
+                return "result" in response.json()
+            except (httpx.HTTPError, ValueError):
+                return False
+
+        found = await asyncio.gather(*(owns(index) for index in range(len(self.worker_urls))))
+        for index, owned in enumerate(found):
+            if owned:
+                self._remember(task_id, index)
+                return index
+        return None
+
+    async def _send(self, index: int, request: Request, body: bytes, learn: bool = False) -> Response:
+        self._requests[index] += 1
+        url = self.worker_urls[index] + request.url.path
+        if request.url.query:
+            url += "?" + request.url.query
+        try:
+            upstream = await self._client.send(
+                self._client.build_request(request.method, url, content=body, headers=_forward_headers(request)),
+                stream=True,
+            )
+        except httpx.HTTPError as e:
+            self._counters["worker_errors"] += 1
+            return JSONResponse({"error": f"Worker {index} is unavailable: {e}"}, status_code=503)
+
+        headers = {key: value for key, value in upstream.headers.items() if key.lower() not in _HOP_HEADERS}
+
+        async def stream():
+            seen = not learn
+            tail = b""
+            try:
+                async for chunk in upstream.aiter_raw():
+                    if not seen:
+                        match = _TASK_ID.search(tail + chunk) or _task_id_of_result(tail + chunk)
+                        if match:
+                            self._remember(match if isinstance(match, str) else match.group(1).decode(), index)
+                            seen = True
+                        tail = (tail + chunk)[-256:]
+                    yield chunk
+            finally:
+                await upstream.aclose()
+
+        return StreamingResponse(stream(), status_code=upstream.status_code, headers=headers)
+
+    def _remember(self, task_id: str, index: int) -> None:
+        self._tasks[task_id] = index
+        self._tasks.move_to_end(task_id)
+        while len(self._tasks) > self.max_tasks:
+            self._tasks.popitem(last=False)
+
+    async def _metrics(self, request: Request) -> Response:
+        async def worker_metrics(url: str) -> dict:
+            try:
+                return (await self._client.get(url + "/metrics")).json()
+            except (httpx.HTTPError, ValueError) as e:
+                return {"error": str(e)}
+
+        workers = await asyncio.gather(*(worker_metrics(url) for url in self.worker_urls))
+        return JSONResponse({"router": self.stats(), "workers": workers})
+
+
+def _forward_headers(request: Request) -> dict[str, str]:
+    return {key: value for key, value in request.headers.items() if key.lower() not in _HOP_HEADERS}
+
+
+def _task_id_of_result(data: bytes) -> Optional[str]:
+    # A message/send reply that is a whole Task carries its id without "taskId"
+    try:
+        result = json.loads(data).get("result")
+    except (ValueError, AttributeError):
+        return None
+    return result.get("id") if isinstance(result, dict) and result.get("kind") == "task" else None
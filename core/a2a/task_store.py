@@ -0,0 +1,329 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState, TaskStatus
+from a2a.utils import new_agent_text_message
+
+# States after which a task no longer changes
+FINISHED_STATES = (TaskState.completed, TaskState.failed, TaskState.canceled, TaskState.rejected)
+
+# States in which a task is being run by the agent process that saved it
+RUNNING_STATES = (TaskState.submitted, TaskState.working)
+
+
+class SQLiteTaskArchive:
+    """
+    Disk tier for tasks, stored as JSON rows in SQLite.
+    Calls are blocking; TieredTaskStore runs them in a worker thread.
+
+    A running task saved by an earlier process (e.g. before a restart) will
+    never finish, so `load` returns it as failed. Running tasks saved through
+    this instance are returned as saved.
+    """
+
+    def __init__(self, path: str, retention: float = 7 * 24 * 3600):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._running: set[str] = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                context_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at)")
+        self._conn.commit()
+
+    def save(self, task: Task) -> None:
+        with self._lock:
+            if task.status.state in RUNNING_STATES:
+                self._running.add(task.id)
+            else:
+                self._running.discard(task.id)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?)",
+                (task.id, task.context_id, task.status.state.value, task.model_dump_json(), time.time()),
+            )
+            self._conn.commit()
+
+    def load(self, task_id: str) -> Task | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, updated_at FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.retention:
+            return None
+
+        task = Task.model_validate_json(row[0])
+        if task.status.state in RUNNING_STATES and task_id not in self._running:
+            task.status = TaskStatus(
+                state=TaskState.failed,
+                message=new_agent_text_message(
+                    "The agent restarted before the task finished.", task.context_id, task.id
+                ),
+                timestamp=datetime.now(timezone.utc).isoformat(),
+            )
+        return task
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._running.discard(task_id)
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._conn.commit()
+
+    def compact(self) -> int:
+        """
+        Remove tasks older than the retention period and give the space
+        back to the file system.
+
+        Returns:
+            int: Number of tasks removed.
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM tasks WHERE updated_at < ?", (time.time() - self.retention,))
+            self._conn.commit()
+            removed = cursor.rowcount
+            if removed:
+                self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredTaskStore(TaskStore):
+    """
+    A2A task store with a bounded in-memory tier and an optional SQLite tier.
+
+    Tasks are served from an in-memory LRU of at most `max_tasks` entries.
+    Tasks idle for longer than `ttl` seconds, or pushed out by newer ones,
+    are evicted. When an `archive` is configured, finished tasks are written
+    to it as soon as they reach a final state and evicted tasks are written
+    before they are dropped, so `tasks/get` keeps working after eviction and
+    after a restart; the archive is compacted every `compact_interval`
+    seconds. Without an archive only finished tasks are evicted.
+    """
+
+    def __init__(
+        self,
+        max_tasks: int = 1000,
+        ttl: float = 3600,
+        archive: SQLiteTaskArchive = None,
+        compact_interval: float = 3600,
+    ):
+        self.max_tasks = max_tasks
+        self.ttl = ttl
+        self.archive = archive
+        self.compact_interval = compact_interval
+
+        self._tasks: OrderedDict[str, Task] = OrderedDict()
+        self._last_access: dict[str, float] = {}
+        self._archived: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._last_compaction = time.monotonic()
+        self._compaction: asyncio.Task | None = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "archived": 0, "rehydrations": 0, "compacted": 0}
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        """
+        Saves or updates a task; finished tasks are also written to the archive.
+        """
+        async with self._lock:
+            self._store(task)
+            self._archived.discard(task.id)
+
+            if self.archive is not None and task.status.state in FINISHED_STATES:
+                await asyncio.to_thread(self.archive.save, task)
+                self._archived.add(task.id)
+                self._counters["archived"] += 1
+
+            await self._evict()
+        self._maybe_compact()
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        """
+        Retrieves a task from memory, or from the archive if it was evicted.
+        """
+        async with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None and self.archive is not None:
+                task = await asyncio.to_thread(self.archive.load, task_id)
+                if task is not None:
+                    self._counters["rehydrations"] += 1
+                    self._store(task)
+                    self._archived.add(task_id)
+                    await self._evict()
+
+            if task is None:
+                self._counters["misses"] += 1
+                return None
+
+            self._counters["hits"] += 1
+            self._touch(task_id)
+            return task
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        """
+        Deletes a task from both tiers.
+        """
+        async with self._lock:
+            self._tasks.pop(task_id, None)
+            self._last_access.pop(task_id, None)
+            self._archived.discard(task_id)
+            if self.archive is not None:
+                await asyncio.to_thread(self.archive.delete, task_id)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Tasks held in memory, limits and eviction counters.
+        """
+        return {
+            "tasks_in_memory": len(self._tasks),
+            "max_tasks": self.max_tasks,
+            "ttl_seconds": self.ttl,
+            "archive_path": self.archive.path if self.archive else None,
+            **self._counters,
+        }
+
+    async def compact(self) -> int:
+        """
+        Remove expired tasks from the archive and shrink its file.
+
+        Returns:
+            int: Number of tasks removed.
+        """
+        self._last_compaction = time.monotonic()
+        if self.archive is None:
+            return 0
+        removed = await asyncio.to_thread(self.archive.compact)
+        self._counters["compacted"] += removed
+        return removed
+
+    def _store(self, task: Task) -> None:
+        self._tasks[task.id] = task
+        self._touch(task.id)
+
+    def _touch(self, task_id: str) -> None:
+        self._last_access[task_id] = time.monotonic()
+        self._tasks.move_to_end(task_id)
+
+    async def _evict(self) -> None:
+        now = time.monotonic()
+        for task_id, task in list(self._tasks.items()):
+            if len(self._tasks) <= self.max_tasks and now - self._last_access[task_id] <= self.ttl:
+                break
+
+            if self.archive is None:
+                # Nowhere to keep it: a running task must stay reachable
+                if task.status.state not in FINISHED_STATES:
+                    continue
+            elif task_id not in self._archived:
+                await asyncio.to_thread(self.archive.save, task)
+
+            self._tasks.pop(task_id)
+            self._last_access.pop(task_id)
+            self._archived.discard(task_id)
+            self._counters["evictions"] += 1
+
+    def _maybe_compact(self) -> None:
+        if self.archive is None or time.monotonic() - self._last_compaction < self.compact_interval:
+            return
+        if self._compaction is None or self._compaction.done():
+            self._last_compaction = time.monotonic()
+            self._compaction = asyncio.create_task(self.compact())
+
+
+def create_task_store(name: str, spec: str = None) -> TieredTaskStore:
+    """
+    Build the task store for an agent from a spec string, defaulting to the
+    TASK_STORE environment variable:
+
+    - "memory" (default): bounded in-memory store, tasks are lost on restart
+    - "sqlite" or "sqlite:<path>": also keep tasks in SQLite, by default in
+      `tasks/<name>.tasks.db`
+
+    The remaining settings come from environment variables:
+
+    - TASK_STORE_MAX_IN_MEMORY: tasks kept in memory (default 1000)
+    - TASK_STORE_TTL_SECONDS: idle time before a task is evicted from memory (default 3600)
+    - TASK_STORE_RETENTION_SECONDS: how long SQLite keeps a task (default 7 days)
+    - TASK_STORE_COMPACT_INTERVAL_SECONDS: time between compactions of the SQLite file (default 3600)
+
+    Args:
+        name (str): Agent name, used for the default SQLite file name.
+        spec (str): The store specification.
+
+    Returns:
+        TieredTaskStore: The configured task store.
+    """
+    spec = (spec if spec is not None else os.environ.get("TASK_STORE", "memory")).strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+
+    archive = None
+    if kind == "sqlite":
+        archive = SQLiteTaskArchive(
+            arg or os.path.join("tasks", f"{name}.tasks.db"),
+            retention=float(os.environ.get("TASK_STORE_RETENTION_SECONDS", str(7 * 24 * 3600))),
+        )
+        archive.compact()
+    elif kind not in ("", "memory"):
+        raise ValueError(f"Unknown task store: {spec}")
+
+    return TieredTaskStore(
+        max_tasks=int(os.environ.get("TASK_STORE_MAX_IN_MEMORY", "1000")),
+        ttl=float(os.environ.get("TASK_STORE_TTL_SECONDS", "3600")),
+        archive=archive,
+        compact_interval=float(os.environ.get("TASK_STORE_COMPACT_INTERVAL_SECONDS", "3600")),
+    )
+
+
+def worker_task_store_spec(name: str, worker: int, spec: str = None) -> str:
+    """
+    Task store spec for one of several worker processes of an agent. With
+    SQLite every worker gets its own file: a worker only knows which running
+    tasks it saved itself, so on a shared file it would report the running
+    tasks of the other workers as failed. A restarted worker reopens its file.
+
+    Args:
+        name (str): Agent name, used for the default SQLite file name.
+        worker (int): Index of the worker.
+        spec (str): The store specification (defaults to $TASK_STORE).
+
+    Returns:
+        str: The worker's store specification.
+    """
+    spec = (spec if spec is not None else os.environ.get("TASK_STORE", "memory")).strip()
+    kind, _, arg = spec.partition(":")
+    if kind.lower() != "sqlite":
+        return spec
+    if not arg:
+        return f"sqlite:{os.path.join('tasks', f'{name}.{worker}.tasks.db')}"
+    root, extension = os.path.splitext(arg)
+    return f"sqlite:{root}.{worker}{extension}"
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a task cannot be admitted: the wait queue is full or
+    the task waited longer than the queue deadline.
+    """
+
+
+class _Waiter:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Limits how many tasks run at once, globally and per session.
+
+    Tasks over the limits wait in a bounded FIFO queue. A waiter is only
+    skipped over when its own session is at its limit, so one busy
+    session cannot block the others. Tasks are rejected immediately when
+    the queue is full, or once they have waited `queue_timeout` seconds.
+
+    Args:
+        max_concurrent (int): Tasks running at once (0 for no limit).
+        max_per_session (int): Tasks running at once per session (0 for no limit).
+        max_queue (int): Tasks allowed to wait for a slot.
+        queue_timeout (float): Seconds a task may wait before it is rejected.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_per_session: int = 1, max_queue: int = 64, queue_timeout: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._running = 0
+        self._running_by_session: dict[str, int] = {}
+        self._queue: deque[_Waiter] = deque()
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    @asynccontextmanager
+    async def admit(self, session_id: str, on_queued: Callable[[int], Awaitable[Any]] = None):
+        """
+        Hold a slot for the duration of the `async with` block.
+
+        Args:
+            session_id (str): Session (A2A context) the task belongs to.
+            on_queued: Awaited with the queue position when the task has to wait.
+
+        Raises:
+            AdmissionRejected: If the task is not admitted.
+        """
+        await self._acquire(session_id, on_queued)
+        try:
+            yield
+        finally:
+            self._release(session_id)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Running and queued tasks, limits, counters and recent wait times.
+        """
+        waits = sorted(self._waits)
+        return {
+            "running": self._running,
+            "queue_depth": len(self._queue),
+            "max_concurrent": self.max_concurrent,
+            "max_per_session": self.max_per_session,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            **self._counters,
+            "wait_ms": {
+                "count": len(waits),
+                "p50": _percentile_ms(waits, 0.50),
+                "p95": _percentile_ms(waits, 0.95),
+                "max": _percentile_ms(waits, 1.0),
+            },
+        }
+
+    async def _acquire(self, session_id: str, on_queued: Optional[Callable[[int], Awaitable[Any]]]) -> None:
+        # Queued waiters are always blocked by a limit (see _grant), so a free
+        # slot here cannot be jumping the queue
+        if self._has_slot(session_id):
+            self._take(session_id)
+            self._waits.append(0.0)
+            return
+
+        if len(self._queue) >= self.max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(f"Server is busy: {len(self._queue)} tasks are already waiting. Please retry later.")
+
+        waiter = _Waiter(session_id)
+        self._queue.append(waiter)
+        self._counters["queued"] += 1
+        try:
+            if on_queued is not None:
+                await on_queued(len(self._queue))
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted while we were giving up on it
+                self._release(session_id)
+            else:
+                waiter.future.cancel()
+                self._queue.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._counters["rejected_timeout"] += 1
+                raise AdmissionRejected(
+                    f"Server is busy: the task waited {self.queue_timeout:g}s without starting. Please retry later."
+                ) from None
+            raise
+
+        self._waits.append(time.monotonic() - waiter.enqueued_at)
+
+    def _has_slot(self, session_id: str) -> bool:
+        if self.max_concurrent and self._running >= self.max_concurrent:
+            return False
+        if self.max_per_session and self._running_by_session.get(session_id, 0) >= self.max_per_session:
+            return False
+        return True
+
+    def _take(self, session_id: str) -> None:
+        self._running += 1
+        self._running_by_session[session_id] = self._running_by_session.get(session_id, 0) + 1
+        self._counters["admitted"] += 1
+
+    def _release(self, session_id: str) -> None:
+        self._running -= 1
+        remaining = self._running_by_session.get(session_id, 1) - 1
+        if remaining:
+            self._running_by_session[session_id] = remaining
+        else:
+            self._running_by_session.pop(session_id, None)
+        self._grant()
+
+    def _grant(self) -> None:
+        for waiter in list(self._queue):
+            if self.max_concurrent and self._running >= self.max_concurrent:
+                break
+            if waiter.future.done() or not self._has_slot(waiter.session_id):
+                continue
+            self._queue.remove(waiter)
+            self._take(waiter.session_id)
+            waiter.future.set_result(None)
+
+
+def _percentile_ms(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    index = min(len(values) - 1, int(q * len(values)))
+    return round(values[index] * 1000, 3)
+
+
+def create_admission_controller() -> AdmissionController:
+    """
+    Build the admission controller from environment variables:
+
+    - ADMISSION_MAX_CONCURRENT: tasks running at once (default 8, 0 for no limit)
+    - ADMISSION_MAX_PER_SESSION: tasks running at once per session (default 1, 0 for no limit)
+    - ADMISSION_MAX_QUEUE: tasks allowed to wait for a slot (default 64)
+    - ADMISSION_QUEUE_TIMEOUT_SECONDS: wait before a queued task is rejected (default 30)
+    """
+    return AdmissionController(
+        max_concurrent=int(os.environ.get("ADMISSION_MAX_CONCURRENT", "8")),
+        max_per_session=int(os.environ.get("ADMISSION_MAX_PER_SESSION", "1")),
+        max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "64")),
+        queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+    )
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterable
+from contextvars import ContextVar
+from typing import Any
+
+from core.common.cancellation import cancel_and_wait
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a cancelled stream's background task to stop
+STREAM_CANCEL_TIMEOUT = 10.0
+
+_progress_queue: ContextVar[asyncio.Queue | None] = ContextVar("agent_progress_queue", default=None)
+
+
+def report_progress(message: str, **details: Any) -> None:
+    """
+    Report progress from inside a tool to the agent stream that is running it.
+    Does nothing when called outside `stream_with_progress`.
+
+    Args:
+        message (str): Human readable progress message.
+        **details: Extra fields forwarded with the update (e.g. agent name).
+    """
+    queue = _progress_queue.get()
+    if queue is not None:
+        queue.put_nowait(("progress", {"message": message, **details}))
+
+
+async def stream_with_progress(events: AsyncIterable[Any]) -> AsyncIterable[tuple[str, Any]]:
+    """
+    Iterate `events` in a background task and interleave them with progress
+    reported by tools through `report_progress`, as soon as either arrives.
+
+    Yields:
+        tuple[str, Any]: ("event", event) or ("progress", dict).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    token = _progress_queue.set(queue)
+
+    async def pump():
+        try:
+            async for event in events:
+                await queue.put(("event", event))
+        except BaseException as e:
+            await queue.put(("error", e))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            await queue.put(("done", None))
+
+    # The task copies the current context, so tools run by the pump see the queue
+    task = asyncio.create_task(pump())
+    _progress_queue.reset(token)
+
+    try:
+        while True:
+            kind, item = await queue.get()
+            if kind == "done":
+                break
+            if kind == "error":
+                raise item
+            yield kind, item
+    finally:
+        if not task.done() and not await cancel_and_wait(task, STREAM_CANCEL_TIMEOUT):
+            logger.warning("Agent stream did not stop within %ss of being cancelled", STREAM_CANCEL_TIMEOUT)
+
+
+def event_updates(event: Any) -> list[dict[str, Any]]:
+    """
+    Translate a non-final ADK event into incremental stream updates:
+    partial text chunks, tool call starts and tool call results.
+
+    Returns:
+        list[dict[str, Any]]: Updates in the agents' invoke() item format.
+    """
+    updates: list[dict[str, Any]] = []
+
+    if event.partial and event.content and event.content.parts:
+        text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+        if text:
+            updates.append({
+                'is_task_complete': False,
+                'kind': 'text_delta',
+                'updates': text,
+            })
+
+    for call in event.get_function_calls():
+        updates.append({
+            'is_task_complete': False,
+            'kind': 'tool_call',
+            'tool': call.name,
+            'updates': f"Calling tool {call.name}...",
+        })
+
+    for response in event.get_function_responses():
+        updates.append({
+            'is_task_complete': False,
+            'kind': 'tool_result',
+            'tool': response.name,
+            'updates': f"Tool {response.name} finished.",
+        })
+
+    return updates
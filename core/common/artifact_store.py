@@ -0,0 +1,265 @@
+import codecs
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+URI_PREFIX = "artifact://sha256/"
+
+# Code block languages that are stored as files, with their extension and MIME type
+FILE_TYPES = {
+    "html": ("html", "text/html"),
+    "css": ("css", "text/css"),
+    "javascript": ("js", "text/javascript"),
+    "js": ("js", "text/javascript"),
+}
+
+DEFAULT_NAMES = {"html": "index.html", "css": "styles.css", "js": "script.js"}
+
+_CODE_BLOCK = re.compile(r"```[ \t]*(?P<lang>[\w+-]*)[ \t]*(?P<info>[^\n`]*)\n(?P<body>.*?)```", re.DOTALL)
+_FILE_NAME = re.compile(r"[\w\-./]+\.(?:html?|css|js)\b")
+
+
+@dataclass
+class ArtifactRef:
+    """
+    Reference to content held in an ArtifactStore.
+
+    Attributes:
+        digest (str): SHA-256 of the uncompressed content.
+        name (str): File name, e.g. "index.html".
+        mime_type (str): MIME type of the content.
+        size (int): Size of the uncompressed content in bytes.
+    """
+    digest: str
+    name: str
+    mime_type: str
+    size: int
+
+    @property
+    def uri(self) -> str:
+        return URI_PREFIX + self.digest
+
+    def to_metadata(self) -> dict[str, Any]:
+        return {**asdict(self), "uri": self.uri}
+
+    @classmethod
+    def from_metadata(cls, metadata: Optional[dict]) -> Optional["ArtifactRef"]:
+        """
+        Read a reference back from A2A artifact metadata.
+
+        Returns:
+            ArtifactRef | None: The reference, or None if the metadata has none.
+        """
+        if not metadata or not str(metadata.get("uri", "")).startswith(URI_PREFIX):
+            return None
+        return cls(
+            digest=metadata["digest"],
+            name=metadata.get("name", ""),
+            mime_type=metadata.get("mime_type", "application/octet-stream"),
+            size=int(metadata.get("size", 0)),
+        )
+
+    def describe(self) -> str:
+        return f"[{self.name} ({self.mime_type}, {self.size} bytes): {self.uri}]"
+
+
+class ArtifactStore:
+    """
+    Content-addressed file store for generated artifacts such as web pages.
+
+    Content is stored once per SHA-256 digest under `root/<digest[:2]>/`, so
+    regenerating an identical page costs no extra space. With `compress`,
+    files are written gzipped. Content is read back in `chunk_size` chunks
+    so it can be streamed without holding large files in memory.
+    """
+
+    def __init__(self, root: str = "artifacts", compress: bool = False, chunk_size: int = 16384):
+        self.root = root
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._counters = {"stored": 0, "deduplicated": 0, "bytes_written": 0, "bytes_deduplicated": 0}
+
+    def put(self, data: bytes | str, name: str, mime_type: str = "application/octet-stream") -> ArtifactRef:
+        """
+        Store content unless identical content is already stored.
+
+        Args:
+            data (bytes | str): The content; strings are stored as UTF-8.
+            name (str): File name recorded in the reference.
+            mime_type (str): MIME type recorded in the reference.
+
+        Returns:
+            ArtifactRef: Reference to the stored content.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        ref = ArtifactRef(digest=hashlib.sha256(data).hexdigest(), name=name, mime_type=mime_type, size=len(data))
+
+        with self._lock:
+            if self._find(ref.digest) is not None:
+                self._counters["deduplicated"] += 1
+                self._counters["bytes_deduplicated"] += len(data)
+                return ref
+
+            path = self._path(ref.digest, self.compress)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = gzip.compress(data) if self.compress else data
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+            self._counters["stored"] += 1
+            self._counters["bytes_written"] += len(payload)
+        return ref
+
+    def exists(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def iter_bytes(self, digest: str) -> Iterator[bytes]:
+        """
+        Yields:
+            bytes: The uncompressed content, in chunks of at most `chunk_size` bytes.
+
+        Raises:
+            FileNotFoundError: If the digest is not stored.
+        """
+        path = self._find(digest)
+        if path is None:
+            raise FileNotFoundError(f"Artifact not found: {URI_PREFIX}{digest}")
+
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            while chunk := f.read(self.chunk_size):
+                yield chunk
+
+    def iter_text(self, digest: str) -> Iterator[str]:
+        """
+        Like `iter_bytes`, decoded as UTF-8 without splitting characters.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in self.iter_bytes(digest):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+    def read(self, digest: str) -> bytes:
+        return b"".join(self.iter_bytes(digest))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Store location, settings and write/dedup counters.
+        """
+        return {"root": self.root, "compress": self.compress, "chunk_size": self.chunk_size, **self._counters}
+
+    def _path(self, digest: str, compressed: bool) -> str:
+        return os.path.join(self.root, digest[:2], digest + (".gz" if compressed else ""))
+
+    def _find(self, digest: str) -> Optional[str]:
+        if not re.fullmatch(r"[0-9a-f]{64}", digest):
+            return None
+        for compressed in (self.compress, not self.compress):
+            path = self._path(digest, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+
+class ArtifactAssembler:
+    """
+    Rebuilds files streamed as A2A artifact chunks (see `AgentConnector.stream_task`).
+
+    Feed every artifact update to `add`; chunks of a file are joined until
+    its last chunk. A file sent only by reference (a FilePart without its
+    content) comes back with content None.
+    """
+
+    def __init__(self):
+        self._parts: dict[tuple[str, str], list[str]] = {}
+
+    def add(self, update: dict[str, Any]) -> Optional[tuple[ArtifactRef, Optional[str]]]:
+        """
+        Returns:
+            tuple[ArtifactRef, str | None] | None: The file's reference and
+            content once its last chunk arrived, otherwise None (also for
+            artifacts that are not files).
+        """
+        ref = ArtifactRef.from_metadata(update.get("metadata"))
+        if ref is None:
+            return None
+        key = (ref.digest, ref.name)
+        if not update.get("append"):
+            self._parts[key] = []
+        self._parts.setdefault(key, []).append(update.get("text") or "")
+        if not update.get("last_chunk"):
+            return None
+        content = "".join(self._parts.pop(key))
+        return ref, (content if content or ref.size == 0 else None)
+
+
+def externalize_code_blocks(text: str, store: ArtifactStore) -> tuple[str, list[ArtifactRef]]:
+    """
+    Move HTML, CSS and JavaScript code blocks out of a response into the store.
+
+    Each block is replaced by its reference. File names come from the code
+    block's info string or the line before it (e.g. "**about.html**"), and
+    default to `index.html`, `styles.css` and `script.js`.
+
+    Args:
+        text (str): Markdown response containing fenced code blocks.
+        store (ArtifactStore): Where the files are stored.
+
+    Returns:
+        tuple[str, list[ArtifactRef]]: The response with references instead
+        of code, and the stored files in order of appearance.
+    """
+    refs: list[ArtifactRef] = []
+    names: set[str] = set()
+
+    def replace(match: re.Match) -> str:
+        file_type = FILE_TYPES.get(match.group("lang").lower())
+        if file_type is None:
+            return match.group(0)
+        extension, mime_type = file_type
+
+        preceding = text[:match.start()].rstrip().rsplit("\n", 1)[-1]
+        found = _FILE_NAME.search(match.group("info")) or _FILE_NAME.search(preceding)
+        name = found.group(0) if found else None
+        if not name or name in names:
+            name = DEFAULT_NAMES[extension]
+            if name in names:
+                name = f"file-{len(refs) + 1}.{extension}"
+        names.add(name)
+
+        ref = store.put(match.group("body"), name, mime_type)
+        refs.append(ref)
+        return ref.describe()
+
+    return _CODE_BLOCK.sub(replace, text), refs
+
+
+def create_artifact_store() -> ArtifactStore:
+    """
+    Build the artifact store from environment variables:
+
+    - ARTIFACT_STORE_DIR: directory of the store (default "artifacts")
+    - ARTIFACT_STORE_GZIP: "1" to store files gzipped
+    - ARTIFACT_CHUNK_SIZE: bytes per streamed chunk (default 16384)
+    """
+    return ArtifactStore(
+        root=os.environ.get("ARTIFACT_STORE_DIR", "artifacts"),
+        compress=os.environ.get("ARTIFACT_STORE_GZIP", "0") == "1",
+        chunk_size=int(os.environ.get("ARTIFACT_CHUNK_SIZE", "16384")),
+    )
@@ -0,0 +1,74 @@
+import asyncio
+from collections.abc import Awaitable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Seconds between repeated cancellations of a task that has not stopped yet
+CANCEL_RETRY_INTERVAL = 0.05
+
+
+async def cancel_and_wait(task: asyncio.Task, timeout: float) -> bool:
+    """
+    Cancel `task` and wait until it finishes, cancelling it again every
+    `CANCEL_RETRY_INTERVAL` seconds: library code (e.g. an HTTP client
+    closing its connections) can swallow a single cancellation and carry on.
+
+    A cancellation of the caller while it waits does not stop the wait;
+    it is raised once the task has finished or the time is up.
+
+    Args:
+        task (asyncio.Task): The task to stop.
+        timeout (float): Seconds to keep trying.
+
+    Returns:
+        bool: True if the task finished within `timeout`.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interrupted = False
+    while not task.done():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        task.cancel()
+        try:
+            await asyncio.wait({task}, timeout=min(CANCEL_RETRY_INTERVAL, remaining))
+        except asyncio.CancelledError:
+            interrupted = True
+
+    if interrupted:
+        raise asyncio.CancelledError()
+    return task.done()
+
+
+async def run_to_completion(awaitable: Awaitable[T], timeout: float) -> T | None:
+    """
+    Run cleanup that must not be cut short, e.g. telling a child agent to
+    stop, although the caller is being cancelled (possibly repeatedly, see
+    `cancel_and_wait`). A cancellation of the caller is raised afterwards.
+
+    Args:
+        awaitable (Awaitable): The cleanup to run.
+        timeout (float): Seconds after which the cleanup is abandoned.
+
+    Returns:
+        The cleanup's result, or None if it did not finish in time.
+    """
+    task: asyncio.Future[Any] = asyncio.ensure_future(awaitable)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interrupted = False
+    while not task.done():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            task.cancel()
+            break
+        try:
+            await asyncio.wait({task}, timeout=remaining)
+        except asyncio.CancelledError:
+            interrupted = True
+
+    if interrupted:
+        raise asyncio.CancelledError()
+    return task.result() if task.done() and not task.cancelled() else None
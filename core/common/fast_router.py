@@ -0,0 +1,218 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+class RouteError(ValueError):
+    """
+    Raised when a structured command is recognised but malformed.
+    """
+
+
+@dataclass
+class Route:
+    """
+    A configured fast-path rule.
+
+    Args:
+        name (str): Route name used in metrics.
+        pattern (re.Pattern): Pattern matched against the whole query.
+        action (str): "list_agents", "delegate" or "tool".
+        tool (str): Tool to call for the "tool" action.
+        arguments (dict): Tool arguments; string values are formatted with
+            the pattern's named groups (e.g. "{command}").
+    """
+    name: str
+    pattern: re.Pattern
+    action: str
+    tool: Optional[str] = None
+    arguments: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RouteMatch:
+    route: str
+    action: str
+    arguments: dict[str, Any]
+    explicit: bool = False  # structured command, so errors are reported instead of falling through
+
+
+ACTIONS = ("list_agents", "delegate", "tool")
+
+COMMANDS_HELP = (
+    "Commands: /agents | /delegate <agent> <message> | /tool <name> [json arguments]"
+)
+
+
+def load_routes(path: str) -> list[Route]:
+    """
+    Load routes from a JSON file containing a list of
+    {"name", "pattern", "action", "tool"?, "arguments"?} objects.
+    Patterns are matched case-insensitively against the stripped query.
+
+    Returns:
+        list[Route]: The routes, or an empty list if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Routes file must contain a list of routes.")
+
+    routes = []
+    for entry in data:
+        if entry.get("action") not in ACTIONS:
+            raise ValueError(f"Route '{entry.get('name')}' has unknown action: {entry.get('action')}")
+        routes.append(Route(
+            name=entry["name"],
+            pattern=re.compile(entry["pattern"], re.IGNORECASE | re.DOTALL),
+            action=entry["action"],
+            tool=entry.get("tool"),
+            arguments=entry.get("arguments", {}),
+        ))
+    return routes
+
+
+class FastPathRouter:
+    """
+    Rule-based pre-router that recognises direct commands so they can be
+    executed without an LLM turn.
+
+    Two kinds of input are matched:
+
+    - Structured commands starting with "/": `/agents`,
+      `/delegate <agent> <message>` and `/tool <name> [json arguments]`.
+    - Configured routes (see `load_routes`), e.g. "list agents" or
+      "send <message> to <agent>".
+
+    Everything else returns None and should go to the LLM. The caller
+    reports the outcome with `record` so decisions show up in `stats()`.
+    """
+
+    def __init__(self, routes: list[Route] = None, enabled: bool = True):
+        self.routes = routes or []
+        self.enabled = enabled
+        self._counters = {"fast_path": 0, "llm": 0, "errors": 0}
+        self._by_route: dict[str, int] = {}
+        self._fast_path_seconds = 0.0
+
+    def match(self, query: str) -> Optional[RouteMatch]:
+        """
+        Raises:
+            RouteError: If the query is a structured command with invalid syntax.
+
+        Returns:
+            Optional[RouteMatch]: The matched route, or None to fall through to the LLM.
+        """
+        if not self.enabled:
+            return None
+
+        query = query.strip()
+        if query.startswith("/"):
+            return self._match_command(query)
+
+        for route in self.routes:
+            found = route.pattern.fullmatch(query)
+            if found is None:
+                continue
+            groups = {key: value.strip() for key, value in found.groupdict().items() if value is not None}
+            return RouteMatch(route=route.name, action=route.action, arguments=self._arguments(route, groups))
+
+        return None
+
+    def record(self, decision: str, route: str = None, seconds: float = 0.0) -> None:
+        """
+        Record a routing outcome: "fast_path", "llm" or "errors".
+        """
+        self._counters[decision] += 1
+        if route is not None:
+            self._by_route[route] = self._by_route.get(route, 0) + 1
+        self._fast_path_seconds += seconds
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Routing decision counters.
+        """
+        total = sum(self._counters.values())
+        handled = self._counters["fast_path"]
+        return {
+            "enabled": self.enabled,
+            **self._counters,
+            "fast_path_ratio": round(handled / total, 4) if total else None,
+            "fast_path_avg_ms": round(self._fast_path_seconds / handled * 1000, 3) if handled else None,
+            "routes": dict(self._by_route),
+        }
+
+    @staticmethod
+    def _match_command(query: str) -> Optional[RouteMatch]:
+        command, _, rest = query[1:].partition(" ")
+        command = command.lower()
+        rest = rest.strip()
+
+        if command == "agents":
+            return RouteMatch(route="/agents", action="list_agents", arguments={}, explicit=True)
+
+        if command == "delegate":
+            agent, _, message = rest.partition(" ")
+            if not agent or not message.strip():
+                raise RouteError(f"Usage: /delegate <agent> <message>\n{COMMANDS_HELP}")
+            return RouteMatch(
+                route="/delegate",
+                action="delegate",
+                arguments={"agent_name": agent, "message": message.strip()},
+                explicit=True,
+            )
+
+        if command == "tool":
+            name, _, raw_arguments = rest.partition(" ")
+            if not name:
+                raise RouteError(f"Usage: /tool <name> [json arguments]\n{COMMANDS_HELP}")
+            arguments = {}
+            if raw_arguments.strip():
+                try:
+                    arguments = json.loads(raw_arguments)
+                except json.JSONDecodeError as e:
+                    raise RouteError(f"Invalid JSON arguments for /tool {name}: {e}") from e
+                if not isinstance(arguments, dict):
+                    raise RouteError(f"Arguments for /tool {name} must be a JSON object")
+            return RouteMatch(
+                route="/tool",
+                action="tool",
+                arguments={"tool": name, "arguments": arguments},
+                explicit=True,
+            )
+
+        # Not one of ours (e.g. a path); let the LLM handle it
+        return None
+
+    @staticmethod
+    def _arguments(route: Route, groups: dict[str, str]) -> dict[str, Any]:
+        if route.action == "list_agents":
+            return {}
+        if route.action == "delegate":
+            return {"agent_name": groups["agent"], "message": groups["message"]}
+
+        arguments = {
+            key: value.format(**groups) if isinstance(value, str) else value
+            for key, value in route.arguments.items()
+        }
+        return {"tool": route.tool, "arguments": arguments}
+
+
+def create_fast_path_router(default_routes_file: str) -> FastPathRouter:
+    """
+    Build the router from environment variables:
+
+    - FAST_PATH: "0" to send every query to the LLM (default "1")
+    - FAST_PATH_ROUTES: routes file (defaults to `default_routes_file`)
+    """
+    return FastPathRouter(
+        routes=load_routes(os.environ.get("FAST_PATH_ROUTES", default_routes_file)),
+        enabled=os.environ.get("FAST_PATH", "1") != "0",
+    )
+
@@ -0,0 +1,286 @@
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from google.genai import types
+
+# Rough token estimate used for budgeting; close enough for Gemini on English and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """
+    Estimate the number of prompt tokens used by a list of contents.
+    """
+    return sum(_content_chars(content) for content in contents) // CHARS_PER_TOKEN
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_response is not None:
+        return len(json.dumps(part.function_response.response, default=str))
+    if part.function_call is not None:
+        return len(json.dumps(part.function_call.args, default=str))
+    return 0
+
+
+def _content_chars(content: types.Content) -> int:
+    return sum(_part_chars(part) for part in content.parts or [])
+
+
+def extractive_summary(contents: list[types.Content], max_chars_per_part: int = 200) -> str:
+    """
+    Summarise contents without a model call: one line per message or tool
+    interaction, with long text cut down to `max_chars_per_part`.
+    """
+    lines = []
+    for content in contents:
+        for part in content.parts or []:
+            if part.text and not part.thought:
+                text = " ".join(part.text.split())
+                if len(text) > max_chars_per_part:
+                    text = text[:max_chars_per_part] + "..."
+                lines.append(f"- {content.role}: {text}")
+            elif part.function_call is not None:
+                lines.append(f"- {content.role} called tool {part.function_call.name}")
+            elif part.function_response is not None:
+                lines.append(f"- tool {part.function_response.name} returned a result")
+    return "\n".join(lines)
+
+
+@dataclass
+class SessionTokenStats:
+    turns: int = 0
+    estimated_prompt_tokens: int = 0
+    estimated_tokens_saved: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    last_prompt_tokens: int = 0
+
+
+@dataclass
+class _RollingSummary:
+    text: str = ""
+    covered: int = 0  # number of leading contents folded into `text`
+    fingerprint: list[str] = field(default_factory=list)
+
+
+class HistoryCompactor:
+    """
+    Keeps the prompt an agent sends to the model within a token budget.
+
+    Installed as the agent's before/after model callbacks, it works on a
+    copy of the request contents in three stages:
+
+    1. Tool results and long messages older than the last `keep_recent_turns`
+       user turns are elided down to a short preview.
+    2. If the estimate still exceeds `token_budget`, the oldest whole turns
+       are folded into a rolling summary that is extended incrementally
+       across calls instead of being rebuilt.
+    3. Estimated and reported (usage metadata) token counts are accounted
+       per session and exposed through `stats()`.
+
+    The session's stored events are never modified.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 24000,
+        keep_recent_turns: int = 3,
+        max_old_part_chars: int = 1500,
+        summarizer: Callable[[list[types.Content]], str] = extractive_summary,
+        max_tracked_sessions: int = 1000,
+    ):
+        if keep_recent_turns < 0:
+            raise ValueError(f"keep_recent_turns must not be negative, got {keep_recent_turns}")
+
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.max_old_part_chars = max_old_part_chars
+        self.summarizer = summarizer
+        self.max_tracked_sessions = max_tracked_sessions
+
+        self._summaries: OrderedDict[str, _RollingSummary] = OrderedDict()
+        self._stats: OrderedDict[str, SessionTokenStats] = OrderedDict()
+
+    def before_model_callback(self, callback_context, llm_request) -> Optional[Any]:
+        session_id = _session_id(callback_context)
+        contents = list(llm_request.contents or [])
+        before = estimate_tokens(contents)
+
+        turn_starts = [i for i, content in enumerate(contents) if _is_user_turn(content)]
+        if self.keep_recent_turns <= 0:
+            # No turn is protected from compaction
+            recent_start = len(contents)
+        elif len(turn_starts) >= self.keep_recent_turns:
+            recent_start = turn_starts[-self.keep_recent_turns]
+        else:
+            recent_start = 0
+
+        contents = [
+            self._elide(content) if i < recent_start else content
+            for i, content in enumerate(contents)
+        ]
+
+        contents = self._summarize(session_id, contents, turn_starts, recent_start)
+
+        after = estimate_tokens(contents)
+        llm_request.contents = contents
+
+        stats = self._session_stats(session_id)
+        stats.turns += 1
+        stats.estimated_prompt_tokens = after
+        stats.estimated_tokens_saved += before - after
+        return None
+
+    def after_model_callback(self, callback_context, llm_response) -> Optional[Any]:
+        usage = getattr(llm_response, "usage_metadata", None)
+        if usage is None:
+            return None
+
+        stats = self._session_stats(_session_id(callback_context))
+        stats.last_prompt_tokens = usage.prompt_token_count or 0
+        stats.prompt_tokens += usage.prompt_token_count or 0
+        stats.completion_tokens += usage.candidates_token_count or 0
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Totals across sessions plus the per-session accounting.
+        """
+        sessions = {session_id: vars(stats) for session_id, stats in self._stats.items()}
+        return {
+            "token_budget": self.token_budget,
+            "tracked_sessions": len(sessions),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in sessions.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in sessions.values()),
+            "estimated_tokens_saved": sum(s["estimated_tokens_saved"] for s in sessions.values()),
+            "sessions": sessions,
+        }
+
+    def _elide(self, content: types.Content) -> types.Content:
+        parts = []
+        changed = False
+        for part in content.parts or []:
+            if part.function_response is not None and _part_chars(part) > self.max_old_part_chars:
+                preview = json.dumps(part.function_response.response, default=str)
+                response = {
+                    "result": preview[:self.max_old_part_chars],
+                    "elided": f"{len(preview) - self.max_old_part_chars} characters of this old tool result were removed",
+                }
+                parts.append(types.Part(function_response=types.FunctionResponse(
+                    id=part.function_response.id,
+                    name=part.function_response.name,
+                    response=response,
+                )))
+                changed = True
+            elif part.text and len(part.text) > self.max_old_part_chars:
+                removed = len(part.text) - self.max_old_part_chars
+                parts.append(types.Part.from_text(
+                    text=f"{part.text[:self.max_old_part_chars]}\n[... {removed} characters elided from this old message]"
+                ))
+                changed = True
+            else:
+                parts.append(part)
+
+        if not changed:
+            return content
+        return types.Content(role=content.role, parts=parts)
+
+    def _summarize(self, session_id: str, contents: list, turn_starts: list[int], recent_start: int) -> list:
+        # Reuse the session's summary while the history it covers is unchanged,
+        # and fold further whole turns, oldest first, only while over budget
+        # (the most recent turns are always kept)
+        summary = self._summaries.get(session_id) or _RollingSummary()
+        fingerprint = [_fingerprint(content) for content in contents[:summary.covered]]
+        if summary.fingerprint != fingerprint:
+            summary = _RollingSummary()
+
+        cut = summary.covered
+        for start in turn_starts:
+            if start <= cut or start > recent_start:
+                continue
+            if estimate_tokens(contents[cut:]) + len(summary.text) // CHARS_PER_TOKEN <= self.token_budget:
+                break
+            cut = start
+
+        if cut > summary.covered:
+            addition = self.summarizer(contents[summary.covered:cut])
+            summary.text = f"{summary.text}\n{addition}".strip()
+            # Keep the summary itself to a quarter of the budget, dropping its oldest lines
+            max_chars = self.token_budget * CHARS_PER_TOKEN // 4
+            if len(summary.text) > max_chars:
+                summary.text = summary.text[-max_chars:].partition("\n")[2]
+            summary.covered = cut
+            summary.fingerprint = [_fingerprint(content) for content in contents[:cut]]
+
+        if summary.covered == 0:
+            return contents
+
+        self._summaries[session_id] = summary
+        self._summaries.move_to_end(session_id)
+        while len(self._summaries) > self.max_tracked_sessions:
+            self._summaries.popitem(last=False)
+
+        header = types.Content(role="user", parts=[types.Part.from_text(
+            text=f"Summary of the earlier conversation (older turns were compacted):\n{summary.text}"
+        )])
+        return [header, *contents[summary.covered:]]
+
+    def _session_stats(self, session_id: str) -> SessionTokenStats:
+        stats = self._stats.get(session_id)
+        if stats is None:
+            stats = SessionTokenStats()
+            self._stats[session_id] = stats
+            while len(self._stats) > self.max_tracked_sessions:
+                self._stats.popitem(last=False)
+        return stats
+
+
+def _is_user_turn(content: types.Content) -> bool:
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def _fingerprint(content: types.Content) -> str:
+    return f"{content.role}:{_content_chars(content)}"
+
+
+def _session_id(callback_context) -> str:
+    session = getattr(callback_context, "session", None)
+    if session is None:
+        session = callback_context._invocation_context.session
+    return session.id
+
+
+def create_history_compactor() -> HistoryCompactor:
+    """
+    Build a compactor from environment variables:
+
+    - HISTORY_TOKEN_BUDGET: prompt token budget (default 24000)
+    - HISTORY_KEEP_RECENT_TURNS: user turns never compacted (default 3, 0 to compact every turn)
+    - HISTORY_MAX_OLD_PART_CHARS: size old tool results/messages are cut to (default 1500)
+
+    Raises:
+        ValueError: If a variable is not an integer or is out of range.
+    """
+    return HistoryCompactor(
+        token_budget=_env_int("HISTORY_TOKEN_BUDGET", 24000, minimum=1),
+        keep_recent_turns=_env_int("HISTORY_KEEP_RECENT_TURNS", 3, minimum=0),
+        max_old_part_chars=_env_int("HISTORY_MAX_OLD_PART_CHARS", 1500, minimum=1),
+    )
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    raw = os.environ.get(name, str(default))
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw!r}") from None
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, got {value}")
+    return value
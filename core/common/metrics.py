@@ -0,0 +1,41 @@
+from collections.abc import Callable
+from typing import Any
+
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """
+    Register a callable that returns a dictionary of metrics under `name`.
+    Registering the same name again replaces the previous provider.
+    """
+    _providers[name] = provider
+
+
+def metrics_snapshot() -> dict[str, Any]:
+    """
+    Collect the current values from every registered provider.
+
+    Returns:
+        dict[str, Any]: Metrics keyed by provider name.
+    """
+    snapshot = {}
+    for name, provider in list(_providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+def mount_metrics(app, path: str = "/metrics") -> None:
+    """
+    Add a GET endpoint serving `metrics_snapshot()` as JSON to a Starlette app.
+    """
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    async def metrics_endpoint(request):
+        return JSONResponse(metrics_snapshot())
+
+    app.router.routes.append(Route(path, metrics_endpoint, methods=["GET"]))
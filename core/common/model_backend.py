@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import re
+from collections.abc import AsyncGenerator
+from typing import Any, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from core.common.metrics import register_metrics
+
+
+class StubLlm(BaseLlm):
+    """
+    Deterministic stand-in for a real model, for benchmarks and offline runs.
+
+    Responses come from a script of rules, tried in order against the latest
+    user message:
+
+        {"match": "^add (?P<a>\\d+) and (?P<b>\\d+)",  # regex, searched case-insensitively
+         "instruction": "orchestrator",               # optional: system instruction must contain this
+         "tool_call": {"name": "add_numbers", "args": {"input": {"a": "{a}", "b": "{b}"}}},
+         "after_tool": "The result is {result}",      # answer once the tool has returned
+         "latency_ms": 20}
+
+    or `"text": "..."` instead of `tool_call`. Strings may use the regex's
+    named groups, `{query}` and, in `after_tool`, `{tool}` and `{result}`;
+    a string that is exactly one placeholder keeps the type of a numeric
+    value. Without a matching rule the stub echoes the query. Every call
+    sleeps `latency_ms` (per rule or the script default) before answering,
+    and streamed text is split into `stream_chunks` partial responses.
+    """
+
+    model: str = "stub"
+    rules: list[dict[str, Any]] = []
+    latency_ms: float = 0.0
+    stream_chunks: int = 4
+    default_text: str = "Stub response to: {query}"
+
+    _calls: int = PrivateAttr(default=0)
+    _seconds: float = PrivateAttr(default=0.0)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        query = _last_user_text(llm_request)
+        tool_response = _last_tool_response(llm_request)
+        rule, values = self._match(query, _system_instruction(llm_request))
+
+        latency = rule.get("latency_ms", self.latency_ms) / 1000
+        await asyncio.sleep(latency)
+
+        if tool_response is not None:
+            values.update(tool=tool_response.name, result=_tool_result_text(tool_response.response))
+            text = _render(rule.get("after_tool", "{result}"), values)
+            part = types.Part.from_text(text=text)
+        elif "tool_call" in rule:
+            call = rule["tool_call"]
+            text = None
+            part = types.Part(function_call=types.FunctionCall(
+                name=call["name"], args=_render(call.get("args", {}), values)
+            ))
+        else:
+            text = _render(rule.get("text", self.default_text), values)
+            part = types.Part.from_text(text=text)
+
+        self._calls += 1
+        self._seconds += latency
+
+        if stream and text:
+            size = max(1, -(-len(text) // self.stream_chunks))
+            for start in range(0, len(text), size):
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part.from_text(text=text[start:start + size])]),
+                    partial=True,
+                )
+        yield LlmResponse(content=types.Content(role="model", parts=[part]), partial=False, turn_complete=True)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Number of calls and the scripted latency they added up to.
+        """
+        return {"rules": len(self.rules), "calls": self._calls, "seconds": round(self._seconds, 6)}
+
+    def _match(self, query: str, instruction: str) -> tuple[dict[str, Any], dict[str, Any]]:
+        for rule in self.rules:
+            if rule.get("instruction") and rule["instruction"] not in instruction:
+                continue
+            match = re.search(rule.get("match", ""), query, re.IGNORECASE | re.DOTALL)
+            if match:
+                return rule, {"query": query, **{k: v for k, v in match.groupdict().items() if v is not None}}
+        return {}, {"query": query}
+
+
+def _system_instruction(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    return instruction if isinstance(instruction, str) else str(instruction or "")
+
+
+def _last_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents):
+        if content.role == "user" and content.parts:
+            text = "".join(part.text for part in content.parts if part.text)
+            if text:
+                return text
+    return ""
+
+
+def _last_tool_response(llm_request: LlmRequest) -> Optional[types.FunctionResponse]:
+    # Only a tool result at the end of the conversation is waiting for an answer
+    if not llm_request.contents or not llm_request.contents[-1].parts:
+        return None
+    for part in llm_request.contents[-1].parts:
+        if part.function_response:
+            return part.function_response
+    return None
+
+
+def _tool_result_text(response: Optional[dict]) -> str:
+    if not response:
+        return ""
+    # MCP results carry text content; function tools return {"result": ...}
+    content = response.get("content")
+    if isinstance(content, list):
+        texts = [item.get("text") for item in content if isinstance(item, dict) and item.get("text")]
+        if texts:
+            return "\n".join(texts)
+    if "result" in response:
+        result = response["result"]
+        return result if isinstance(result, str) else json.dumps(result, default=str)
+    return json.dumps(response, default=str)
+
+
+def _render(template: Any, values: dict[str, Any]) -> Any:
+    if isinstance(template, dict):
+        return {key: _render(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_render(value, values) for value in template]
+    if not isinstance(template, str):
+        return template
+
+    whole = re.fullmatch(r"\{(\w+)\}", template)
+    if whole and whole.group(1) in values:
+        value = values[whole.group(1)]
+        return json.loads(value) if re.fullmatch(r"-?\d+(\.\d+)?", value) else value
+    return re.sub(r"\{(\w+)\}", lambda m: str(values.get(m.group(1), m.group(0))), template)
+
+
+def load_stub_script(path: str) -> StubLlm:
+    """
+    Build a StubLlm from a JSON script: `{"latency_ms": ..., "rules": [...]}`
+    or just the list of rules.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        script = json.load(f)
+    if isinstance(script, list):
+        script = {"rules": script}
+    return StubLlm(**script)
+
+
+_stub: Optional[StubLlm] = None
+
+
+def create_model(default: str) -> str | BaseLlm:
+    """
+    Pick the model backend for an agent from the MODEL_BACKEND environment variable:
+
+    - "gemini" (default): the `default` model name, resolved by ADK
+    - "stub" or "stub:<script.json>": a StubLlm answering from a script
+
+    STUB_LLM_LATENCY_MS overrides the script's default latency. All agents
+    in a process share one stub, whose usage is reported under `model.stub`.
+
+    Args:
+        default (str): Model name used by the real backend.
+
+    Returns:
+        str | BaseLlm: A value for `LlmAgent(model=...)`.
+    """
+    global _stub
+    spec = os.environ.get("MODEL_BACKEND", "gemini").strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+
+    if kind in ("", "gemini", "google"):
+        return default
+    if kind != "stub":
+        raise ValueError(f"Unknown model backend: {spec}")
+
+    if _stub is None:
+        _stub = load_stub_script(arg) if arg else StubLlm()
+        if os.environ.get("STUB_LLM_LATENCY_MS"):
+            _stub.latency_ms = float(os.environ["STUB_LLM_LATENCY_MS"])
+        register_metrics("model.stub", _stub.stats)
+    return _stub
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise a query for cache lookups: case-folded, with runs of whitespace collapsed.
+    """
+    return " ".join(query.split()).casefold()
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Stable hash of the values that shape an agent's answers
+    (model, system instruction, tool names, ...).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def is_cache_bypassed(metadata: Optional[dict]) -> bool:
+    """
+    Whether a request asked to skip the cache via message metadata:
+    `{"cache": "bypass"}` or `{"no_cache": true}`.
+    """
+    if not metadata:
+        return False
+    return metadata.get("cache") == "bypass" or bool(metadata.get("no_cache"))
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of final agent responses with a TTL.
+
+    Keys combine the agent name, the agent's fingerprint and the normalised
+    query, so changing the instructions or tools invalidates old entries.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, Any]] = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "bypassed": 0}
+
+    @staticmethod
+    def key(agent: str, agent_fingerprint: str, query: str) -> tuple[str, str, str]:
+        return (agent, agent_fingerprint, normalize_query(query))
+
+    def get(self, key: tuple[str, str, str]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return None
+
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._counters["expired"] += 1
+            self._counters["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return response
+
+    def put(self, key: tuple[str, str, str], response: Any) -> None:
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        self._counters["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        self._counters["bypassed"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Entry count, limits and hit/miss counters.
+        """
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Build the response cache from environment variables, or return None when
+    it is not enabled (the cache is opt-in):
+
+    - RESPONSE_CACHE: "1" to enable
+    - RESPONSE_CACHE_MAX_ENTRIES: entries kept (default 256)
+    - RESPONSE_CACHE_TTL_SECONDS: entry lifetime (default 3600)
+    """
+    if os.environ.get("RESPONSE_CACHE", "0") != "1":
+        return None
+    return ResponseCache(
+        max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+        ttl=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+    )
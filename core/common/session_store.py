@@ -0,0 +1,266 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+
+
+class SQLiteSessionSpill:
+    """
+    Disk tier for sessions evicted from memory, stored as JSON rows in SQLite.
+    Calls are blocking; BoundedSessionService runs them in a worker thread.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                app_name TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (app_name, user_id, session_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, session: Session) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, session.model_dump_json(), time.time()),
+            )
+            self._conn.commit()
+
+    def load(self, app_name: str, user_id: str, session_id: str) -> Session | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, updated_at FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return Session.model_validate_json(row[0])
+
+    def delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Returns:
+            int: Number of rows removed because they outlived the TTL.
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    InMemorySessionService with LRU and TTL eviction.
+
+    At most `max_sessions` sessions are kept in memory, and sessions idle
+    for longer than `ttl` seconds are evicted. When a `spill` store is
+    configured, evicted sessions are written to disk and transparently
+    rehydrated by the next `get_session` or `append_event`. With
+    `write_through`, sessions are also saved at the end of every turn so
+    they survive a restart.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl: float = 3600,
+        spill: SQLiteSessionSpill = None,
+        write_through: bool = False,
+    ):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.spill = spill
+        self.write_through = write_through and spill is not None
+
+        self._last_access: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "rehydrations": 0, "spills": 0}
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._touch(app_name, user_id, session.id)
+        await self._evict()
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, config=None) -> Optional[Session]:
+        if not self._in_memory(app_name, user_id, session_id):
+            if not await self._rehydrate(app_name, user_id, session_id):
+                self._counters["misses"] += 1
+                return None
+
+        self._counters["hits"] += 1
+        self._touch(app_name, user_id, session_id)
+        await self._evict()
+        return await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._last_access.pop((app_name, user_id, session_id), None)
+        if self.spill is not None:
+            await asyncio.to_thread(self.spill.delete, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        if not self._in_memory(*key):
+            # Evicted while the runner still held a copy: bring it back first
+            if not await self._rehydrate(*key):
+                self._store(session.model_copy(deep=True))
+
+        event = await super().append_event(session=session, event=event)
+        self._touch(*key)
+
+        if self.write_through and event.is_final_response():
+            stored = self.sessions[session.app_name][session.user_id][session.id]
+            await asyncio.to_thread(self.spill.save, stored)
+
+        return event
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Sessions and events held in memory plus eviction counters.
+        """
+        events = 0
+        for users in self.sessions.values():
+            for sessions in users.values():
+                for session in sessions.values():
+                    events += len(session.events)
+
+        return {
+            "sessions_in_memory": len(self._last_access),
+            "events_in_memory": events,
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl,
+            "spill_path": self.spill.path if self.spill else None,
+            **self._counters,
+        }
+
+    async def flush(self) -> None:
+        """
+        Write every in-memory session to the spill store (e.g. before shutdown).
+        """
+        if self.spill is None:
+            return
+        for app_name, user_id, session_id in list(self._last_access):
+            stored = self.sessions[app_name][user_id][session_id]
+            await asyncio.to_thread(self.spill.save, stored)
+
+    def _in_memory(self, app_name: str, user_id: str, session_id: str) -> bool:
+        return session_id in self.sessions.get(app_name, {}).get(user_id, {})
+
+    def _store(self, session: Session) -> None:
+        # InMemorySessionService keeps sessions in sessions[app][user][id]
+        self.sessions.setdefault(session.app_name, {}).setdefault(session.user_id, {})[session.id] = session
+
+    def _touch(self, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._last_access[key] = time.monotonic()
+        self._last_access.move_to_end(key)
+
+    async def _rehydrate(self, app_name: str, user_id: str, session_id: str) -> bool:
+        if self.spill is None:
+            return False
+        session = await asyncio.to_thread(self.spill.load, app_name, user_id, session_id)
+        if session is None:
+            return False
+
+        self._store(session)
+        self._touch(app_name, user_id, session_id)
+        self._counters["rehydrations"] += 1
+        return True
+
+    async def _evict(self) -> None:
+        now = time.monotonic()
+        while self._last_access:
+            key, last_access = next(iter(self._last_access.items()))
+            if len(self._last_access) <= self.max_sessions and now - last_access <= self.ttl:
+                break
+
+            self._last_access.pop(key)
+            app_name, user_id, session_id = key
+            stored = self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            self._counters["evictions"] += 1
+
+            if stored is not None and self.spill is not None:
+                await asyncio.to_thread(self.spill.save, stored)
+                self._counters["spills"] += 1
+
+
+def create_session_service(name: str) -> BoundedSessionService:
+    """
+    Build the session service for an agent from environment variables:
+
+    - SESSION_MAX_IN_MEMORY: sessions kept in memory (default 1000)
+    - SESSION_TTL_SECONDS: idle time before a session is evicted (default 3600)
+    - SESSION_SPILL_DIR: directory for the SQLite disk tier (disabled if unset);
+      each agent uses its own `<name>.sessions.db` file in it
+    - SESSION_WRITE_THROUGH: "1" to also save sessions after every turn
+
+    Args:
+        name (str): Agent name, used for the spill file name.
+
+    Returns:
+        BoundedSessionService: The configured session service.
+    """
+    spill = None
+    spill_dir = os.environ.get("SESSION_SPILL_DIR")
+    if spill_dir:
+        spill = SQLiteSessionSpill(os.path.join(spill_dir, f"{name}.sessions.db"))
+        spill.purge_expired()
+
+    return BoundedSessionService(
+        max_sessions=int(os.environ.get("SESSION_MAX_IN_MEMORY", "1000")),
+        ttl=float(os.environ.get("SESSION_TTL_SECONDS", "3600")),
+        spill=spill,
+        write_through=os.environ.get("SESSION_WRITE_THROUGH", "0") == "1",
+    )
@@ -0,0 +1,64 @@
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+REPORT_PREFIX = "Startup profile: "
+
+
+class StartupProfile:
+    """
+    Times the phases of a server's startup.
+
+    Create it before the entry point's heavy imports, then call `mark` at
+    the end of each phase; `attach` marks the final "serve" phase once the
+    app has started. Phases are reported under `<name>.startup` in
+    `/metrics`, and printed as one JSON line when STARTUP_PROFILE=1 (see
+    `benchmarks/cold_start.py`).
+
+    Args:
+        name (str): Name of the server, e.g. "host_agent".
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.ready_seconds: Optional[float] = None
+        self._last = self.started
+        self._phases: dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """
+        End `phase`, which started when the previous one ended.
+        """
+        now = time.perf_counter()
+        self._phases[phase] = round(now - self._last, 4)
+        self._last = now
+
+    def ready(self) -> None:
+        self.mark("serve")
+        self.ready_seconds = round(self._last - self.started, 4)
+        if os.environ.get("STARTUP_PROFILE", "0") == "1":
+            print(REPORT_PREFIX + json.dumps({"name": self.name, **self.stats()}), flush=True)
+
+    def attach(self, app) -> None:
+        """
+        Call `ready` once the Starlette `app` has completed its startup.
+        """
+        lifespan = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def profiled_lifespan(app):
+            async with lifespan(app) as state:
+                self.ready()
+                yield state
+
+        app.router.lifespan_context = profiled_lifespan
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Seconds spent in each phase and in total until ready.
+        """
+        return {"phases": dict(self._phases), "ready_seconds": self.ready_seconds}
@@ -0,0 +1,355 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+from a2a.client import A2ACardResolver
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+MCP_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+}
+
+Probe = Callable[[httpx.AsyncClient], Awaitable[None]]
+
+
+@dataclass
+class Component:
+    """
+    One part of the stack.
+
+    Attributes:
+        name (str): Name used in logs and as a dependency target.
+        command (list[str] | None): Command starting the component, or None
+            for a component that runs elsewhere and is only probed.
+        probe (Probe): Coroutine that returns once the component serves
+            requests and raises otherwise.
+        depends_on (list[str]): Components that must be ready before this one starts.
+    """
+    name: str
+    command: Optional[list[str]]
+    probe: Probe
+    depends_on: list[str] = field(default_factory=list)
+
+
+def agent_card_probe(url: str) -> Probe:
+    """Ready once the agent serves its card."""
+    async def probe(client: httpx.AsyncClient) -> None:
+        await A2ACardResolver(base_url=url.rstrip("/"), httpx_client=client).get_agent_card()
+    return probe
+
+
+def mcp_ping_probe(url: str) -> Probe:
+    """Ready once the streamable-HTTP MCP server answers `initialize` and `ping`."""
+    async def probe(client: httpx.AsyncClient) -> None:
+        headers = dict(MCP_HEADERS)
+        response = await _mcp_request(client, url, headers, "initialize", {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "mcpa2a-supervisor", "version": "1.0.0"},
+        })
+        if response.headers.get("mcp-session-id"):
+            headers["mcp-session-id"] = response.headers["mcp-session-id"]
+        await client.post(url, headers=headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+        await _mcp_request(client, url, headers, "ping", {})
+    return probe
+
+
+async def _mcp_request(client: httpx.AsyncClient, url: str, headers: dict, method: str, params: dict) -> httpx.Response:
+    response = await client.post(url, headers=headers, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    response.raise_for_status()
+    if '"result"' not in response.text:
+        raise RuntimeError(f"MCP {method} failed: {response.text[:200]}")
+    return response
+
+
+class _Child:
+    def __init__(self, component: Component):
+        self.component = component
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.ready = asyncio.Event()
+        self.state = "waiting"
+        self.starts = 0
+        self.crashes: deque[float] = deque()
+        self.ready_seconds: Optional[float] = None
+
+
+class Supervisor:
+    """
+    Starts the components of the stack as supervised subprocesses.
+
+    Every component starts as soon as its dependencies are ready, so
+    independent components start in parallel and the stack is up after its
+    slowest dependency chain rather than the sum of all start times. A
+    component is ready once its probe succeeds. Children that exit are
+    restarted with exponential backoff, unless they crashed more than
+    `max_restarts` times within `restart_window` seconds. Child output is
+    printed with the component name as prefix.
+
+    Args:
+        components (list[Component]): The stack.
+        ready_timeout (float): Seconds a component may take to become ready,
+            and dependents wait for a dependency before starting anyway.
+        max_restarts (int): Crashes tolerated within `restart_window`.
+        restart_window (float): Seconds over which crashes are counted.
+        env (dict[str, str]): Environment of the children (default: ours).
+    """
+
+    def __init__(
+        self,
+        components: list[Component],
+        ready_timeout: float = 60.0,
+        max_restarts: int = 5,
+        restart_window: float = 60.0,
+        env: Optional[dict[str, str]] = None,
+    ):
+        names = {component.name for component in components}
+        for component in components:
+            missing = set(component.depends_on) - names
+            if missing:
+                raise ValueError(f"{component.name} depends on unknown components: {', '.join(sorted(missing))}")
+
+        self.ready_timeout = ready_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.env = env
+        self._children = {component.name: _Child(component) for component in components}
+        self._stopping = asyncio.Event()
+        self._started = time.perf_counter()
+
+    async def run(self) -> None:
+        """
+        Start the stack and supervise it until `stop` is called.
+        """
+        self._started = time.perf_counter()
+        tasks = [asyncio.create_task(self._supervise(child)) for child in self._children.values()]
+        reporter = asyncio.create_task(self._report_ready())
+        try:
+            await self._stopping.wait()
+        finally:
+            reporter.cancel()
+            await self._shutdown()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, reporter, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every component is ready.
+
+        Returns:
+            bool: False if `timeout` seconds passed first.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(child.ready.wait() for child in self._children.values())), timeout=timeout
+            )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def status(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: State, pid, start count and time to first
+            readiness of every component.
+        """
+        return {
+            name: {
+                "state": child.state,
+                "pid": child.process.pid if child.process and child.process.returncode is None else None,
+                "starts": child.starts,
+                "ready_seconds": child.ready_seconds,
+            }
+            for name, child in self._children.items()
+        }
+
+    async def _supervise(self, child: _Child) -> None:
+        await self._wait_for_dependencies(child)
+
+        if child.component.command is None:
+            child.state = "external"
+            await self._wait_ready(child)
+            return
+
+        backoff = 0.5
+        while not self._stopping.is_set():
+            child.starts += 1
+            child.state = "starting"
+            started = time.perf_counter()
+            child.process = await asyncio.create_subprocess_exec(
+                *child.component.command,
+                cwd=PROJECT_ROOT,
+                env=self.env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                # Ctrl+C reaches only us, and we stop the children in order
+                start_new_session=os.name != "nt",
+            )
+            printer = asyncio.create_task(self._print_output(child))
+            if await self._wait_ready(child):
+                backoff = 0.5
+            elif child.process.returncode is None and not self._stopping.is_set():
+                # Hung during startup: treat it like a crash
+                child.process.kill()
+
+            code = await child.process.wait()
+            await printer
+            child.ready.clear()
+            if self._stopping.is_set():
+                return
+
+            now = time.perf_counter()
+            child.crashes.append(now)
+            while child.crashes and child.crashes[0] < now - self.restart_window:
+                child.crashes.popleft()
+            if len(child.crashes) > self.max_restarts:
+                child.state = "failed"
+                self._log(f"{child.component.name} exited with code {code} and crashed {len(child.crashes)} "
+                          f"times in {self.restart_window:.0f}s; giving up")
+                return
+
+            child.state = "restarting"
+            # Fast crash loops back off; a child that ran for a while restarts quickly
+            if now - started > self.restart_window:
+                backoff = 0.5
+            self._log(f"{child.component.name} exited with code {code}; restarting in {backoff:.1f}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 30.0)
+
+    async def _wait_for_dependencies(self, child: _Child) -> None:
+        for name in child.component.depends_on:
+            try:
+                await asyncio.wait_for(self._children[name].ready.wait(), timeout=self.ready_timeout)
+            except asyncio.TimeoutError:
+                self._log(f"{name} is not ready after {self.ready_timeout:.0f}s; starting {child.component.name} anyway")
+
+    async def _wait_ready(self, child: _Child) -> bool:
+        deadline = time.monotonic() + self.ready_timeout
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            while time.monotonic() < deadline and not self._stopping.is_set():
+                if child.process is not None and child.process.returncode is not None:
+                    return False
+                try:
+                    await child.component.probe(client)
+                except Exception:
+                    await asyncio.sleep(0.2)
+                    continue
+
+                child.state = "ready"
+                if child.ready_seconds is None:
+                    child.ready_seconds = round(time.perf_counter() - self._started, 3)
+                self._log(f"{child.component.name} is ready ({time.perf_counter() - self._started:.2f}s)")
+                child.ready.set()
+                return True
+
+        if not self._stopping.is_set():
+            self._log(f"{child.component.name} is not ready after {self.ready_timeout:.0f}s")
+        return False
+
+    async def _report_ready(self) -> None:
+        await asyncio.gather(*(child.ready.wait() for child in self._children.values()))
+        self._log(f"Stack ready in {time.perf_counter() - self._started:.2f}s")
+
+    async def _print_output(self, child: _Child) -> None:
+        async for line in child.process.stdout:
+            print(f"[{child.component.name}] {line.decode(errors='replace').rstrip()}", flush=True)
+
+    async def _shutdown(self) -> None:
+        # Stop dependents first so they do not see their dependencies disappear
+        order = sorted(self._children.values(), key=lambda child: -self._depth(child.component.name))
+        for child in order:
+            process = child.process
+            if process is None or process.returncode is not None:
+                continue
+            child.state = "stopping"
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            child.state = "stopped"
+
+    def _depth(self, name: str) -> int:
+        depends_on = self._children[name].component.depends_on
+        return 1 + max((self._depth(dependency) for dependency in depends_on), default=0)
+
+    @staticmethod
+    def _log(message: str) -> None:
+        print(f"[up] {message}", flush=True)
+
+
+def stack_components(
+    registry_file: str,
+    mcp_config_file: str,
+    host_port: int = 10001,
+    host_workers: int = 1,
+    python: str = sys.executable,
+) -> list[Component]:
+    """
+    Describe the stack from the agent registry and the MCP config.
+
+    - Registry entries `{"url": ..., "module": "agents.website_builder"}` are
+      started with `python -m <module> --host --port` from their URL; plain
+      URL entries are only probed.
+    - `streamable_http` MCP servers with a `"launch": {"command", "args"}`
+      entry are started with that command (a command of "python" runs our
+      interpreter); others are only probed. Stdio servers are started by the
+      host itself.
+    - The host agent starts on `host_port`, with `host_workers` worker
+      processes, once all of the above are ready.
+
+    Returns:
+        list[Component]: The components, host last.
+    """
+    with open(registry_file, "r", encoding="utf-8") as f:
+        registry = json.load(f)
+    with open(mcp_config_file, "r", encoding="utf-8") as f:
+        servers = json.load(f).get("mcpServers", {})
+
+    components = []
+    for entry in registry:
+        url = entry if isinstance(entry, str) else entry["url"]
+        module = None if isinstance(entry, str) else entry.get("module")
+        address = urlparse(url)
+        name = module.rsplit(".", 1)[-1] if module else address.netloc
+        command = None
+        if module:
+            command = [python, "-m", module, "--host", address.hostname, "--port", str(address.port)]
+        components.append(Component(name=name, command=command, probe=agent_card_probe(url)))
+
+    for name, server in servers.items():
+        if server.get("command") != "streamable_http":
+            continue
+        launch = server.get("launch")
+        command = None
+        if launch:
+            command = [python if launch["command"] == "python" else launch["command"], *launch.get("args", [])]
+        components.append(Component(name=name, command=command, probe=mcp_ping_probe(server["args"][0])))
+
+    components.append(Component(
+        name="host_agent",
+        command=[
+            python, "-m", "agents.host_agent", "--host", "localhost", "--port", str(host_port),
+            "--workers", str(host_workers),
+        ],
+        probe=agent_card_probe(f"http://localhost:{host_port}"),
+        depends_on=[component.name for component in components],
+    ))
+    return components
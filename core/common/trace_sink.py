@@ -0,0 +1,203 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def event_to_dict(event: Any) -> dict:
+    """
+    Convert an ADK event (or any pydantic model) into a JSON-safe dictionary.
+    """
+    if hasattr(event, "to_record"):  # Spans of core.common.tracing
+        return event.to_record()
+    if hasattr(event, "root"):  # Check if response is wrapped by SDK
+        event = event.root
+    if hasattr(event, "model_dump"):
+        return event.model_dump(mode="json", exclude_none=True)
+    return {"repr": repr(event)}
+
+
+class TraceSink(ABC):
+    """
+    Receives agent events and request spans (see `core.common.tracing`)
+    for debugging and tracing.
+
+    `emit` is called on the event loop for every event, so implementations
+    must only do O(1) work there and defer any serialization or I/O.
+    """
+
+    @abstractmethod
+    def emit(self, title: str, event: Any) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class NullTraceSink(TraceSink):
+    """
+    Discards every event.
+    """
+
+    def emit(self, title: str, event: Any) -> None:
+        pass
+
+
+class RingBufferTraceSink(TraceSink):
+    """
+    Keeps references to the most recent events in memory.
+    Events are only serialized when `snapshot` is called.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self._events: deque[tuple[float, str, Any]] = deque(maxlen=capacity)
+
+    def emit(self, title: str, event: Any) -> None:
+        self._events.append((time.time(), title, event))
+
+    def snapshot(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: The buffered events, oldest first.
+        """
+        return [
+            {"timestamp": timestamp, "title": title, "event": event_to_dict(event)}
+            for timestamp, title, event in list(self._events)
+        ]
+
+
+class _BackgroundTraceSink(TraceSink):
+    """
+    Hands events to a worker thread that does the formatting and I/O.
+    When the queue is full, events are dropped and counted instead of
+    blocking the event loop.
+    """
+
+    def __init__(self, max_queue: int = 10000):
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        # Write what is queued before the process exits
+        atexit.register(self.close)
+
+    def emit(self, title: str, event: Any) -> None:
+        try:
+            self._queue.put_nowait((time.time(), title, event))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.warning("Trace sink error: %s", e)
+        self._finish()
+
+    @abstractmethod
+    def _write(self, timestamp: float, title: str, event: Any) -> None:
+        ...
+
+    def _finish(self) -> None:
+        pass
+
+
+class JsonlTraceSink(_BackgroundTraceSink):
+    """
+    Appends one JSON object per event to a file, from a background thread.
+    The file is line buffered, so several processes (e.g. the agents and
+    their stdio MCP servers) can append to the same file.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10000):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        super().__init__(max_queue=max_queue)
+
+    def _write(self, timestamp: float, title: str, event: Any) -> None:
+        record = {"timestamp": timestamp, "title": title, "event": event_to_dict(event)}
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _finish(self) -> None:
+        self._file.close()
+
+
+class ConsoleTraceSink(_BackgroundTraceSink):
+    """
+    Pretty prints a sample of events with rich, from a background thread.
+
+    Args:
+        sample_rate (float): Fraction of events to print (1.0 prints all of them).
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_queue: int = 1000):
+        self.sample_rate = sample_rate
+        super().__init__(max_queue=max_queue)
+
+    def emit(self, title: str, event: Any) -> None:
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            super().emit(title, event)
+
+    def _write(self, timestamp: float, title: str, event: Any) -> None:
+        from rich import print as rprint
+        from rich.syntax import Syntax
+
+        print(f"\n=== {title} ===")  # Section title for clarity
+        try:
+            json_str = json.dumps(event_to_dict(event), indent=2, ensure_ascii=False)
+            rprint(Syntax(json_str, "json", theme="monokai", line_numbers=False))
+        except Exception as e:
+            # Print fallback text if something fails
+            rprint(f"[red bold]Error printing JSON:[/red bold] {e}")
+            rprint(repr(event))
+
+
+def create_trace_sink(spec: str = None) -> TraceSink:
+    """
+    Build a trace sink from a spec string, defaulting to the TRACE_SINK
+    environment variable:
+
+    - "off" (default): discard events
+    - "ring" or "ring:<capacity>": keep recent events in memory
+    - "jsonl:<path>": append events to a JSONL file
+    - "console" or "console:<sample_rate>": pretty print (a sample of) events
+
+    Args:
+        spec (str): The sink specification.
+
+    Returns:
+        TraceSink: The configured sink.
+    """
+    spec = (spec if spec is not None else os.environ.get("TRACE_SINK", "off")).strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+
+    if kind in ("", "off", "none", "disabled"):
+        return NullTraceSink()
+    if kind == "ring":
+        return RingBufferTraceSink(capacity=int(arg) if arg else 1000)
+    if kind == "jsonl":
+        return JsonlTraceSink(arg or "traces/events.jsonl")
+    if kind == "console":
+        return ConsoleTraceSink(sample_rate=float(arg) if arg else 1.0)
+
+    raise ValueError(f"Unknown trace sink: {spec}")
@@ -0,0 +1,269 @@
+import re
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from core.common.trace_sink import JsonlTraceSink, NullTraceSink, TraceSink, create_trace_sink
+
+# Key of the W3C trace context in A2A message metadata and MCP request `_meta`
+TRACEPARENT = "traceparent"
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-(?P<trace_id>[0-9a-f]{32})-(?P<span_id>[0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """
+    One timed operation of a request. Spans of the same request share a
+    `trace_id`, across processes, and point to their parent with `parent_id`.
+    """
+    name: str
+    service: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_record(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: The span with OTLP/JSON field names.
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def parse_traceparent(value: Any) -> Optional[tuple[str, str]]:
+    """
+    Returns:
+        tuple[str, str] | None: (trace id, parent span id) of a W3C
+        `traceparent` header, or None if it is missing or malformed.
+    """
+    match = _TRACEPARENT.match(value) if isinstance(value, str) else None
+    return (match.group("trace_id"), match.group("span_id")) if match else None
+
+
+class Tracer:
+    """
+    Creates spans for one service and emits finished ones to a trace sink,
+    as events titled "span".
+
+    `span` is a context manager that makes the new span current, so spans
+    opened below it (in the same task) become its children and
+    `current_traceparent()` can be sent to the next hop. Where a span
+    cannot be a `with` block (async generators, callbacks), use
+    `start_span` and `end_span`.
+
+    Args:
+        service (str): Name recorded on every span, e.g. "host_agent".
+        sink (TraceSink): Where finished spans go.
+    """
+
+    def __init__(self, service: str, sink: TraceSink = None):
+        self.service = service
+        self.sink = sink or NullTraceSink()
+        self._counters = {"spans": 0, "traces_started": 0, "traces_joined": 0}
+
+    @property
+    def recording(self) -> bool:
+        return not isinstance(self.sink, NullTraceSink)
+
+    @contextmanager
+    def span(self, name: str, traceparent: str = None, **attributes: Any) -> Iterator[Span]:
+        span = self.start_span(name, traceparent=traceparent, **attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "cancelled" if type(e).__name__ == "CancelledError" else "error"
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            self.end_span(span)
+
+    def start_span(self, name: str, traceparent: str = None, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """
+        Start a span without making it current. Its parent is `parent`, else
+        the remote `traceparent`, else the current span; without any, it
+        starts a new trace.
+        """
+        parent = parent or _current.get()
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id = remote
+            self._counters["traces_joined"] += 1
+        elif parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            self._counters["traces_started"] += 1
+        return Span(
+            name=name,
+            service=self.service,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, status: str = None) -> None:
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        if status:
+            span.status = status
+        self._counters["spans"] += 1
+        self.sink.emit("span", span)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: Span counters and the sink in use.
+        """
+        return {
+            "service": self.service,
+            "sink": type(self.sink).__name__,
+            "dropped": getattr(self.sink, "dropped", 0),
+            **self._counters,
+        }
+
+
+class AgentSpanCallbacks:
+    """
+    ADK agent callbacks recording an `llm.call` span per model call and a
+    `tool.<name>` span per tool call, as children of the current span.
+    The tool span is current while the tool runs, so delegated A2A tasks
+    and MCP requests carry it as their parent.
+
+    Install them next to any other callbacks, e.g.
+    `before_model_callback=[spans.before_model, ...]`.
+    """
+
+    def __init__(self):
+        self._model_spans: dict[str, Span] = {}
+        self._tool_spans: dict[str, tuple[Span, Optional[Span]]] = {}
+
+    def before_model(self, callback_context, llm_request) -> None:
+        self._model_spans[callback_context.invocation_id] = _tracer.start_span(
+            "llm.call", model=str(getattr(llm_request, "model", "") or ""), agent=callback_context.agent_name
+        )
+
+    def after_model(self, callback_context, llm_response) -> None:
+        # Streamed responses call back once per chunk; the call ends with the complete response
+        if getattr(llm_response, "partial", False):
+            return
+        span = self._model_spans.pop(callback_context.invocation_id, None)
+        if span is None:
+            return
+        usage = getattr(llm_response, "usage_metadata", None)
+        if usage is not None:
+            span.set(prompt_tokens=usage.prompt_token_count, output_tokens=usage.candidates_token_count)
+        _tracer.end_span(span, status="error" if getattr(llm_response, "error_code", None) else None)
+
+    def on_model_error(self, callback_context, llm_request, error) -> None:
+        span = self._model_spans.pop(callback_context.invocation_id, None)
+        if span is not None:
+            span.set(error=f"{type(error).__name__}: {error}")
+            _tracer.end_span(span, status="error")
+
+    def before_tool(self, tool, args, tool_context) -> None:
+        span = _tracer.start_span(f"tool.{tool.name}", tool=tool.name)
+        self._tool_spans[tool_context.function_call_id] = (span, _current.get())
+        use_span(span)
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        self._end_tool(tool_context, None)
+
+    def on_tool_error(self, tool, args, tool_context, error) -> None:
+        self._end_tool(tool_context, error)
+
+    def _end_tool(self, tool_context, error: Optional[Exception]) -> None:
+        span, parent = self._tool_spans.pop(tool_context.function_call_id, (None, None))
+        if span is None:
+            return
+        if error is not None:
+            span.set(error=f"{type(error).__name__}: {error}")
+        _tracer.end_span(span, status="error" if error is not None else None)
+        use_span(parent)
+
+
+_tracer = Tracer("unknown")
+
+
+def tracer() -> Tracer:
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def use_span(span: Optional[Span]) -> None:
+    """
+    Make `span` current without a `with` block, e.g. between a before and
+    an after callback that run in the same task.
+    """
+    _current.set(span)
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current.get()
+    return span.traceparent if span is not None else None
+
+
+def configure_tracing(service: str, sink: TraceSink = None) -> Tracer:
+    """
+    Set up the process-wide tracer. Spans go to `sink`, by default the
+    trace sink configured by TRACE_SINK (see `create_trace_sink`): with
+    "off" nothing is recorded but trace context is still propagated, and
+    with "jsonl[:path]" spans are written next to the agent events, where
+    `main.py traces` displays them.
+
+    Args:
+        service (str): Name of this process in the spans, e.g. "host_agent".
+        sink (TraceSink): The sink to share with this process's event tracing.
+
+    Returns:
+        Tracer: The configured tracer, also returned by `tracer()`.
+    """
+    global _tracer
+    _tracer = Tracer(service, sink if sink is not None else create_trace_sink())
+    return _tracer
+
+
+def child_process_env() -> dict[str, str]:
+    """
+    Environment for child processes (e.g. stdio MCP servers) to write
+    their spans to the same file as this process.
+    """
+    sink = _tracer.sink
+    if isinstance(sink, JsonlTraceSink):
+        return {"TRACE_SINK": f"jsonl:{sink.path}"}
+    return {}
@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import logging
+
+import anyio
+from mcp import ClientSession
+from mcp.shared.session import BaseSession
+from mcp.types import CancelledNotification, CancelledNotificationParams, ClientNotification
+
+# Seconds to spend telling the server about a cancelled request
+CANCEL_NOTIFY_TIMEOUT = 2.0
+
+logger = logging.getLogger(__name__)
+
+_installed = False
+
+
+def install_mcp_request_cancellation() -> None:
+    """
+    Make MCP client sessions send `notifications/cancelled` when a request
+    is abandoned, e.g. because the agent run that made a tool call was
+    cancelled. The MCP client SDK only stops waiting for the response, so
+    without this the server keeps running the tool to completion.
+
+    The MCP sessions are created inside ADK's MCPToolset, so this wraps
+    `BaseSession.send_request` instead of a session we construct ourselves.
+    Only client sessions are affected, and only while the SDK numbers its
+    requests with the private `_request_id` counter; with an SDK that does
+    not, requests are sent unchanged. Safe to call more than once.
+    """
+    global _installed
+    if _installed:
+        return
+
+    send_request = BaseSession.send_request
+
+    @functools.wraps(send_request)
+    async def send_request_with_cancellation(self, request, *args, **kwargs):
+        if not isinstance(self, ClientSession) or not hasattr(self, "_request_id"):
+            return await send_request(self, request, *args, **kwargs)
+
+        # The id send_request is about to assign to this request
+        request_id = self._request_id
+        try:
+            return await send_request(self, request, *args, **kwargs)
+        except (asyncio.CancelledError, anyio.get_cancelled_exc_class()):
+            if getattr(request.root, "method", None) != "initialize":
+                await _notify_cancelled(self, request_id)
+            raise
+
+    BaseSession.send_request = send_request_with_cancellation
+    _installed = True
+
+
+async def _notify_cancelled(session: ClientSession, request_id: int) -> None:
+    notification = ClientNotification(CancelledNotification(
+        method="notifications/cancelled",
+        params=CancelledNotificationParams(requestId=request_id, reason="Request cancelled by the client"),
+    ))
+    # Shielded so the notification goes out although the caller is being cancelled
+    with anyio.CancelScope(shield=True):
+        with anyio.move_on_after(CANCEL_NOTIFY_TIMEOUT):
+            try:
+                await session.send_notification(notification)
+            except Exception as e:
+                logger.warning("Could not send MCP cancellation for request %s: %s", request_id, e)
@@ -4,10 +4,6 @@ import signal
 import sys
 from contextlib import asynccontextmanager
 from core.mcp.mcp_discovery import MCPDiscovery
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
-from google.adk.tools.mcp_tool import StdioConnectionParams
-from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPServerParams
-from mcp import StdioServerParameters
 
 
 class MCPConnect:
@@ -21,15 +17,44 @@ class MCPConnect:
 
     def __init__(self, config_file: str = None):
         self.discovery = MCPDiscovery(config_file=config_file)
-        self.tools: list[MCPToolset] = []
+        self.tools: list = []
 
 
     async def _load_all_tools(self):
         """
-          Loads all the tools from each discovered MCP server
+          Loads all the tools from each discovered MCP server,
+          connecting to the servers concurrently
         """
-        tools = []
-        for name, server in self.discovery.list_mcp_servers().items():
+        servers = self.discovery.list_mcp_servers()
+        if not servers:
+            return []
+
+        # The MCP client stack is only imported when there are servers to connect to
+        try:
+            from core.mcp.mcp_cancellation import install_mcp_request_cancellation
+            from core.mcp.mcp_tracing import install_mcp_trace_propagation
+            from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+            from google.adk.tools.mcp_tool import StdioConnectionParams
+            from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPServerParams
+            from mcp import StdioServerParameters
+        except ImportError as e:
+            # e.g. the project's own mcp/ package shadows the MCP SDK on sys.path
+            print(f"MCP client unavailable, no MCP tools loaded: {e}")
+            return []
+        from core.common.tracing import child_process_env
+
+        # Abandoned tool calls are cancelled on the server too
+        install_mcp_request_cancellation()
+        # Tool calls carry the trace context of the agent turn
+        install_mcp_trace_propagation()
+
+        # Stdio servers only inherit a minimal environment; they need ours to export spans
+        stdio_env = None
+        if child_process_env():
+            from mcp.client.stdio import get_default_environment
+            stdio_env = {**get_default_environment(), **child_process_env()}
+
+        async def load(name: str, server: dict):
             try:
                 if server.get("command") == "streamable_http":
                     conn = StreamableHTTPServerParams(url=server["args"][0])
@@ -37,7 +62,8 @@ class MCPConnect:
                     conn = StdioConnectionParams(
                         server_params=StdioServerParameters(
                             command=server["command"],
-                            args=server["args"]
+                            args=server["args"],
+                            env=stdio_env,
                         ),
                         timeout=5
                     )
@@ -46,12 +72,14 @@ class MCPConnect:
                 loaded_tools = await toolset.load_tools()
                 tool_names = [tool.name for tool in loaded_tools]
                 print(f"Loaded tools from server '{name}': {', '.join(tool_names)}")
-                tools.append(toolset)
+                return toolset
 
             except Exception as e:
                 print(f"Error loading tools from server '{name}': {e}")
+                return None
 
-        return tools
+        toolsets = await asyncio.gather(*(load(name, server) for name, server in servers.items()))
+        return [toolset for toolset in toolsets if toolset is not None]
 
     async def get_tools(self) -> list:
         """
@@ -18,11 +18,11 @@ class MCPDiscovery:
 
         Args:
             config_file (str, optional): Path to the JSON configuration file. 
-            If None, defaults to 'mcp_config.json' 
+            If None, defaults to $MCP_CONFIG_FILE, then 'mcp_config.json'
             located in the same directory as this module.
         """
         if config_file is None:
-            self.config_file = os.path.join(
+            self.config_file = os.environ.get("MCP_CONFIG_FILE") or os.path.join(
                 os.path.dirname(__file__), 
                 'mcp_config.json'
             )
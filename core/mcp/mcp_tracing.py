@@ -0,0 +1,39 @@
+import functools
+
+from mcp import ClientSession
+from mcp.shared.session import BaseSession
+from mcp.types import RequestParams
+
+from core.common.tracing import TRACEPARENT, current_traceparent
+
+_installed = False
+
+
+def install_mcp_trace_propagation() -> None:
+    """
+    Make MCP client sessions send the current trace context with every
+    `tools/call`, as `traceparent` in the request's `_meta`, so the server's
+    span joins the trace of the agent turn that called the tool (see
+    `mcp/servers/stdio_server.py`). Servers that do not trace ignore it.
+
+    Like `install_mcp_request_cancellation`, this wraps
+    `BaseSession.send_request` because the sessions are created inside ADK's
+    MCPToolset. Only client sessions are affected. Safe to call more than once.
+    """
+    global _installed
+    if _installed:
+        return
+
+    send_request = BaseSession.send_request
+
+    @functools.wraps(send_request)
+    async def send_request_with_trace_context(self, request, *args, **kwargs):
+        traceparent = current_traceparent()
+        if traceparent and isinstance(self, ClientSession) and getattr(request.root, "method", None) == "tools/call":
+            params = request.root.params
+            meta = params.meta.model_dump() if params.meta is not None else {}
+            params.meta = RequestParams.Meta(**{**meta, TRACEPARENT: traceparent})
+        return await send_request(self, request, *args, **kwargs)
+
+    BaseSession.send_request = send_request_with_trace_context
+    _installed = True
@@ -18,29 +18,111 @@ def cli():
 @cli.command()
 @click.option('--host', default='localhost', help='Host for the agent server')
 @click.option('--port', default=10001, help='Port for the agent server')
-def host_agent(host: str, port: int):
+@click.option('--trace', default=None, help='Event trace sink: off, ring[:size], jsonl:<path> or console[:sample_rate]')
+@click.option('--task-store', default=None, help='Task store: memory or sqlite[:path] (defaults to $TASK_STORE)')
+@click.option('--workers', default=None, type=int, help='Worker processes behind a session-affine router (defaults to $HOST_WORKERS or 1)')
+def host_agent(host: str, port: int, trace: str, task_store: str, workers: int):
     """Start the Host Agent (Orchestrator)"""
     from agents.host_agent.__main__ import main
-    asyncio.run(main.main([f'--host={host}', f'--port={port}'], standalone_mode=False))
+    args = [f'--host={host}', f'--port={port}']
+    if trace:
+        args.append(f'--trace={trace}')
+    if task_store:
+        args.append(f'--task-store={task_store}')
+    if workers:
+        args.append(f'--workers={workers}')
+    asyncio.run(main.main(args, standalone_mode=False))
 
 
 @cli.command()
 @click.option('--host', default='localhost', help='Host for the agent server')
 @click.option('--port', default=10000, help='Port for the agent server')
-def website_builder(host: str, port: int):
+@click.option('--task-store', default=None, help='Task store: memory or sqlite[:path] (defaults to $TASK_STORE)')
+def website_builder(host: str, port: int, task_store: str):
     """Start the Website Builder Agent"""
     from agents.website_builder.__main__ import main
-    main([f'--host={host}', f'--port={port}'], standalone_mode=False)
+    args = [f'--host={host}', f'--port={port}']
+    if task_store:
+        args.append(f'--task-store={task_store}')
+    main(args, standalone_mode=False)
+
+
+@cli.command()
+@click.option('--host-port', default=10001, help='Port for the host agent')
+@click.option('--host-workers', default=1, help='Host agent worker processes')
+@click.option('--registry', default=None, help='Agent registry file (default: $AGENT_REGISTRY_FILE or core/a2a/agent_registry.json)')
+@click.option('--mcp-config', default=None, help='MCP config file (default: $MCP_CONFIG_FILE or core/mcp/mcp_config.json)')
+@click.option('--ready-timeout', default=60.0, help='Seconds each component may take to become ready')
+@click.option('--max-restarts', default=5, help='Crashes per minute tolerated before a component is given up')
+def up(host_port: int, host_workers: int, registry: str, mcp_config: str, ready_timeout: float, max_restarts: int):
+    """Start all agents and HTTP MCP servers, then the Host Agent, and keep them running"""
+    import os
+    import signal
+    from core.common.supervisor import Supervisor, stack_components
+
+    registry = registry or os.environ.get('AGENT_REGISTRY_FILE') or 'core/a2a/agent_registry.json'
+    mcp_config = mcp_config or os.environ.get('MCP_CONFIG_FILE') or 'core/mcp/mcp_config.json'
+    # Children read the same files
+    env = {**os.environ, 'AGENT_REGISTRY_FILE': os.path.abspath(registry), 'MCP_CONFIG_FILE': os.path.abspath(mcp_config)}
+
+    async def run():
+        supervisor = Supervisor(
+            stack_components(registry, mcp_config, host_port=host_port, host_workers=host_workers),
+            ready_timeout=ready_timeout,
+            max_restarts=max_restarts,
+            env=env,
+        )
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, supervisor.stop)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        await supervisor.run()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
 
 
 @cli.command()
 @click.option('--agent', default='http://127.0.0.1:10001', help='Base URL of the A2A agent server')
 @click.option('--session', default='0', help='Session ID (use 0 to generate a new one)')
-def client(agent: str, session: str):
+@click.option('--batch', default=None, help="Send the prompts of a JSONL file ('-' for stdin) instead of prompting")
+@click.option('--concurrency', default=4, help='Batch requests in flight at once')
+@click.option('--output', default='-', help="Batch results as JSONL ('-' for stdout)")
+@click.option('--save-dir', default='sites', help='Directory where generated files are saved, per session')
+def client(agent: str, session: str, batch: str, concurrency: int, output: str, save_dir: str):
     """Start the CLI client to interact with agents"""
     from app.cli.client import cli as client_cli
-    asyncio.run(client_cli.main([f'--agent={agent}', f'--session={session}'], standalone_mode=False))
+    args = [
+        f'--agent={agent}', f'--session={session}', f'--concurrency={concurrency}', f'--output={output}',
+        f'--save-dir={save_dir}',
+    ]
+    if batch:
+        args.append(f'--batch={batch}')
+    asyncio.run(client_cli.main(args, standalone_mode=False))
+
 
 
+@cli.command()
+@click.option('--file', 'path', default='traces/events.jsonl', help='Trace file written with TRACE_SINK=jsonl[:path]')
+@click.option('--trace', 'trace_id', default=None, help='Show the trace with this id (or id prefix)')
+@click.option('--last', default=1, help='Show the last N traces')
+@click.option('--list', 'list_only', is_flag=True, help='List the traces instead of showing them')
+@click.option('--summary', is_flag=True, help='Time per span name over the selected traces')
+def traces(path: str, trace_id: str, last: int, list_only: bool, summary: bool):
+    """Show recorded request traces"""
+    from app.cli.trace_viewer import cli as viewer_cli
+    args = [f'--file={path}', f'--last={last}']
+    if trace_id:
+        args.append(f'--trace={trace_id}')
+    if list_only:
+        args.append('--list')
+    if summary:
+        args.append('--summary')
+    viewer_cli.main(args, standalone_mode=False)
+
 if __name__ == '__main__':
     cli()
@@ -1,5 +1,18 @@
+import ast
+import math
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+import click
 from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, pure-Python fallback below
+    np = None
 
 class ArithmeticInput(BaseModel):
     a: float = Field(..., description="First number")
@@ -9,6 +22,67 @@ class ArithmeticOutput(BaseModel):
     result: float = Field(..., description="Result of the arithmetic operation")
     expression: str = Field(..., description="Expression evaluated")
 
+ElementwiseOperation = Literal["add", "subtract", "multiply", "divide"]
+ReduceOperation = Literal["sum", "mean", "min", "max"]
+
+class BatchArithmeticInput(BaseModel):
+    operation: ElementwiseOperation = Field(..., description="Element-wise operation to apply")
+    a: list[float] = Field(..., description="First column of numbers")
+    b: list[float] = Field(..., description="Second column of numbers, same length as a (or a single number to apply to every element)")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.b) != len(self.a) and len(self.b) != 1:
+            raise ValueError(f"b must have {len(self.a)} elements or exactly 1, got {len(self.b)}")
+        return self
+
+class ReduceInput(BaseModel):
+    values: list[float] = Field(..., description="Numbers to reduce")
+    operations: list[ReduceOperation] = Field(
+        default=["sum", "mean", "min", "max"],
+        description="Reductions to compute",
+    )
+
+class DotProductInput(BaseModel):
+    a: list[float] = Field(..., description="First vector")
+    b: list[float] = Field(..., description="Second vector, same length as a")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.a) != len(self.b):
+            raise ValueError(f"a and b must have the same length, got {len(self.a)} and {len(self.b)}")
+        return self
+
+class BatchArithmeticOutput(BaseModel):
+    operation: str = Field(..., description="Operation applied")
+    count: int = Field(..., description="Number of results")
+    results: list[float | None] = Field(..., description="Result column; null where the operation is undefined")
+    errors: list[int] = Field(default_factory=list, description="Indexes of undefined results (e.g. division by zero)")
+
+class ReduceOutput(BaseModel):
+    count: int = Field(..., description="Number of input values")
+    operations: list[str] = Field(..., description="Operations computed")
+    results: list[float | None] = Field(..., description="One result per operation, in the same order")
+
+class ExpressionInput(BaseModel):
+    expression: str = Field(..., max_length=2000, description="Arithmetic expression, e.g. 'sqrt(x**2 + y**2) * rate'")
+    variables: dict[str, float] = Field(default_factory=dict, description="Variable values shared by every evaluation")
+    bindings: list[dict[str, float]] | None = Field(
+        default=None,
+        max_length=10000,
+        description="Optional list of variable sets; the expression is evaluated once per set",
+    )
+
+class ExpressionError(BaseModel):
+    index: int = Field(..., description="Index of the binding that failed")
+    message: str = Field(..., description="Why the evaluation failed")
+
+class ExpressionOutput(BaseModel):
+    expression: str = Field(..., description="Expression evaluated")
+    variables: list[str] = Field(..., description="Variables referenced by the expression")
+    results: list[float | None] = Field(..., description="One result per binding (a single result without bindings)")
+    errors: list[ExpressionError] = Field(default_factory=list, description="Evaluations that failed")
+
 mcp = FastMCP(
     "arithmetic_server",
     host="localhost",
@@ -31,5 +105,253 @@ async def add_numbers(input: ArithmeticInput) -> ArithmeticOutput:
     expression = f"{input.a} + {input.b} = {result}"
     return ArithmeticOutput(result=result, expression=expression)
 
+# -------------------------------------------------------------------
+# Batch kernels: NumPy when it is installed, plain Python otherwise
+# -------------------------------------------------------------------
+_PY_OPERATORS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+}
+
+def _elementwise(operation: str, a: list[float], b: list[float]) -> list[float | None]:
+    if np is not None:
+        left = np.asarray(a, dtype=np.float64)
+        right = np.asarray(b, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            if operation == "divide":
+                out = np.divide(left, right, out=np.full(left.shape, np.nan), where=right != 0)
+            else:
+                out = getattr(np, operation)(left, right)
+        values = out.tolist()
+    else:
+        func = _PY_OPERATORS[operation]
+        right = b if len(b) == len(a) else b * len(a)
+        values = []
+        for x, y in zip(a, right):
+            try:
+                values.append(func(x, y))
+            except (ZeroDivisionError, OverflowError):
+                values.append(math.nan)
+
+    return [v if math.isfinite(v) else None for v in values]
+
+def _reduce(operation: str, values: list[float]) -> float | None:
+    if not values:
+        return 0.0 if operation == "sum" else None
+
+    if np is not None:
+        array = np.asarray(values, dtype=np.float64)
+        result = float({"sum": np.sum, "mean": np.mean, "min": np.min, "max": np.max}[operation](array))
+    elif operation == "sum":
+        result = math.fsum(values)
+    elif operation == "mean":
+        result = math.fsum(values) / len(values)
+    else:
+        result = float(min(values) if operation == "min" else max(values))
+
+    return result if math.isfinite(result) else None
+
+def _dot(a: list[float], b: list[float]) -> float | None:
+    if np is not None:
+        result = float(np.dot(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)))
+    else:
+        result = math.fsum(x * y for x, y in zip(a, b))
+    return result if math.isfinite(result) else None
+
+# -------------------------------------------------------------------
+# Restricted expression compiler
+# -------------------------------------------------------------------
+MAX_EXPONENT = 10_000
+
+def _safe_pow(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"exponent {exponent} exceeds the limit of {MAX_EXPONENT}")
+    result = float(base) ** exponent
+    if isinstance(result, complex):
+        raise ValueError("result is not a real number")
+    return result
+
+EXPRESSION_FUNCTIONS = {
+    "abs": abs, "round": round, "min": min, "max": max,
+    "sqrt": math.sqrt, "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "floor": math.floor, "ceil": math.ceil, "hypot": math.hypot,
+    "degrees": math.degrees, "radians": math.radians, "pow": _safe_pow,
+}
+EXPRESSION_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+_EVAL_NAMESPACE = {"__builtins__": {}, "__pow__": _safe_pow, **EXPRESSION_FUNCTIONS, **EXPRESSION_CONSTANTS}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+)
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    code: object
+    variables: tuple[str, ...]
+
+class _PowRewriter(ast.NodeTransformer):
+    """Routes `**` through _safe_pow so a huge exponent cannot hang the server."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="__pow__", ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node,
+            )
+        return node
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Parse an arithmetic expression into a restricted AST and compile it.
+    Compiled forms are cached, so repeated expressions skip parsing entirely.
+
+    Raises:
+        ValueError: If the expression is not valid or uses anything outside
+            numbers, arithmetic operators, parentheses, variables and the
+            whitelisted functions.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+
+    variables = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS:
+                raise ValueError("Only whitelisted functions can be called: " + ", ".join(sorted(EXPRESSION_FUNCTIONS)))
+            if node.keywords:
+                raise ValueError("Keyword arguments are not supported")
+        if isinstance(node, ast.Name) and node.id not in EXPRESSION_FUNCTIONS and node.id not in EXPRESSION_CONSTANTS:
+            if node.id.startswith("_"):
+                raise ValueError(f"Invalid variable name: {node.id}")
+            variables.add(node.id)
+
+    tree = ast.fix_missing_locations(_PowRewriter().visit(tree))
+    return CompiledExpression(
+        code=compile(tree, "<expression>", "eval"),
+        variables=tuple(sorted(variables)),
+    )
+
+def _evaluate(compiled: CompiledExpression, values: dict[str, float]) -> float:
+    missing = [name for name in compiled.variables if name not in values]
+    if missing:
+        raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+    namespace = dict(_EVAL_NAMESPACE)
+    namespace.update((name, values[name]) for name in compiled.variables)
+    result = float(eval(compiled.code, namespace))
+    if not math.isfinite(result):
+        raise ValueError("result is not finite")
+    return result
+
+@mcp.tool("evaluate_expression")
+async def evaluate_expression(input: ExpressionInput) -> ExpressionOutput:
+    """
+    Evaluate an arithmetic expression in one call instead of chaining add_numbers.
+    Supports + - * / // % **, parentheses, named variables, the constants pi, e, tau
+    and the functions abs, round, min, max, sqrt, exp, log, log10, log2, sin, cos,
+    tan, asin, acos, atan, atan2, sinh, cosh, tanh, floor, ceil, hypot, degrees,
+    radians and pow. Pass `bindings` to evaluate the same expression for many
+    variable sets at once.
+
+    Args:
+        input (ExpressionInput): The expression, shared variables and optional bindings.
+
+    Returns:
+        ExpressionOutput: One result per binding, plus any per-binding errors.
+    """
+    compiled = compile_expression(input.expression)
+
+    results: list[float | None] = []
+    errors: list[ExpressionError] = []
+    for index, binding in enumerate(input.bindings or [{}]):
+        try:
+            results.append(_evaluate(compiled, {**input.variables, **binding}))
+        except (ValueError, ArithmeticError, TypeError) as e:
+            results.append(None)
+            errors.append(ExpressionError(index=index, message=str(e)))
+
+    return ExpressionOutput(
+        expression=input.expression,
+        variables=list(compiled.variables),
+        results=results,
+        errors=errors,
+    )
+
+@mcp.tool("batch_arithmetic")
+async def batch_arithmetic(input: BatchArithmeticInput) -> BatchArithmeticOutput:
+    """
+    Apply add, subtract, multiply or divide element-wise to two columns of numbers
+    in a single call. Use this instead of calling add_numbers repeatedly.
+
+    Args:
+        input (BatchArithmeticInput): The operation and the two columns.
+
+    Returns:
+        BatchArithmeticOutput: The result column, with null where the result is undefined.
+    """
+    results = _elementwise(input.operation, input.a, input.b)
+    errors = [i for i, value in enumerate(results) if value is None]
+    return BatchArithmeticOutput(
+        operation=input.operation,
+        count=len(results),
+        results=results,
+        errors=errors,
+    )
+
+@mcp.tool("reduce_numbers")
+async def reduce_numbers(input: ReduceInput) -> ReduceOutput:
+    """
+    Compute reductions (sum, mean, min, max) over a list of numbers in a single call.
+    Use this to total or summarise a column of numbers.
+
+    Args:
+        input (ReduceInput): The values and the reductions to compute.
+
+    Returns:
+        ReduceOutput: One result per requested operation.
+    """
+    return ReduceOutput(
+        count=len(input.values),
+        operations=list(input.operations),
+        results=[_reduce(operation, input.values) for operation in input.operations],
+    )
+
+@mcp.tool("dot_product")
+async def dot_product(input: DotProductInput) -> ReduceOutput:
+    """
+    Compute the dot product of two equal-length vectors.
+
+    Args:
+        input (DotProductInput): The two vectors.
+
+    Returns:
+        ReduceOutput: The dot product as the single "dot" result.
+    """
+    return ReduceOutput(count=len(input.a), operations=["dot"], results=[_dot(input.a, input.b)])
+
+@click.command()
+@click.option('--host', default='localhost', help='Host for the MCP server')
+@click.option('--port', default=3000, help='Port for the MCP server')
+@click.option('--stateful', is_flag=True, help='Keep per-client MCP sessions instead of stateless HTTP')
+def main(host: str, port: int, stateful: bool):
+    mcp.settings.host = host
+    mcp.settings.port = port
+    mcp.settings.stateless_http = not stateful
+    mcp.run(transport="streamable-http")
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
\ No newline at end of file
+    main()
\ No newline at end of file
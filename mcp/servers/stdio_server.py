@@ -1,6 +1,14 @@
 import json
+import os
 import sys
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from core.common.trace_sink import create_trace_sink
+from core.common.tracing import TRACEPARENT, Span, configure_tracing, tracer
 
 # CRITICAL: All logging must go to stderr, not stdout
 logging.basicConfig(
@@ -10,17 +18,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger("FastMCP")
 
+_cancel_event: ContextVar[threading.Event | None] = ContextVar("mcp_cancel_event", default=None)
+
+
+def current_cancel_event() -> threading.Event | None:
+    """
+    The cancel event of the tool call running in this thread, if any.
+    It is set when the client sends notifications/cancelled for the call,
+    so long-running tools can poll it (or pass it down) and stop early.
+    """
+    return _cancel_event.get()
+
 class FastMCP:
     """
     Minimal Model Context Protocol (MCP) server handler.
     Communicates using JSON-RPC 2.0 over stdin/stdout.
+
+    Tool calls run on a worker thread so the read loop keeps handling
+    messages, including notifications/cancelled for calls in flight.
+    With the default single worker, calls still run one at a time.
+
+    Each tool call is recorded as an `mcp.tools/call` span when TRACE_SINK
+    is set, joining the caller's trace through `traceparent` in the
+    request's `_meta` (see `core.common.tracing`).
     """
 
-    def __init__(self, name: str, version: str = "1.0.0"):
+    def __init__(self, name: str, version: str = "1.0.0", max_workers: int = 1):
         self.name = name
         self.version = version
         self.tools = {}
         self.initialized = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+        self._in_flight: dict = {}
+        self._in_flight_lock = threading.Lock()
+        self._send_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Decorator for registering tools
@@ -36,6 +67,12 @@ class FastMCP:
     # Main run loop
     # ------------------------------------------------------------------
     def run(self):
+        sink_spec = os.environ.get("TRACE_SINK", "off")
+        if sink_spec.strip().lower().startswith("console"):
+            # stdout carries the protocol
+            logger.warning("[FastMCP] TRACE_SINK=console is not supported by stdio servers; spans are not recorded")
+            sink_spec = "off"
+        configure_tracing(f"mcp.{self.name}", create_trace_sink(sink_spec))
         logger.info(f"[FastMCP] {self.name} v{self.version} starting...")
         logger.info(f"[FastMCP] Registered tools: {list(self.tools.keys())}")
         
@@ -63,6 +100,11 @@ class FastMCP:
         except Exception as e:
             logger.error(f"[FastMCP] Fatal error in run loop: {e}", exc_info=True)
         finally:
+            # The client is gone: stop whatever is still running
+            with self._in_flight_lock:
+                for cancel_event in self._in_flight.values():
+                    cancel_event.set()
+            self._executor.shutdown(wait=True, cancel_futures=True)
             logger.info("[FastMCP] Server shutting down.")
 
     # ------------------------------------------------------------------
@@ -112,6 +154,15 @@ class FastMCP:
             logger.info("[FastMCP] Client confirmed initialization")
             return
 
+        if method == "notifications/cancelled":
+            request_id = message.get("params", {}).get("requestId")
+            with self._in_flight_lock:
+                cancel_event = self._in_flight.get(request_id)
+            if cancel_event is not None:
+                logger.info(f"[FastMCP] Cancelling request {request_id}: {message.get('params', {}).get('reason')}")
+                cancel_event.set()
+            return
+
         if method == "ping":
             response = {"jsonrpc": "2.0", "id": msg_id, "result": {}}
             self.send(response)
@@ -149,44 +200,29 @@ class FastMCP:
 
             logger.info(f"[FastMCP] Calling tool: {tool_name} with args: {args}")
 
-            if tool_name in self.tools:
-                try:
-                    result = self.tools[tool_name](**args)
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": msg_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": str(result)
-                                }
-                            ]
-                        }
-                    }
-                    logger.info(f"[FastMCP] Tool {tool_name} executed successfully")
-                except Exception as e:
-                    logger.error(f"[FastMCP] Tool execution error: {e}", exc_info=True)
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": msg_id,
-                        "error": {
-                            "code": -32603,
-                            "message": str(e)
-                        }
-                    }
-            else:
+            if tool_name not in self.tools:
                 logger.warning(f"[FastMCP] Unknown tool: {tool_name}")
-                response = {
+                self.send({
                     "jsonrpc": "2.0",
                     "id": msg_id,
                     "error": {
                         "code": -32601,
                         "message": f"Unknown tool: {tool_name}"
                     }
-                }
-            
-            self.send(response)
+                })
+                return
+
+            # Started on receipt, so the span includes time queued for a worker
+            span = tracer().start_span(
+                "mcp.tools/call",
+                traceparent=(params.get("_meta") or {}).get(TRACEPARENT),
+                server=self.name,
+                tool=tool_name,
+            )
+            cancel_event = threading.Event()
+            with self._in_flight_lock:
+                self._in_flight[msg_id] = cancel_event
+            self._executor.submit(self._call_tool, msg_id, tool_name, args, cancel_event, span)
             return
 
         # Unknown method
@@ -201,11 +237,65 @@ class FastMCP:
                 }
             })
 
+    # ------------------------------------------------------------------
+    # Run a tool call on a worker thread
+    # ------------------------------------------------------------------
+    def _call_tool(self, msg_id, tool_name: str, args: dict, cancel_event: threading.Event, span: Span):
+        token = _cancel_event.set(cancel_event)
+        span.set(queue_ms=round((time.time_ns() - span.start_ns) / 1e6, 3))
+        try:
+            if cancel_event.is_set():
+                logger.info(f"[FastMCP] Tool {tool_name} was cancelled before it started")
+                span.status = "cancelled"
+                return
+
+            try:
+                result = self.tools[tool_name](**args)
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": msg_id,
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": str(result)
+                            }
+                        ]
+                    }
+                }
+                logger.info(f"[FastMCP] Tool {tool_name} executed successfully")
+            except Exception as e:
+                logger.error(f"[FastMCP] Tool execution error: {e}", exc_info=True)
+                span.status = "error"
+                span.set(error=f"{type(e).__name__}: {e}")
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": msg_id,
+                    "error": {
+                        "code": -32603,
+                        "message": str(e)
+                    }
+                }
+
+            # Cancelled requests get no response (the client stopped waiting)
+            if cancel_event.is_set():
+                logger.info(f"[FastMCP] Tool {tool_name} stopped after cancellation")
+                span.status = "cancelled"
+                return
+            self.send(response)
+        finally:
+            tracer().end_span(span)
+            _cancel_event.reset(token)
+            with self._in_flight_lock:
+                self._in_flight.pop(msg_id, None)
+
     # ------------------------------------------------------------------
     # Send message to client
     # ------------------------------------------------------------------
     def send(self, message: dict):
         output = json.dumps(message)
         logger.debug(f"[FastMCP] Sending: {output}")
-        sys.stdout.write(output + "\n")
-        sys.stdout.flush()
\ No newline at end of file
+        # Tool responses are sent from worker threads
+        with self._send_lock:
+            sys.stdout.write(output + "\n")
+            sys.stdout.flush()
\ No newline at end of file
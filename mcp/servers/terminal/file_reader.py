@@ -0,0 +1,276 @@
+import os
+import sys
+import mmap
+import codecs
+from dataclasses import dataclass
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ImportError:  # optional dependency
+    _detect_charset = None
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+_SAMPLE_SIZE = 64 * 1024
+_SKIP_CHUNK = 1024 * 1024
+
+
+@dataclass
+class ReadResult:
+    """
+    A decoded slice of a file.
+
+    Attributes:
+        text (str): The decoded content.
+        encoding (str): Encoding used to decode the content.
+        total_bytes (int): Size of the whole file.
+        start_byte (int): Offset of the first byte returned.
+        end_byte (int): Offset just past the last byte returned.
+        start_line (int | None): 1-based number of the first line (line mode only).
+        end_line (int | None): Number of the last line returned (line mode only;
+            None if `start_line` is past the end of the file).
+        truncated (bool): True if the output cap cut the requested range short.
+    """
+    text: str
+    encoding: str
+    total_bytes: int
+    start_byte: int
+    end_byte: int
+    start_line: int | None = None
+    end_line: int | None = None
+    truncated: bool = False
+
+
+def detect_encoding(sample: bytes) -> tuple[str, int]:
+    """
+    Guess the encoding of a file from a sample of its first bytes.
+
+    BOMs win, then strict UTF-8, then charset_normalizer when installed,
+    and finally latin-1, which can decode anything.
+
+    Returns:
+        tuple[str, int]: The encoding and the length of the BOM to skip.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+
+    try:
+        # A multi-byte character may be cut at the end of the sample
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+
+    if _detect_charset is not None:
+        best = _detect_charset(sample).best()
+        if best is not None:
+            return best.encoding, 0
+
+    return "latin-1", 0
+
+
+def _without_bom(encoding: str, sample: bytes) -> str:
+    """
+    Map codecs that write a BOM when encoding (utf-16, utf-32, utf-8-sig)
+    to their BOM-less form, so that an encoded newline matches the bytes in
+    the file. The byte order comes from the file's BOM, or else is the native
+    one, as Python's decoders assume.
+    """
+    name = codecs.lookup(encoding).name
+    if name == "utf-8-sig":
+        return "utf-8"
+    if name in ("utf-16", "utf-32"):
+        for bom, bom_encoding in _BOMS:
+            if bom_encoding.startswith(name) and sample.startswith(bom):
+                return bom_encoding
+        return f"{name}-{'le' if sys.byteorder == 'little' else 'be'}"
+    return encoding
+
+
+class _LineScanner:
+    """
+    Locates line boundaries in a memory-mapped file without decoding it.
+    """
+
+    def __init__(self, mm: mmap.mmap, encoding: str, start: int):
+        self.mm = mm
+        self.start = start
+        self.newline = "\n".encode(encoding)
+        self.width = len(self.newline)
+
+    def next_line_start(self, pos: int) -> int:
+        """Offset just past the next newline at or after `pos`, or EOF."""
+        while True:
+            found = self.mm.find(self.newline, pos)
+            if found == -1:
+                return len(self.mm)
+            if (found - self.start) % self.width == 0:
+                return found + self.width
+            pos = found + 1
+
+    def skip_lines(self, pos: int, count: int) -> int:
+        """Offset of the line `count` lines after the one starting at `pos`."""
+        if self.width == 1:
+            # Count newlines a chunk at a time instead of one find() per line
+            total = len(self.mm)
+            while count > 0 and pos < total:
+                chunk = self.mm[pos:pos + _SKIP_CHUNK]
+                found = chunk.count(self.newline)
+                if found >= count:
+                    break
+                count -= found
+                pos += len(chunk)
+
+        for _ in range(count):
+            if pos >= len(self.mm):
+                break
+            pos = self.next_line_start(pos)
+        return pos
+
+    def prev_line_start(self, end: int) -> int:
+        """Offset of the start of the line that ends just before `end`."""
+        pos = end
+        # Ignore the newline terminating the line itself
+        if pos - self.width >= self.start and self.mm[pos - self.width:pos] == self.newline:
+            pos -= self.width
+        while pos > self.start:
+            found = self.mm.rfind(self.newline, self.start, pos)
+            if found == -1:
+                return self.start
+            if (found - self.start) % self.width == 0:
+                return found + self.width
+            pos = found + self.width - 1
+        return self.start
+
+
+def read_file_range(
+    path: str,
+    start_line: int = None,
+    end_line: int = None,
+    byte_offset: int = None,
+    byte_length: int = None,
+    tail: int = None,
+    encoding: str = None,
+    max_bytes: int = 64 * 1024,
+) -> ReadResult:
+    """
+    Read part of a file through mmap, without loading the whole file.
+
+    Exactly one mode applies, in this order of precedence:
+    - tail: the last `tail` lines
+    - byte range: `byte_length` bytes from `byte_offset`
+    - line range: lines `start_line`..`end_line` (1-based, inclusive)
+
+    Args:
+        path (str): File to read.
+        start_line (int): First line to return (defaults to 1).
+        end_line (int): Last line to return (defaults to the end of the file).
+        byte_offset (int): Byte offset to start at.
+        byte_length (int): Number of bytes to read from `byte_offset`.
+        tail (int): Number of lines to return from the end of the file.
+        encoding (str): Force an encoding instead of detecting it.
+        max_bytes (int): Hard cap on the number of bytes returned.
+
+    Returns:
+        ReadResult: The decoded slice and its position in the file.
+    """
+    total = os.path.getsize(path)
+    if total == 0:
+        return ReadResult(text="", encoding=encoding or "utf-8", total_bytes=0, start_byte=0, end_byte=0)
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sample = mm[:_SAMPLE_SIZE]
+        detected, bom = detect_encoding(sample)
+        encoding = _without_bom(encoding, sample) if encoding else detected
+        scanner = _LineScanner(mm, encoding, bom)
+
+        if tail is not None:
+            end = total
+            begin = end
+            lines = 0
+            while lines < tail and begin > bom:
+                begin = scanner.prev_line_start(begin)
+                lines += 1
+
+            truncated = end - begin > max_bytes
+            if truncated:
+                # Keep the end of the file and start on a whole line
+                begin = scanner.next_line_start(end - max_bytes)
+                if begin >= end:
+                    begin = end - max_bytes
+
+            return ReadResult(
+                text=_decode(mm[begin:end], encoding),
+                encoding=encoding,
+                total_bytes=total,
+                start_byte=begin,
+                end_byte=end,
+                truncated=truncated,
+            )
+
+        if byte_offset is not None or byte_length is not None:
+            begin = min(max(bom, byte_offset or 0), total)
+            end = total if byte_length is None else min(total, begin + max(0, byte_length))
+            truncated = end - begin > max_bytes
+            if truncated:
+                end = begin + max_bytes
+
+            return ReadResult(
+                text=_decode(mm[begin:end], encoding),
+                encoding=encoding,
+                total_bytes=total,
+                start_byte=begin,
+                end_byte=end,
+                truncated=truncated,
+            )
+
+        first = max(1, start_line or 1)
+        begin = scanner.skip_lines(bom, first - 1)
+        if begin >= total and first > 1:
+            # The file has fewer than `first` lines
+            return ReadResult(
+                text="",
+                encoding=encoding,
+                total_bytes=total,
+                start_byte=total,
+                end_byte=total,
+                start_line=first,
+                end_line=None,
+            )
+
+        end = begin
+        line = first - 1
+        truncated = False
+        while end < total and (end_line is None or line < end_line):
+            next_end = scanner.next_line_start(end)
+            if next_end - begin > max_bytes:
+                truncated = True
+                if end == begin:
+                    # A single line longer than the cap
+                    end = begin + max_bytes
+                    line += 1
+                break
+            end = next_end
+            line += 1
+
+        return ReadResult(
+            text=_decode(mm[begin:end], encoding),
+            encoding=encoding,
+            total_bytes=total,
+            start_byte=begin,
+            end_byte=end,
+            start_line=first,
+            end_line=line,
+            truncated=truncated,
+        )
+
+
+def _decode(data: bytes, encoding: str) -> str:
+    return data.decode(encoding, errors="replace")
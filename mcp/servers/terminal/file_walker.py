@@ -0,0 +1,276 @@
+import os
+import re
+import fnmatch
+from dataclasses import dataclass
+
+
+@dataclass
+class FileEntry:
+    """
+    A single entry produced by the walker.
+
+    Attributes:
+        path (str): Path relative to the walk root, using "/" separators.
+        is_dir (bool): True for directories.
+        size (int | None): Size in bytes (files only).
+        mtime (float | None): Modification time as a UNIX timestamp (files only).
+    """
+    path: str
+    is_dir: bool
+    size: int | None = None
+    mtime: float | None = None
+
+
+class GitIgnore:
+    """
+    Minimal .gitignore matcher.
+
+    Supports comments, negation (`!`), directory-only rules (trailing `/`),
+    anchored rules (containing `/`), `*`, `?`, character classes and `**`.
+    Rules from nested .gitignore files are added as the walker descends and
+    are scoped to the directory they were found in. The last matching rule wins.
+    """
+
+    def __init__(self):
+        self.rules: list[tuple[re.Pattern, bool, bool]] = []
+
+    def add_file(self, gitignore_path: str, base: str = "") -> None:
+        """
+        Parse a .gitignore file and append its rules.
+
+        Args:
+            gitignore_path (str): Path of the .gitignore file.
+            base (str): Directory of the file relative to the walk root ("" for the root).
+        """
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+
+        for line in lines:
+            self.add_rule(line, base)
+
+    def add_rule(self, line: str, base: str = "") -> None:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        prefix = re.escape(f"{base}/") if base else ""
+        body = self._translate(line)
+        if anchored:
+            regex = f"^{prefix}{body}$"
+        else:
+            regex = f"^{prefix}(?:.*/)?{body}$"
+
+        self.rules.append((re.compile(regex), negate, dir_only))
+
+    def match(self, path: str, is_dir: bool) -> bool:
+        """
+        Check whether a root-relative path is ignored.
+        """
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                ignored = not negate
+        return ignored
+
+    def copy(self) -> "GitIgnore":
+        clone = GitIgnore()
+        clone.rules = list(self.rules)
+        return clone
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        i, n = 0, len(pattern)
+        out = []
+        while i < n:
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == n:
+                out.append("/.*")
+                i += 3
+            elif pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            elif c == "*":
+                out.append("[^/]*")
+                i += 1
+            elif c == "?":
+                out.append("[^/]")
+                i += 1
+            elif c == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    out.append(re.escape(c))
+                    i += 1
+                else:
+                    cls = pattern[i + 1:end]
+                    if cls.startswith("!"):
+                        cls = "^" + cls[1:]
+                    out.append(f"[{cls}]")
+                    i = end + 1
+            else:
+                out.append(re.escape(c))
+                i += 1
+        return "".join(out)
+
+
+def _matches_any(path: str, name: str, patterns: list[str]) -> bool:
+    for pattern in patterns:
+        target = path if "/" in pattern else name
+        if fnmatch.fnmatchcase(target, pattern):
+            return True
+    return False
+
+
+def walk(
+    root: str,
+    max_depth: int = 1,
+    include: list[str] = None,
+    exclude: list[str] = None,
+    respect_gitignore: bool = True,
+    show_hidden: bool = True,
+    after: str = None,
+):
+    """
+    Walk a directory tree with os.scandir in a stable pre-order.
+
+    Siblings are visited sorted by name, so the walk order equals the order
+    of the path component tuples. That lets `after` resume a walk from a
+    previous position while skipping whole subtrees that were already listed.
+
+    Args:
+        root (str): Directory to walk.
+        max_depth (int): How many levels to descend (1 lists only `root`).
+        include (list[str]): Glob patterns a file must match to be yielded.
+            Patterns containing "/" match the relative path, others the name.
+            Directories are only yielded when no include pattern is given.
+        exclude (list[str]): Glob patterns for files and directories to skip.
+        respect_gitignore (bool): Skip `.git` and paths ignored by .gitignore files.
+        show_hidden (bool): Include entries whose name starts with ".".
+        after (str): Resume after this relative path (exclusive).
+
+    Yields:
+        FileEntry: Entries in walk order.
+    """
+    include = include or []
+    exclude = exclude or []
+    after_parts = tuple(after.strip("/").split("/")) if after else None
+
+    ignore = GitIgnore()
+    if respect_gitignore:
+        ignore.add_file(os.path.join(root, ".gitignore"))
+
+    yield from _walk_dir(
+        root, "", 1, max_depth, include, exclude,
+        respect_gitignore, show_hidden, ignore, after_parts,
+    )
+
+
+def _walk_dir(abs_dir, rel_dir, depth, max_depth, include, exclude,
+              respect_gitignore, show_hidden, ignore, after_parts):
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
+
+    for entry in entries:
+        name = entry.name
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        parts = tuple(rel_path.split("/"))
+
+        if not show_hidden and name.startswith("."):
+            continue
+
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+
+        if after_parts is not None and parts < after_parts:
+            # Already listed, unless the resume point lies inside this directory
+            if not (is_dir and after_parts[:len(parts)] == parts):
+                continue
+
+        if respect_gitignore:
+            if is_dir and name == ".git":
+                continue
+            if ignore.match(rel_path, is_dir):
+                continue
+        if exclude and _matches_any(rel_path, name, exclude):
+            continue
+
+        already_listed = after_parts is not None and parts <= after_parts
+
+        if is_dir:
+            if not include and not already_listed:
+                yield FileEntry(path=rel_path, is_dir=True)
+
+            if depth < max_depth:
+                child_ignore = ignore
+                if respect_gitignore:
+                    nested = os.path.join(entry.path, ".gitignore")
+                    if os.path.isfile(nested):
+                        child_ignore = ignore.copy()
+                        child_ignore.add_file(nested, base=rel_path)
+
+                yield from _walk_dir(
+                    entry.path, rel_path, depth + 1, max_depth, include, exclude,
+                    respect_gitignore, show_hidden, child_ignore, after_parts,
+                )
+            continue
+
+        if already_listed:
+            continue
+        if include and not _matches_any(rel_path, name, include):
+            continue
+
+        try:
+            stat = entry.stat(follow_symlinks=False)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size, mtime = None, None
+
+        yield FileEntry(path=rel_path, is_dir=False, size=size, mtime=mtime)
+
+
+def list_page(root: str, limit: int = 200, cursor: str = None, **walk_options) -> tuple[list[FileEntry], str | None]:
+    """
+    Return one page of walk results.
+
+    Args:
+        root (str): Directory to walk.
+        limit (int): Maximum number of entries in the page.
+        cursor (str): Cursor returned by the previous page, if any.
+        **walk_options: Forwarded to `walk`.
+
+    Returns:
+        tuple[list[FileEntry], str | None]: The entries and the cursor for the
+        next page, or None when the listing is complete.
+    """
+    page: list[FileEntry] = []
+    for entry in walk(root, after=cursor, **walk_options):
+        if len(page) == limit:
+            return page, page[-1].path
+        page.append(entry)
+    return page, None
@@ -0,0 +1,431 @@
+import os
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from mcp.servers.terminal.file_walker import walk
+
+logger = logging.getLogger("terminal_server")
+
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = set("*?{")
+
+
+@dataclass
+class SearchMatch:
+    """
+    A matching line with its surrounding context.
+
+    Attributes:
+        path (str): File path relative to the index root.
+        line_number (int): 1-based line number of the match.
+        line (str): The matching line.
+        before (list[str]): Context lines preceding the match.
+        after (list[str]): Context lines following the match.
+    """
+    path: str
+    line_number: int
+    line: str
+    before: list[str] = field(default_factory=list)
+    after: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SearchResult:
+    matches: list[SearchMatch]
+    total_matches: int
+    total_files: int
+    next_cursor: int | None
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Return the set of lowercase trigrams contained in `text`.
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> list[str] | None:
+    """
+    Extract literal fragments that every match of a regex must contain.
+
+    The extraction is deliberately conservative: groups, character classes
+    and optional characters are skipped, and a top-level alternation makes
+    the pattern unindexable.
+
+    Returns:
+        list[str] | None: The literal fragments, or None if the pattern
+        cannot be narrowed down through the index.
+    """
+    literals: list[str] = []
+    current: list[str] = []
+    depth = 0
+    i, n = 0, len(pattern)
+
+    def flush():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            i += 2
+            if depth == 0 and not nxt.isalnum():
+                current.append(nxt)
+                if i < n and pattern[i] in _QUANTIFIERS:
+                    current.pop()
+                    flush()
+            else:
+                flush()
+            continue
+        if c == "|" and depth == 0:
+            return None
+        if c == "(":
+            depth += 1
+            flush()
+        elif c == ")":
+            depth = max(0, depth - 1)
+            flush()
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            flush()
+            i = n if end == -1 else end + 1
+            continue
+        elif c == "{":
+            # Repetition counts like {2,3} are not literal text
+            end = pattern.find("}", i + 1)
+            flush()
+            i = n if end == -1 else end + 1
+            continue
+        elif depth == 0 and c not in _REGEX_META:
+            current.append(c)
+            if i + 1 < n and pattern[i + 1] in _QUANTIFIERS:
+                current.pop()
+                flush()
+        else:
+            flush()
+        i += 1
+
+    flush()
+    return literals
+
+
+class TrigramIndex:
+    """
+    Incrementally maintained trigram index over the text files of a directory.
+
+    Each file is tokenised into lowercase trigrams and recorded in an inverted
+    index. Queries intersect the posting sets of the trigrams they require to
+    find candidate files, and only those candidates are read and matched.
+    The tree is rescanned by mtime/size at most every `refresh_interval`
+    seconds, re-indexing changed files and dropping deleted ones.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_file_size: int = 1024 * 1024,
+        refresh_interval: float = 5.0,
+        max_depth: int = 64,
+    ):
+        self.root = os.path.abspath(root)
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+        self.max_depth = max_depth
+
+        self._file_ids: dict[str, int] = {}
+        self._paths: dict[int, str] = {}
+        self._stats: dict[int, tuple[int, float]] = {}
+        self._file_trigrams: dict[int, set[str]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._binary: dict[str, tuple[int, float]] = {}
+        self._dirs: set[str] = set()
+        self._next_id = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def file_count(self) -> int:
+        return len(self._file_ids)
+
+    def covers(self, subdir: str) -> bool:
+        """
+        Whether the last refresh walked `subdir` (relative to the root), i.e.
+        it was not skipped as ignored or too deep, so its files are indexed.
+        """
+        self.refresh()
+        with self._lock:
+            return subdir in self._dirs
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Rescan the tree and update the index for changed, new and deleted files.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return
+
+            started = time.perf_counter()
+            seen: set[str] = set()
+            dirs: set[str] = set()
+            updated = 0
+
+            for entry in walk(self.root, max_depth=self.max_depth):
+                if entry.is_dir:
+                    dirs.add(entry.path)
+                    continue
+                if entry.size is None:
+                    continue
+                if entry.size > self.max_file_size:
+                    continue
+
+                seen.add(entry.path)
+                if self._binary.get(entry.path) == (entry.size, entry.mtime):
+                    continue
+                file_id = self._file_ids.get(entry.path)
+                if file_id is not None and self._stats.get(file_id) == (entry.size, entry.mtime):
+                    continue
+
+                self._index_file(entry.path, entry.size, entry.mtime)
+                updated += 1
+
+            removed = [path for path in self._file_ids if path not in seen]
+            for path in removed:
+                self._remove_file(path)
+            for path in [path for path in self._binary if path not in seen]:
+                del self._binary[path]
+            self._dirs = dirs
+
+            self._last_refresh = time.monotonic()
+            if updated or removed:
+                logger.info(
+                    f"[SearchIndex] Refreshed {self.root}: {updated} indexed, {len(removed)} removed, "
+                    f"{self.file_count} files in {time.perf_counter() - started:.3f}s"
+                )
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        context: int = 2,
+        path_pattern: str = None,
+        offset: int = 0,
+        limit: int = 50,
+        subdir: str = None,
+    ) -> SearchResult:
+        """
+        Search the indexed files.
+
+        Args:
+            query (str): Literal text or a regular expression.
+            regex (bool): Treat `query` as a regular expression.
+            case_sensitive (bool): Match case exactly.
+            context (int): Lines of context around each match.
+            path_pattern (str): Optional regex the relative path must match.
+            offset (int): Number of ranked matches to skip (the pagination cursor).
+            limit (int): Maximum number of matches to return.
+            subdir (str): Only search files under this directory, relative to
+                the root. Paths are then matched and returned relative to it.
+
+        Returns:
+            SearchResult: One page of ranked matches.
+        """
+        self.refresh()
+
+        flags = 0 if case_sensitive else re.IGNORECASE
+        compiled = re.compile(query if regex else re.escape(query), flags)
+        path_filter = re.compile(path_pattern) if path_pattern else None
+
+        literals = required_literals(query) if regex else [query]
+        candidates = self._candidates(literals)
+        if subdir:
+            prefix = subdir.strip("/") + "/"
+            candidates = [(path, path[len(prefix):]) for path in candidates if path.startswith(prefix)]
+        else:
+            candidates = [(path, path) for path in candidates]
+
+        query_lower = query.lower()
+        ranked: list[tuple[float, str, list[int], list[str]]] = []
+        for indexed_path, path in candidates:
+            if path_filter and not path_filter.search(path):
+                continue
+
+            lines = self._read_lines(indexed_path)
+            if lines is None:
+                continue
+
+            hits = [i for i, line in enumerate(lines) if compiled.search(line)]
+            if not hits:
+                continue
+
+            # More hits rank higher, with a boost when the file name itself matches
+            score = float(len(hits))
+            if not regex and query_lower in os.path.basename(path).lower():
+                score += 100
+            ranked.append((score, path, hits, lines))
+
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        total_matches = sum(len(item[2]) for item in ranked)
+
+        page: list[SearchMatch] = []
+        position = 0
+        for _, path, hits, lines in ranked:
+            if position + len(hits) <= offset:
+                position += len(hits)
+                continue
+            for line_index in hits:
+                if position < offset:
+                    position += 1
+                    continue
+                if len(page) == limit:
+                    break
+                page.append(SearchMatch(
+                    path=path,
+                    line_number=line_index + 1,
+                    line=lines[line_index],
+                    before=lines[max(0, line_index - context):line_index],
+                    after=lines[line_index + 1:line_index + 1 + context],
+                ))
+                position += 1
+            if len(page) == limit:
+                break
+
+        next_offset = offset + len(page)
+        return SearchResult(
+            matches=page,
+            total_matches=total_matches,
+            total_files=len(ranked),
+            next_cursor=next_offset if next_offset < total_matches else None,
+        )
+
+    def _candidates(self, literals: list[str] | None) -> list[str]:
+        with self._lock:
+            grams: set[str] = set()
+            for literal in literals or []:
+                grams |= trigrams(literal)
+
+            if not grams:
+                return sorted(self._file_ids)
+
+            candidate_ids: set[int] | None = None
+            # Intersect the rarest postings first so the working set shrinks fast
+            for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                candidate_ids = set(posting) if candidate_ids is None else candidate_ids & posting
+                if not candidate_ids:
+                    return []
+
+            return sorted(self._paths[file_id] for file_id in candidate_ids)
+
+    def _read_lines(self, path: str) -> list[str] | None:
+        try:
+            with open(os.path.join(self.root, path), "r", encoding="utf-8", errors="replace") as f:
+                return f.read().splitlines()
+        except OSError:
+            return None
+
+    def _index_file(self, path: str, size: int, mtime: float) -> None:
+        try:
+            with open(os.path.join(self.root, path), "rb") as f:
+                data = f.read()
+        except OSError:
+            self._remove_file(path)
+            return
+
+        if b"\0" in data[:8192]:
+            self._remove_file(path)
+            self._binary[path] = (size, mtime)
+            return
+        self._binary.pop(path, None)
+
+        file_id = self._file_ids.get(path)
+        if file_id is None:
+            file_id = self._next_id
+            self._next_id += 1
+            self._file_ids[path] = file_id
+            self._paths[file_id] = path
+        else:
+            self._drop_postings(file_id)
+
+        grams = trigrams(data.decode("utf-8", errors="replace"))
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(file_id)
+
+        self._file_trigrams[file_id] = grams
+        self._stats[file_id] = (size, mtime)
+
+    def _remove_file(self, path: str) -> None:
+        file_id = self._file_ids.pop(path, None)
+        if file_id is None:
+            return
+        self._drop_postings(file_id)
+        self._paths.pop(file_id, None)
+        self._stats.pop(file_id, None)
+
+    def _drop_postings(self, file_id: int) -> None:
+        for gram in self._file_trigrams.pop(file_id, ()):
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(file_id)
+            if not posting:
+                del self._postings[gram]
+
+
+class TrigramIndexCache:
+    """
+    Keeps the trigram indexes of recently searched directories.
+
+    A directory under the shared root (the project directory) is searched
+    through the root's index, restricted to that directory, instead of
+    indexing it again. Other directories get their own index, and when more
+    than `max_indexes` are kept the least recently used one is dropped.
+    """
+
+    def __init__(self, shared_root: str, max_indexes: int = 4, refresh_interval: float = 5.0):
+        self.shared_root = os.path.abspath(shared_root)
+        self.max_indexes = max(1, max_indexes)
+        self.refresh_interval = refresh_interval
+        self._indexes: OrderedDict[str, TrigramIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> tuple[TrigramIndex, str | None]:
+        """
+        Args:
+            path (str): Directory to search.
+
+        Returns:
+            tuple[TrigramIndex, str | None]: The index to search and the
+            subdirectory to restrict it to (None for the whole index).
+        """
+        path = os.path.abspath(path)
+        if os.path.commonpath([path, self.shared_root]) == self.shared_root and path != self.shared_root:
+            subdir = os.path.relpath(path, self.shared_root).replace(os.sep, "/")
+            index = self._index(self.shared_root)
+            if index.covers(subdir):
+                return index, subdir
+            # Skipped by the shared index (e.g. ignored by .gitignore)
+        return self._index(path), None
+
+    def _index(self, root: str) -> TrigramIndex:
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is not None:
+                self._indexes.move_to_end(root)
+                return index
+
+            while len(self._indexes) >= self.max_indexes:
+                evicted, _ = self._indexes.popitem(last=False)
+                logger.info(f"[SearchIndex] Dropping index of {evicted} (least recently used)")
+            index = TrigramIndex(root, refresh_interval=self.refresh_interval)
+            self._indexes[root] = index
+            return index
@@ -1,5 +1,8 @@
 import os
+import re
 import sys
+import time
+import atexit
 import subprocess
 import logging
 
@@ -15,7 +18,11 @@ if project_root not in sys.path:
 # Import FastMCP from your local mcp.servers.fastmcp
 # -------------------------------------------------------------------
 try:
-    from mcp.servers.stdio_server import FastMCP
+    from mcp.servers.stdio_server import FastMCP, current_cancel_event
+    from mcp.servers.terminal.shell_pool import ShellSessionPool, ShellSessionError
+    from mcp.servers.terminal.file_walker import list_page
+    from mcp.servers.terminal.search_index import TrigramIndexCache
+    from mcp.servers.terminal.file_reader import read_file_range
 except ModuleNotFoundError as e:
     print(f"[ERROR] Could not import FastMCP. Check your project structure.", file=sys.stderr)
     print(f"Expected file: {project_root}/mcp/servers/stdio_server.py", file=sys.stderr)
@@ -38,49 +45,136 @@ logger = logging.getLogger("terminal_server")
 mcp = FastMCP("Terminal Server", version="1.0.0")
 
 # -------------------------------------------------------------------
-# Default project directory
+# Default project directory (override with TERMINAL_PROJECT_DIR)
 # -------------------------------------------------------------------
-DEFAULT_PROJECT_DIR = os.path.abspath("C:/Users/Documents/mcp/MCP---A2A")
+DEFAULT_PROJECT_DIR = os.path.abspath(os.environ.get("TERMINAL_PROJECT_DIR", project_root))
+
+# -------------------------------------------------------------------
+# Persistent shell sessions (POSIX only; Windows falls back to one-shot)
+# -------------------------------------------------------------------
+COMMAND_TIMEOUT = 30
+USE_SHELL_POOL = os.name != "nt" and os.environ.get("TERMINAL_SHELL_POOL", "1") != "0"
+
+shell_pool = ShellSessionPool(
+    shell=os.environ.get("TERMINAL_SHELL", "/bin/sh"),
+    max_sessions=int(os.environ.get("TERMINAL_MAX_SESSIONS", "8")),
+    max_commands=int(os.environ.get("TERMINAL_SESSION_MAX_COMMANDS", "200")),
+    idle_timeout=float(os.environ.get("TERMINAL_SESSION_IDLE_TIMEOUT", "300")),
+)
+atexit.register(shell_pool.close_all)
+
+# -------------------------------------------------------------------
+# Search indexes of recently searched roots; subdirectories of the
+# project directory share its index
+# -------------------------------------------------------------------
+search_indexes = TrigramIndexCache(
+    DEFAULT_PROJECT_DIR,
+    max_indexes=int(os.environ.get("TERMINAL_SEARCH_MAX_INDEXES", "4")),
+    refresh_interval=float(os.environ.get("TERMINAL_SEARCH_REFRESH_INTERVAL", "5")),
+)
+
+# -------------------------------------------------------------------
+# Hard cap on the bytes a single read_file call may return
+# -------------------------------------------------------------------
+READ_MAX_BYTES = int(os.environ.get("TERMINAL_READ_MAX_BYTES", str(64 * 1024)))
+
+
+def _format_output(stdout: str, stderr: str, returncode: int) -> str:
+    output = []
+    if stdout:
+        output.append(f"STDOUT:\n{stdout}")
+    if stderr:
+        output.append(f"STDERR:\n{stderr}")
+    if returncode != 0:
+        output.append(f"Exit code: {returncode}")
+
+    if not output:
+        return "(Command executed successfully, no output)"
+
+    return "\n\n".join(output)
 
 # -------------------------------------------------------------------
 # Tools
 # -------------------------------------------------------------------
 @mcp.tool()
-def run_command(command: str) -> str:
-    """Execute a shell command and return its output."""
+def run_command(command: str, session_id: str = None) -> str:
+    """
+    Execute a shell command and return its output.
+    Commands sharing a session_id run in the same long-lived shell, so the
+    working directory and environment carry over. Omit it to use the default session.
+    """
     try:
         logger.info(f"[Tool] Executing command: {command}")
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
 
-        output = []
-        if result.stdout:
-            output.append(f"STDOUT:\n{result.stdout}")
-        if result.stderr:
-            output.append(f"STDERR:\n{result.stderr}")
-        if result.returncode != 0:
-            output.append(f"Exit code: {result.returncode}")
+        if not USE_SHELL_POOL:
+            result = subprocess.run(
+                command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                timeout=COMMAND_TIMEOUT
+            )
+            return _format_output(result.stdout, result.stderr, result.returncode)
 
-        if not output:
-            return "(Command executed successfully, no output)"
+        result = shell_pool.run(
+            command,
+            session_id=session_id or "default",
+            timeout=COMMAND_TIMEOUT,
+            cancel_event=current_cancel_event(),
+        )
+        if result.cancelled:
+            return "Command was cancelled (session was reset)"
+        if result.timed_out:
+            return f"Error: Command timed out after {COMMAND_TIMEOUT} seconds (session was reset)"
 
-        return "\n\n".join(output)
+        output = _format_output(result.stdout, result.stderr, result.returncode)
+        if result.exited:
+            output += "\n\n(The command ended the shell; the next command starts a new session)"
+        return output
 
     except subprocess.TimeoutExpired:
-        return "Error: Command timed out after 30 seconds"
+        return f"Error: Command timed out after {COMMAND_TIMEOUT} seconds"
+    except ShellSessionError as e:
+        logger.error(f"[Tool] Shell session failed: {e}")
+        return f"Command execution failed: {str(e)} (session was reset)"
     except Exception as e:
         logger.error(f"[Tool] Command execution failed: {e}")
         return f"Command execution failed: {str(e)}"
 
 
 @mcp.tool()
-def list_files(path: str = None) -> str:
-    """List all files and folders in a given path. Defaults to the project directory."""
+def reset_session(session_id: str = None) -> str:
+    """Close a persistent shell session so the next command starts in a fresh shell."""
+    name = session_id or "default"
+    if shell_pool.reset(name):
+        return f"Session '{name}' was reset"
+    return f"No active session named '{name}'"
+
+
+def _split_patterns(patterns: str) -> list[str]:
+    if not patterns:
+        return []
+    if isinstance(patterns, list):
+        return patterns
+    return [p.strip() for p in patterns.split(",") if p.strip()]
+
+
+@mcp.tool()
+def list_files(
+    path: str = None,
+    max_depth: int = 1,
+    pattern: str = None,
+    exclude: str = None,
+    respect_gitignore: bool = True,
+    cursor: str = None,
+    limit: int = 200,
+) -> str:
+    """
+    List files and folders under a path. Defaults to the project directory.
+    max_depth > 1 recurses; pattern/exclude take comma separated globs
+    (e.g. "*.py,docs/*.md"); .gitignore rules are honoured by default.
+    Results are paginated: pass the returned cursor to get the next page.
+    """
     try:
         target_path = path or DEFAULT_PROJECT_DIR
         logger.info(f"[Tool] Listing files in: {target_path}")
@@ -92,24 +186,37 @@ def list_files(path: str = None) -> str:
         if not os.path.isdir(abs_path):
             return f"Error: Path is not a directory: {abs_path}"
 
-        items = os.listdir(abs_path)
-        if not items:
+        entries, next_cursor = list_page(
+            abs_path,
+            limit=max(1, int(limit)),
+            cursor=cursor,
+            max_depth=max(1, int(max_depth)),
+            include=_split_patterns(pattern),
+            exclude=_split_patterns(exclude),
+            respect_gitignore=respect_gitignore,
+        )
+
+        if not entries:
+            if cursor:
+                return f"(No more entries in: {abs_path})"
             return f"(Empty directory: {abs_path})"
 
-        # Separate directories and files
-        dirs = []
-        files = []
-        for item in sorted(items):
-            item_path = os.path.join(abs_path, item)
-            if os.path.isdir(item_path):
-                dirs.append(f"[DIR]  {item}")
+        dirs = 0
+        files = 0
+        result = [f"Contents of: {abs_path}", ""]
+        for entry in entries:
+            if entry.is_dir:
+                dirs += 1
+                result.append(f"[DIR]  {entry.path}/")
             else:
-                files.append(f"[FILE] {item}")
+                files += 1
+                size = "?" if entry.size is None else entry.size
+                mtime = "?" if entry.mtime is None else time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.mtime))
+                result.append(f"[FILE] {entry.path}  ({size} bytes, modified {mtime})")
 
-        result = [f"Contents of: {abs_path}", ""]
-        result.extend(dirs)
-        result.extend(files)
-        result.append(f"\nTotal: {len(dirs)} directories, {len(files)} files")
+        result.append(f"\nTotal: {dirs} directories, {files} files")
+        if next_cursor:
+            result.append(f"More entries available. next_cursor: {next_cursor}")
 
         return "\n".join(result)
 
@@ -117,6 +224,155 @@ def list_files(path: str = None) -> str:
         logger.error(f"[Tool] List files failed: {e}")
         return f"Error: {str(e)}"
 
+@mcp.tool()
+def search_files(
+    query: str,
+    path: str = None,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    context: int = 2,
+    path_pattern: str = None,
+    cursor: int = 0,
+    limit: int = 20,
+) -> str:
+    """
+    Search file contents under a path (defaults to the project directory).
+    Uses an incrementally updated trigram index, so repeated searches are fast.
+    Set regex=true for regular expressions; path_pattern is a regex on file paths.
+    Results are ranked and paginated: pass the returned cursor to get the next page.
+    """
+    try:
+        abs_path = os.path.abspath(path or DEFAULT_PROJECT_DIR)
+        if not os.path.isdir(abs_path):
+            return f"Error: Path is not a directory: {abs_path}"
+        if not query:
+            return "Error: query must not be empty"
+
+        logger.info(f"[Tool] Searching {abs_path} for: {query}")
+
+        index, subdir = search_indexes.get(abs_path)
+        result = index.search(
+            query,
+            regex=regex,
+            case_sensitive=case_sensitive,
+            context=max(0, int(context)),
+            path_pattern=path_pattern,
+            offset=max(0, int(cursor or 0)),
+            limit=max(1, int(limit)),
+            subdir=subdir,
+        )
+
+        if not result.matches:
+            return f"No matches for '{query}' in {abs_path}"
+
+        start = int(cursor or 0) + 1
+        lines = [
+            f"Search results for '{query}' in {abs_path}",
+            f"{result.total_matches} matches in {result.total_files} files "
+            f"(showing {start}-{start + len(result.matches) - 1})",
+        ]
+
+        current_path = None
+        printed_upto = 0
+        for match in result.matches:
+            if match.path != current_path:
+                current_path = match.path
+                printed_upto = 0
+                lines.append(f"\n{match.path}")
+            elif match.line_number - len(match.before) > printed_upto + 1:
+                lines.append("  --")
+
+            # Overlapping context between nearby matches is only printed once
+            first = match.line_number - len(match.before)
+            numbered = [(first + i, "-", text) for i, text in enumerate(match.before)]
+            numbered.append((match.line_number, ":", match.line))
+            numbered += [(match.line_number + i + 1, "-", text) for i, text in enumerate(match.after)]
+            for number, marker, text in numbered:
+                if number <= printed_upto:
+                    if marker == ":":
+                        lines[-(printed_upto - number + 1)] = f"  {number}: {text[:300]}"
+                    continue
+                lines.append(f"  {number}{marker} {text[:300]}")
+                printed_upto = number
+
+        if result.next_cursor is not None:
+            lines.append(f"\nMore matches available. next_cursor: {result.next_cursor}")
+
+        return "\n".join(lines)
+
+    except re.error as e:
+        return f"Error: Invalid regular expression: {e}"
+    except Exception as e:
+        logger.error(f"[Tool] Search failed: {e}")
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def read_file(
+    path: str,
+    start_line: int = None,
+    end_line: int = None,
+    byte_offset: int = None,
+    byte_length: int = None,
+    tail: int = None,
+    encoding: str = None,
+    max_bytes: int = None,
+) -> str:
+    """
+    Read part of a file without loading it all. Relative paths are resolved
+    against the project directory. Modes: tail=N for the last N lines,
+    byte_offset/byte_length for a byte range, or start_line/end_line (1-based).
+    Output is capped; the header says how to continue when it is truncated.
+    """
+    try:
+        abs_path = os.path.abspath(os.path.join(DEFAULT_PROJECT_DIR, path))
+        logger.info(f"[Tool] Reading file: {abs_path}")
+
+        if not os.path.exists(abs_path):
+            return f"Error: Path does not exist: {abs_path}"
+        if not os.path.isfile(abs_path):
+            return f"Error: Path is not a file: {abs_path}"
+
+        cap = READ_MAX_BYTES if max_bytes is None else min(int(max_bytes), READ_MAX_BYTES)
+        result = read_file_range(
+            abs_path,
+            start_line=start_line,
+            end_line=end_line,
+            byte_offset=byte_offset,
+            byte_length=byte_length,
+            tail=tail,
+            encoding=encoding,
+            max_bytes=max(1, cap),
+        )
+
+        header = f"File: {abs_path} ({result.total_bytes} bytes, {result.encoding})"
+        if result.start_line is not None and result.end_line is None:
+            header += f" line {result.start_line} is past the end of the file"
+        elif result.start_line is not None:
+            header += f" lines {result.start_line}-{result.end_line}"
+        else:
+            header += f" bytes {result.start_byte}-{result.end_byte}"
+
+        lines = [header]
+        if result.truncated:
+            if result.start_line is not None and result.text.endswith("\n"):
+                lines.append(f"(Output capped at {cap} bytes. Continue with start_line={result.end_line + 1})")
+            elif result.start_line is not None:
+                lines.append(f"(Output capped at {cap} bytes inside line {result.end_line}. Continue with byte_offset={result.end_byte})")
+            elif tail is not None:
+                lines.append(f"(Output capped at {cap} bytes. Earlier content ends at byte_offset={result.start_byte})")
+            else:
+                lines.append(f"(Output capped at {cap} bytes. Continue with byte_offset={result.end_byte})")
+        lines.append("")
+        lines.append(result.text)
+
+        return "\n".join(lines)
+
+    except (ValueError, LookupError) as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"[Tool] Read file failed: {e}")
+        return f"Error: {str(e)}"
+
 # -------------------------------------------------------------------
 # Start Server
 # -------------------------------------------------------------------
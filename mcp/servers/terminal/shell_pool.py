@@ -0,0 +1,354 @@
+import os
+import shlex
+import signal
+import selectors
+import subprocess
+import threading
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import uuid4
+
+logger = logging.getLogger("terminal_server")
+
+# How often a running command checks its cancel event and the shell, in seconds
+CANCEL_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class CommandResult:
+    """
+    Result of a command executed inside a shell session.
+
+    Attributes:
+        stdout (str): Captured standard output.
+        stderr (str): Captured standard error.
+        returncode (int | None): Exit status, or None if the command timed out or was cancelled.
+        timed_out (bool): True if the command exceeded its timeout.
+        cancelled (bool): True if the command was stopped through its cancel event.
+        exited (bool): True if the command ended the shell (e.g. `exit 3` or
+            `exec`); `returncode` is then the shell's exit status.
+    """
+    stdout: str
+    stderr: str
+    returncode: int | None
+    timed_out: bool = False
+    cancelled: bool = False
+    exited: bool = False
+
+
+class ShellSessionError(RuntimeError):
+    """Raised when a shell session dies or loses its framing."""
+
+
+class ShellSession:
+    """
+    A long-lived `/bin/sh` process that runs commands one at a time.
+
+    Every command is wrapped with a unique sentinel that is echoed to
+    stdout (with the exit status) and to stderr once the command finishes,
+    so the output of consecutive commands can be framed on the same pipes.
+    The working directory, exported variables and activated virtualenvs
+    persist between commands because they all run in the same shell.
+    Commands sent from several threads run one after the other.
+    """
+
+    def __init__(self, shell: str = "/bin/sh", cwd: str = None, env: dict = None):
+        self.shell = shell
+        self.commands_run = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self._sentinel = f"__MCP_SHELL_DONE_{uuid4().hex}__"
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            [shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            bufsize=0,
+            start_new_session=True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, command: str, timeout: float = 30, cancel_event: threading.Event = None) -> CommandResult:
+        """
+        Run a command in the session and wait for its sentinel.
+
+        Args:
+            command (str): The shell command to execute.
+            timeout (float): Seconds to wait before giving up on the command.
+            cancel_event (threading.Event): Stops the command as soon as it is set.
+
+        Returns:
+            CommandResult: Captured output and exit status. If the command
+            times out, is cancelled or ends the shell, the session is closed
+            and must not be reused.
+        """
+        with self._lock:
+            return self._run(command, timeout, cancel_event)
+
+    def _run(self, command: str, timeout: float, cancel_event: threading.Event = None) -> CommandResult:
+        if not self.alive:
+            raise ShellSessionError("Shell session is no longer running")
+
+        # `eval` keeps cd/export in this shell; the `command` prefix stops a
+        # syntax error from exiting the shell or swallowing the sentinel.
+        # stdin is detached so commands like `cat` never read the framing.
+        script = (
+            f"command eval {shlex.quote(command)} < /dev/null\n"
+            f"__mcp_rc=$?\n"
+            f"printf '\\n%s %d\\n' '{self._sentinel}' \"$__mcp_rc\"\n"
+            f"printf '\\n%s\\n' '{self._sentinel}' >&2\n"
+        )
+
+        self.commands_run += 1
+        self.last_used = time.monotonic()
+
+        try:
+            self._process.stdin.write(script.encode())
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ShellSessionError(f"Shell session closed: {e}")
+
+        stdout, stderr, stopped, exited = self._read_until_sentinel(timeout, cancel_event)
+        self.last_used = time.monotonic()
+
+        if exited and not stopped:
+            # The command ended the shell before the sentinel: report it like
+            # a one-off shell would, with the shell's exit status
+            try:
+                returncode = self._process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                returncode = None
+            self.close()
+            return CommandResult(
+                stdout=stdout.decode(errors="replace"),
+                stderr=stderr.decode(errors="replace"),
+                returncode=returncode,
+                exited=True,
+            )
+
+        if stopped:
+            self.close()
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            return CommandResult(
+                stdout=stdout.decode(errors="replace"),
+                stderr=stderr.decode(errors="replace"),
+                returncode=None,
+                timed_out=not cancelled,
+                cancelled=cancelled,
+            )
+
+        marker = f"\n{self._sentinel} ".encode()
+        out, _, tail = stdout.rpartition(marker)
+        try:
+            returncode = int(tail.strip() or 0)
+        except ValueError:
+            returncode = -1
+        err = stderr[: -len(f"\n{self._sentinel}\n")]
+
+        return CommandResult(
+            stdout=out.decode(errors="replace"),
+            stderr=err.decode(errors="replace"),
+            returncode=returncode,
+        )
+
+    def _read_until_sentinel(self, timeout: float, cancel_event: threading.Event = None) -> tuple[bytes, bytes, bool, bool]:
+        """
+        Read stdout and stderr until both carry the sentinel line, or until
+        both are closed because the shell exited.
+
+        Returns:
+            tuple[bytes, bytes, bool, bool]: stdout, stderr, whether the read
+            stopped early (timed out or cancelled) and whether the shell exited.
+        """
+        stdout_marker = f"\n{self._sentinel} ".encode()
+        stderr_marker = f"\n{self._sentinel}\n".encode()
+        buffers = {self._process.stdout: bytearray(), self._process.stderr: bytearray()}
+        done = {self._process.stdout: False, self._process.stderr: False}
+
+        exited = False
+
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._process.stdout, selectors.EVENT_READ)
+            selector.register(self._process.stderr, selectors.EVENT_READ)
+
+            while not all(done.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                    # Once the shell has exited, its output is complete either way
+                    return bytes(buffers[self._process.stdout]), bytes(buffers[self._process.stderr]), not exited, exited
+
+                if not exited and self._process.poll() is not None:
+                    # Exited while a background child keeps the pipes open
+                    exited = True
+                    deadline = min(deadline, time.monotonic() + 1.0)
+
+                # Wake up regularly to notice cancellation or the shell exiting
+                wait = min(remaining, CANCEL_POLL_INTERVAL)
+                for key, _ in selector.select(wait):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        # The shell exited; collect what is left on the other pipe
+                        selector.unregister(key.fileobj)
+                        done[key.fileobj] = True
+                        if not exited:
+                            exited = True
+                            # A background child may hold the other pipe open
+                            deadline = min(deadline, time.monotonic() + 1.0)
+                        continue
+
+                    buffer = buffers[key.fileobj]
+                    buffer.extend(chunk)
+                    if key.fileobj is self._process.stdout:
+                        # Only the tail can hold the "<sentinel> <rc>" line
+                        tail = buffer[-(len(stdout_marker) + 12):]
+                        done[key.fileobj] = stdout_marker in tail and tail.endswith(b"\n")
+                    else:
+                        done[key.fileobj] = buffer.endswith(stderr_marker)
+
+        return bytes(buffers[self._process.stdout]), bytes(buffers[self._process.stderr]), False, exited
+
+    def close(self) -> None:
+        """
+        Terminate the shell process and anything still running in its
+        process group (e.g. a command that timed out).
+        """
+        try:
+            os.killpg(self._process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self._process.stdin, self._process.stdout, self._process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ShellSessionPool:
+    """
+    Keeps a bounded set of ShellSessions keyed by session id.
+
+    Sessions are recycled after `max_commands` commands, when they have been
+    idle for longer than `idle_timeout` seconds, or when they die. When more
+    than `max_sessions` are open the least recently used one is closed.
+    """
+
+    def __init__(
+        self,
+        shell: str = "/bin/sh",
+        cwd: str = None,
+        max_sessions: int = 8,
+        max_commands: int = 200,
+        idle_timeout: float = 300,
+    ):
+        self.shell = shell
+        self.cwd = cwd
+        self.max_sessions = max_sessions
+        self.max_commands = max_commands
+        self.idle_timeout = idle_timeout
+        self._sessions: OrderedDict[str, ShellSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        command: str,
+        session_id: str = "default",
+        timeout: float = 30,
+        cancel_event: threading.Event = None,
+    ) -> CommandResult:
+        """
+        Run a command in the session identified by `session_id`,
+        creating or recycling the session as needed.
+        """
+        # The pool lock only guards the session table; commands in different
+        # sessions run in parallel and each session runs one at a time
+        with self._lock:
+            self._reap_idle()
+            session = self._acquire(session_id)
+
+        try:
+            result = session.run(command, timeout=timeout, cancel_event=cancel_event)
+        except ShellSessionError:
+            self._discard_session(session_id, session)
+            raise
+
+        if result.timed_out or result.cancelled or result.exited or not session.alive \
+                or session.commands_run >= self.max_commands:
+            self._discard_session(session_id, session)
+
+        return result
+
+    def reset(self, session_id: str = "default") -> bool:
+        """
+        Close a session so the next command starts from a fresh shell.
+
+        Returns:
+            bool: True if a session was closed.
+        """
+        with self._lock:
+            return self._discard(session_id)
+
+    def close_all(self) -> None:
+        with self._lock:
+            for session_id in list(self._sessions):
+                self._discard(session_id)
+
+    def _acquire(self, session_id: str) -> ShellSession:
+        session = self._sessions.get(session_id)
+        if session is not None and session.alive:
+            self._sessions.move_to_end(session_id)
+            return session
+
+        self._discard(session_id)
+        while len(self._sessions) >= self.max_sessions:
+            # Sessions running a command are not evicted, so the pool may briefly exceed its bound
+            oldest = next((name for name, open_session in self._sessions.items() if not open_session.busy), None)
+            if oldest is None:
+                break
+            logger.info(f"[ShellPool] Evicting least recently used session: {oldest}")
+            self._discard(oldest)
+
+        logger.info(f"[ShellPool] Starting shell session: {session_id}")
+        session = ShellSession(shell=self.shell, cwd=self.cwd)
+        self._sessions[session_id] = session
+        return session
+
+    def _reap_idle(self) -> None:
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            if session.busy:
+                continue
+            if now - session.last_used > self.idle_timeout or not session.alive:
+                logger.info(f"[ShellPool] Recycling idle session: {session_id}")
+                self._discard(session_id)
+
+    def _discard_session(self, session_id: str, session: ShellSession) -> None:
+        # Another command may already have replaced the session under this id
+        with self._lock:
+            if self._sessions.get(session_id) is session:
+                self._discard(session_id)
+            else:
+                session.close()
+
+    def _discard(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
@@ -0,0 +1,108 @@
+import asyncio
+
+from core.common.agent_stream import stream_with_progress
+from core.common.cancellation import cancel_and_wait, run_to_completion
+
+
+def _delegating_run(calls: dict[str, int], started: asyncio.Event):
+    async def events():
+        yield "Calling tool _delgate_task..."
+        started.set()
+        try:
+            # Tool startup, e.g. closing the HTTP client used for agent discovery
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            pass  # swallowed, so the tool carries on
+        await asyncio.sleep(0.5)  # connect to the child agent
+        calls["child"] += 1
+        await asyncio.sleep(5)  # the child's turn
+        yield "Tool _delgate_task finished."
+
+    async def run():
+        async for _ in stream_with_progress(events()):
+            pass
+
+    return run()
+
+
+def test_cancel_during_tool_startup_never_runs_child():
+    async def scenario():
+        calls = {"child": 0}
+        started = asyncio.Event()
+        running = asyncio.create_task(_delegating_run(calls, started))
+        await started.wait()
+
+        # A single cancel, as the A2A server sends for tasks/cancel
+        loop = asyncio.get_running_loop()
+        cancelled_at = loop.time()
+        running.cancel()
+        await asyncio.wait({running}, timeout=2)
+        elapsed = loop.time() - cancelled_at
+        assert running.cancelled()
+
+        await asyncio.sleep(1)  # past the point the child would have been called
+        return calls["child"], elapsed
+
+    child_runs, elapsed = asyncio.run(scenario())
+    assert child_runs == 0
+    assert elapsed < 1
+
+
+def test_cancel_and_wait_repeats_a_swallowed_cancel():
+    async def scenario():
+        async def swallows_once():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                pass
+            await asyncio.sleep(5)
+
+        task = asyncio.create_task(swallows_once())
+        await asyncio.sleep(0)
+        return await cancel_and_wait(task, timeout=1), task.cancelled()
+
+    assert asyncio.run(scenario()) == (True, True)
+
+
+def test_cancel_and_wait_gives_up_on_a_task_that_never_stops():
+    async def scenario():
+        released = asyncio.Event()
+
+        async def stubborn():
+            while not released.is_set():
+                try:
+                    await asyncio.sleep(0.01)
+                except asyncio.CancelledError:
+                    pass
+
+        task = asyncio.create_task(stubborn())
+        await asyncio.sleep(0)
+        stopped = await cancel_and_wait(task, timeout=0.2)
+        released.set()
+        await task
+        return stopped
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_cleanup_finishes_while_the_caller_is_cancelled_again():
+    async def scenario():
+        cleaned = []
+
+        async def cleanup():
+            await asyncio.sleep(0.3)  # e.g. sending tasks/cancel to the child
+            cleaned.append(True)
+
+        async def abandoned():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                await run_to_completion(cleanup(), timeout=2)
+                raise
+
+        task = asyncio.create_task(abandoned())
+        await asyncio.sleep(0)
+        assert await cancel_and_wait(task, timeout=2)
+        return cleaned
+
+    assert asyncio.run(scenario()) == [True]
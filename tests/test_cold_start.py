@@ -0,0 +1,18 @@
+import os
+import statistics
+
+from benchmarks.cold_start import CLIENT_FORBIDDEN_IMPORTS, DEFAULT_BUDGETS, run_client
+
+
+def test_client_cold_start_within_budget():
+    env = dict(os.environ)
+    run_client(env)  # warm the file system cache
+    results = [run_client(env) for _ in range(3)]
+
+    seconds = statistics.median(result["seconds"] for result in results)
+    assert seconds <= DEFAULT_BUDGETS["client"], f"client took {seconds:.2f}s to import"
+
+
+def test_client_imports_no_agent_stack():
+    forbidden = run_client(dict(os.environ))["forbidden_imports"]
+    assert forbidden == [], f"client imports {', '.join(forbidden)} (forbidden: {', '.join(CLIENT_FORBIDDEN_IMPORTS)})"